@@ -0,0 +1,56 @@
+import argparse
+import sys
+
+from app.core.logging_config import configure_logging
+from app.db.session import SessionLocal, get_engine
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.analytics")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sim = sub.add_parser(
+        "rebuild-similarity", help="recompute every similar-playlist list"
+    )
+    sim.add_argument("--method", choices=["auto", "exact", "minhash"], default="auto")
+    sub.add_parser(
+        "rebuild-song-groups", help="recluster duplicate recordings into songs"
+    )
+    sub.add_parser("rebuild-stats", help="recompute the catalog summary tables")
+    sub.add_parser(
+        "verify-stats", help="diff the summary tables against a full recomputation"
+    )
+    args = parser.parse_args()
+
+    configure_logging()
+    with SessionLocal(bind=get_engine()) as db:
+        if args.command == "rebuild-similarity":
+            from app.analytics.similarity import rebuild_similarity
+
+            count = rebuild_similarity(db, method=args.method)
+            print(f"Rebuilt similarity for {count} playlists")
+        elif args.command == "rebuild-song-groups":
+            from app.analytics.dedup import rebuild_song_groups
+            from app.analytics.stats import rebuild_stats
+
+            count = rebuild_song_groups(db)
+            # Song counts in the summary tables derive from the groups.
+            rebuild_stats(db)
+            print(f"Rebuilt {count} song groups")
+        elif args.command == "rebuild-stats":
+            from app.analytics.stats import rebuild_stats
+
+            rebuild_stats(db)
+            print("Rebuilt catalog stats")
+        elif args.command == "verify-stats":
+            from app.analytics.stats import verify_stats
+
+            problems = verify_stats(db)
+            for problem in problems:
+                print(problem)
+            if problems:
+                sys.exit(1)
+            print("Catalog stats are consistent")
+
+
+if __name__ == "__main__":
+    main()
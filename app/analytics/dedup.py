@@ -0,0 +1,157 @@
+"""
+Canonical song groups: one group per song across its many Spotify
+recordings (remasters, regional releases, compilation copies).
+
+Titles and artists are normalized with the same rules as the Genius slugs
+(``_slugify``) after dropping release-variant decorations such as
+``" - 2011 Remaster"`` or ``"(feat. X)"``. Names the slug rules reduce to
+nothing (Cyrillic, CJK, ...) fall back to their NFKC case-folded form.
+Candidates are blocked on (artist key, title key) and matched when
+durations are within ``DURATION_TOLERANCE_MS``; a track with an empty key
+is never matched and gets a group of its own. Each track stores its
+``song_group_id`` so reads collapse duplicates with a plain ``GROUP BY``.
+
+``assign_song_groups`` runs inside each ingest for the tracks it created;
+``rebuild_song_groups`` reclusters the whole catalog.
+"""
+import logging
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, List, Sequence, Tuple
+
+from sqlalchemy import tuple_, update
+from sqlalchemy.orm import Session
+
+from app.db.models import Artist, SongGroup, Track
+from app.utils.genius import _slugify
+
+logger = logging.getLogger(__name__)
+
+DURATION_TOLERANCE_MS = 5_000
+_IN_CHUNK = 500
+_REBUILD_BATCH = 10_000
+
+_VARIANT = (
+    r"(?:remaster(?:ed)?|mono|stereo|single version|album version|radio edit"
+    r"|deluxe|bonus track|explicit|clean|feat|ft|featuring)"
+)
+_BRACKETED = re.compile(rf"[\(\[][^\)\]]*\b{_VARIANT}\b[^\)\]]*[\)\]]", re.IGNORECASE)
+_DASH_SUFFIX = re.compile(rf"\s+-\s+[^-]*\b{_VARIANT}\b.*$", re.IGNORECASE)
+
+
+def _key(text: str) -> str:
+    slug = _slugify(text)
+    if slug:
+        return slug
+    # Nothing in [a-z0-9]: keep the letters rather than collapse to "".
+    return "-".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+def normalize_artist(name: str) -> str:
+    return _key(name or "")
+
+
+def normalize_title(name: str) -> str:
+    """
+    ``"Heroes - 2017 Remaster"`` and ``"Heroes (feat. X) [Mono]"`` both
+    normalize to ``"heroes"``.
+    """
+    stripped = _DASH_SUFFIX.sub("", _BRACKETED.sub(" ", name or ""))
+    return _key(stripped) or _key(name or "")
+
+
+def _closest(groups: List[SongGroup], duration_ms: int) -> SongGroup | None:
+    best, best_diff = None, DURATION_TOLERANCE_MS + 1
+    for group in groups:
+        diff = abs(group.duration_ms - duration_ms)
+        if diff < best_diff:
+            best, best_diff = group, diff
+    return best
+
+
+def assign_song_groups(
+    db: Session, tracks: Sequence[Tuple[int, str, str, int]]
+) -> int:
+    """
+    Attach each ``(track id, artist name, title, duration ms)`` to a song
+    group, creating groups as needed, and return how many were created.
+    Track ids must not have a group yet. Does not commit.
+    """
+    keyed = [
+        (track_id, normalize_artist(artist), normalize_title(title), duration or 0)
+        for track_id, artist, title, duration in tracks
+    ]
+    pairs = sorted(
+        {(a_key, t_key) for _, a_key, t_key, _ in keyed if a_key and t_key}
+    )
+
+    candidates: Dict[Tuple[str, str], List[SongGroup]] = defaultdict(list)
+    for i in range(0, len(pairs), _IN_CHUNK):
+        chunk = pairs[i : i + _IN_CHUNK]
+        for group in db.query(SongGroup).filter(
+            tuple_(SongGroup.artist_key, SongGroup.title_key).in_(chunk)
+        ):
+            candidates[(group.artist_key, group.title_key)].append(group)
+
+    created: List[SongGroup] = []
+    grown: Counter = Counter()
+    assignments: List[Tuple[int, SongGroup]] = []
+    for track_id, artist_key, title_key, duration in keyed:
+        # Without both keys there is nothing to match on.
+        block = candidates[(artist_key, title_key)] if artist_key and title_key else []
+        group = _closest(block, duration)
+        if group is None:
+            group = SongGroup(
+                artist_key=artist_key,
+                title_key=title_key,
+                duration_ms=duration,
+                canonical_track_id=track_id,
+                track_count=0,
+            )
+            block.append(group)
+            created.append(group)
+        if group.id is None:
+            group.track_count += 1
+            group.canonical_track_id = min(group.canonical_track_id, track_id)
+        else:
+            grown[group.id] += 1
+        assignments.append((track_id, group))
+
+    db.add_all(created)
+    db.flush()
+    # Existing groups only ever gain newer (higher) track ids, so their
+    # canonical track is unchanged; counts are bumped in SQL so concurrent
+    # ingests compose.
+    for group_id, n in grown.items():
+        db.execute(
+            update(SongGroup)
+            .where(SongGroup.id == group_id)
+            .values(track_count=SongGroup.track_count + n)
+        )
+    db.bulk_update_mappings(
+        Track, [{"id": track_id, "song_group_id": group.id} for track_id, group in assignments]
+    )
+    return len(created)
+
+
+def rebuild_song_groups(db: Session) -> int:
+    """
+    Recluster every track from scratch and return the number of groups.
+    Commits.
+    """
+    db.query(Track).update({Track.song_group_id: None}, synchronize_session=False)
+    db.query(SongGroup).delete(synchronize_session=False)
+
+    rows = (
+        db.query(Track.id, Artist.name, Track.name, Track.duration_ms)
+        .join(Artist, Artist.id == Track.artist_id)
+        .order_by(Track.id)
+        .all()
+    )
+    groups = 0
+    for i in range(0, len(rows), _REBUILD_BATCH):
+        groups += assign_song_groups(db, [tuple(r) for r in rows[i : i + _REBUILD_BATCH]])
+    db.commit()
+    logger.info("Clustered %d tracks into %d song groups", len(rows), groups)
+    return groups
@@ -0,0 +1,430 @@
+"""
+Playlist overlap / similarity over the playlist x track incidence matrix.
+
+Similar-playlist lists are precomputed into ``playlist_similarity`` so the
+API only reads an indexed top-k slice:
+
+- ``refresh_playlist_similarity`` runs inside each ingest transaction. It
+  computes one sparse row product (the ingested playlist against every
+  playlist sharing a track) in SQL via the ``track_id`` reverse index, and
+  patches the neighbour lists it affects. Full lists that lose their entry
+  for the ingested playlist are recomputed, so they stay exact.
+- ``rebuild_similarity`` recomputes every list from scratch in memory,
+  exactly with vectorised sparse products, or through MinHash/LSH candidate
+  generation once the catalog is too large for exact all-pairs work.
+"""
+import logging
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, aliased
+
+from app.core.config import get_settings
+from app.db.models import Playlist, PlaylistSimilarity, PlaylistTrack
+
+logger = logging.getLogger(__name__)
+
+# (other playlist id, shared tracks, jaccard, cosine)
+Neighbour = Tuple[int, int, float, float]
+
+
+def _scores(shared: int, size_a: int, size_b: int) -> Tuple[float, float]:
+    union = size_a + size_b - shared
+    jaccard = shared / union if union else 0.0
+    cosine = shared / math.sqrt(size_a * size_b) if size_a and size_b else 0.0
+    return jaccard, cosine
+
+
+def _top_k(neighbours: List[Neighbour], k: int) -> List[Neighbour]:
+    neighbours.sort(key=lambda n: (-n[2], n[0]))
+    return neighbours[:k]
+
+
+# ---------------------------------------------------------------------------
+# Incremental maintenance (per ingest)
+# ---------------------------------------------------------------------------
+
+
+def _playlist_sizes(db: Session, playlist_ids) -> Dict[int, int]:
+    return dict(
+        db.query(PlaylistTrack.playlist_id, func.count())
+        .filter(PlaylistTrack.playlist_id.in_(playlist_ids))
+        .group_by(PlaylistTrack.playlist_id)
+        .all()
+    )
+
+
+def _candidate_ids(playlist_id: int):
+    mine = aliased(PlaylistTrack)
+    other = aliased(PlaylistTrack)
+    return select(other.playlist_id).join(
+        mine, mine.track_id == other.track_id
+    ).where(mine.playlist_id == playlist_id)
+
+
+def _neighbours(db: Session, playlist_id: int) -> List[Neighbour]:
+    """
+    Every playlist sharing a track with ``playlist_id``, scored: one sparse
+    row product in SQL via the ``track_id`` reverse index.
+    """
+    mine = aliased(PlaylistTrack)
+    other = aliased(PlaylistTrack)
+    overlaps = dict(
+        db.query(other.playlist_id, func.count())
+        .join(mine, mine.track_id == other.track_id)
+        .filter(mine.playlist_id == playlist_id, other.playlist_id != playlist_id)
+        .group_by(other.playlist_id)
+        .all()
+    )
+    sizes = _playlist_sizes(db, _candidate_ids(playlist_id))
+    own_size = sizes.get(playlist_id, 0)
+
+    scored: List[Neighbour] = []
+    for other_id, shared in overlaps.items():
+        jaccard, cosine = _scores(shared, own_size, sizes.get(other_id, 0))
+        scored.append((other_id, shared, jaccard, cosine))
+    return scored
+
+
+def _replace_list(db: Session, playlist_id: int, neighbours: List[Neighbour]) -> None:
+    db.query(PlaylistSimilarity).filter(
+        PlaylistSimilarity.playlist_id == playlist_id
+    ).delete(synchronize_session=False)
+    db.add_all(
+        PlaylistSimilarity(
+            playlist_id=playlist_id,
+            similar_playlist_id=other_id,
+            shared_tracks=shared,
+            jaccard=jaccard,
+            cosine=cosine,
+        )
+        for other_id, shared, jaccard, cosine in neighbours
+    )
+
+
+def refresh_playlist_similarity(db: Session, playlist_id: int) -> int:
+    """
+    Recompute neighbours of ``playlist_id`` and patch the lists of every
+    playlist it overlaps with. Returns the number of overlapping playlists.
+
+    Does not commit; callers run it inside their own transaction.
+    """
+    k = get_settings().similarity_top_k
+    scored = _neighbours(db, playlist_id)
+
+    # Own list: replace wholesale.
+    _replace_list(db, playlist_id, _top_k(list(scored), k))
+
+    # Full lists that held ``playlist_id`` lose that entry below, and their
+    # next-best candidate was never stored: recompute those exactly.
+    holders = select(PlaylistSimilarity.playlist_id).where(
+        PlaylistSimilarity.similar_playlist_id == playlist_id
+    )
+    refill = {
+        row[0]
+        for row in db.query(PlaylistSimilarity.playlist_id)
+        .filter(PlaylistSimilarity.playlist_id.in_(holders))
+        .group_by(PlaylistSimilarity.playlist_id)
+        .having(func.count() >= k)
+        .all()
+    }
+
+    # Reverse entries: drop stale ones, then offer the new score to each
+    # overlapping playlist's list, evicting its weakest entry when full.
+    db.query(PlaylistSimilarity).filter(
+        PlaylistSimilarity.similar_playlist_id == playlist_id
+    ).delete(synchronize_session=False)
+    for other_id in refill:
+        _replace_list(db, other_id, _top_k(_neighbours(db, other_id), k))
+
+    offers = [n for n in scored if n[0] not in refill]
+    if offers:
+        fill = dict(
+            (row[0], (row[1], row[2]))
+            for row in db.query(
+                PlaylistSimilarity.playlist_id,
+                func.count(),
+                func.min(PlaylistSimilarity.jaccard),
+            )
+            .filter(PlaylistSimilarity.playlist_id.in_(_candidate_ids(playlist_id)))
+            .group_by(PlaylistSimilarity.playlist_id)
+            .all()
+        )
+        for other_id, shared, jaccard, cosine in offers:
+            count, weakest = fill.get(other_id, (0, 0.0))
+            if count >= k:
+                if jaccard <= weakest:
+                    continue
+                evict = (
+                    db.query(PlaylistSimilarity)
+                    .filter(PlaylistSimilarity.playlist_id == other_id)
+                    .order_by(
+                        PlaylistSimilarity.jaccard.asc(),
+                        PlaylistSimilarity.similar_playlist_id.desc(),
+                    )
+                    .first()
+                )
+                if evict is not None:
+                    db.delete(evict)
+            db.add(
+                PlaylistSimilarity(
+                    playlist_id=other_id,
+                    similar_playlist_id=playlist_id,
+                    shared_tracks=shared,
+                    jaccard=jaccard,
+                    cosine=cosine,
+                )
+            )
+    db.flush()
+    return len(scored)
+
+
+def get_similar_playlists(db: Session, playlist_id: int, limit: int) -> List[Dict[str, Any]]:
+    rows = (
+        db.query(
+            Playlist.id,
+            Playlist.spotify_id,
+            Playlist.name,
+            PlaylistSimilarity.shared_tracks,
+            PlaylistSimilarity.jaccard,
+            PlaylistSimilarity.cosine,
+        )
+        .join(Playlist, Playlist.id == PlaylistSimilarity.similar_playlist_id)
+        .filter(PlaylistSimilarity.playlist_id == playlist_id)
+        .order_by(
+            PlaylistSimilarity.jaccard.desc(), PlaylistSimilarity.similar_playlist_id
+        )
+        .limit(limit)
+        .all()
+    )
+    return [
+        {
+            "id": r.id,
+            "spotify_id": r.spotify_id,
+            "name": r.name,
+            "shared_tracks": r.shared_tracks,
+            "jaccard": r.jaccard,
+            "cosine": r.cosine,
+        }
+        for r in rows
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Full rebuild (in memory, numpy)
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class IncidenceMatrix:
+    """
+    Binary playlist x track matrix in both CSR (rows -> tracks) and CSC
+    (tracks -> rows) form, as plain numpy index arrays.
+    """
+
+    playlist_ids: Any  # row -> playlist id
+    row_indptr: Any
+    row_tracks: Any  # column index per non-zero, row-major
+    col_indptr: Any
+    col_rows: Any  # row index per non-zero, column-major
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.playlist_ids)
+
+    def row_sizes(self):
+        return self.row_indptr[1:] - self.row_indptr[:-1]
+
+    def tracks_of(self, row: int):
+        return self.row_tracks[self.row_indptr[row] : self.row_indptr[row + 1]]
+
+
+def build_incidence_matrix(db: Session) -> IncidenceMatrix:
+    import numpy as np
+
+    pairs = np.array(
+        db.query(PlaylistTrack.playlist_id, PlaylistTrack.track_id).all(),
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    playlist_ids, rows = np.unique(pairs[:, 0], return_inverse=True)
+    _, cols = np.unique(pairs[:, 1], return_inverse=True)
+    n_cols = int(cols.max()) + 1 if len(cols) else 0
+
+    order = np.lexsort((cols, rows))
+    row_indptr = np.zeros(len(playlist_ids) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=len(playlist_ids)), out=row_indptr[1:])
+
+    col_order = np.lexsort((rows, cols))
+    col_indptr = np.zeros(n_cols + 1, dtype=np.int64)
+    np.cumsum(np.bincount(cols, minlength=n_cols), out=col_indptr[1:])
+
+    return IncidenceMatrix(
+        playlist_ids=playlist_ids,
+        row_indptr=row_indptr,
+        row_tracks=cols[order],
+        col_indptr=col_indptr,
+        col_rows=rows[col_order],
+    )
+
+
+def _overlap_row(matrix: IncidenceMatrix, row: int):
+    """
+    Shared-track counts of ``row`` against every row: one sparse row times
+    the transposed matrix, done as a vectorised ragged gather + bincount.
+    """
+    import numpy as np
+
+    tracks = matrix.tracks_of(row)
+    starts = matrix.col_indptr[tracks]
+    lengths = matrix.col_indptr[tracks + 1] - starts
+    total = int(lengths.sum())
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    postings = matrix.col_rows[offsets + np.arange(total)]
+    return np.bincount(postings, minlength=matrix.n_rows)
+
+
+def exact_neighbours(matrix: IncidenceMatrix, row: int, k: int) -> List[Neighbour]:
+    import numpy as np
+
+    shared = _overlap_row(matrix, row)
+    shared[row] = 0
+    sizes = matrix.row_sizes()
+    union = sizes[row] + sizes - shared
+    with np.errstate(divide="ignore", invalid="ignore"):
+        jaccard = np.where(union > 0, shared / union, 0.0)
+        cosine = np.where(shared > 0, shared / np.sqrt(sizes[row] * sizes), 0.0)
+
+    hits = np.flatnonzero(shared)
+    if len(hits) > k:
+        hits = hits[np.argpartition(-jaccard[hits], k - 1)[:k]]
+    return _top_k(
+        [
+            (int(matrix.playlist_ids[q]), int(shared[q]), float(jaccard[q]), float(cosine[q]))
+            for q in hits
+        ],
+        k,
+    )
+
+
+class MinHashLSH:
+    """
+    MinHash signatures with banded LSH over the incidence matrix rows.
+    Rows whose signatures collide in any band are candidate neighbours;
+    candidates are then scored exactly.
+    """
+
+    _PRIME = (1 << 31) - 1
+    _BLOCK_NNZ = 50_000
+
+    def __init__(self, matrix: IncidenceMatrix, num_perm: int = 128, bands: int = 64, seed: int = 0):
+        import numpy as np
+
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.matrix = matrix
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+
+        rng = np.random.default_rng(seed)
+        a = rng.integers(1, self._PRIME, size=num_perm, dtype=np.int64)
+        b = rng.integers(0, self._PRIME, size=num_perm, dtype=np.int64)
+
+        # Hash every non-zero once per permutation and take per-row minima,
+        # a block of rows at a time to bound the (nnz x num_perm) buffer.
+        signatures = np.full((matrix.n_rows, num_perm), self._PRIME, dtype=np.int64)
+        nonempty = matrix.row_sizes() > 0
+        indptr = matrix.row_indptr
+        row = 0
+        while row < matrix.n_rows:
+            end = int(np.searchsorted(indptr, indptr[row] + self._BLOCK_NNZ, side="right"))
+            end = min(max(end - 1, row + 1), matrix.n_rows)
+            block = np.flatnonzero(nonempty[row:end]) + row
+            if len(block):
+                lo, hi = indptr[block[0]], indptr[end]
+                hashed = (np.outer(matrix.row_tracks[lo:hi], a) + b) % self._PRIME
+                signatures[block] = np.minimum.reduceat(hashed, indptr[block] - lo, axis=0)
+            row = end
+        self.signatures = signatures
+
+        self._buckets: List[Dict[bytes, List[int]]] = []
+        for band in range(bands):
+            part = signatures[:, band * self.rows_per_band : (band + 1) * self.rows_per_band]
+            buckets: Dict[bytes, List[int]] = {}
+            for row in np.flatnonzero(nonempty):
+                buckets.setdefault(part[row].tobytes(), []).append(int(row))
+            self._buckets.append(buckets)
+
+    def candidates(self, row: int) -> set[int]:
+        found: set[int] = set()
+        for band, buckets in enumerate(self._buckets):
+            key = self.signatures[
+                row, band * self.rows_per_band : (band + 1) * self.rows_per_band
+            ].tobytes()
+            found.update(buckets.get(key, ()))
+        found.discard(row)
+        return found
+
+    def neighbours(self, row: int, k: int) -> List[Neighbour]:
+        import numpy as np
+
+        m = self.matrix
+        mine = m.tracks_of(row)
+        scored: List[Neighbour] = []
+        for q in self.candidates(row):
+            theirs = m.tracks_of(q)
+            shared = len(np.intersect1d(mine, theirs, assume_unique=True))
+            if shared:
+                jaccard, cosine = _scores(shared, len(mine), len(theirs))
+                scored.append((int(m.playlist_ids[q]), shared, jaccard, cosine))
+        return _top_k(scored, k)
+
+
+def rebuild_similarity(db: Session, method: str = "auto") -> int:
+    """
+    Recompute every playlist's neighbour list and replace the cache table.
+    Returns the number of playlists processed. Commits.
+    """
+    settings = get_settings()
+    k = settings.similarity_top_k
+    matrix = build_incidence_matrix(db)
+    db.query(PlaylistSimilarity).delete(synchronize_session=False)
+    if matrix.n_rows == 0:
+        db.commit()
+        return 0
+    if method == "auto":
+        method = (
+            "exact" if matrix.n_rows <= settings.similarity_exact_max_playlists else "minhash"
+        )
+    logger.info("Rebuilding similarity for %d playlists (%s)", matrix.n_rows, method)
+
+    if method == "minhash":
+        lsh = MinHashLSH(
+            matrix,
+            num_perm=settings.similarity_minhash_permutations,
+            bands=settings.similarity_minhash_bands,
+        )
+        neighbours_of = lambda row: lsh.neighbours(row, k)  # noqa: E731
+    elif method == "exact":
+        neighbours_of = lambda row: exact_neighbours(matrix, row, k)  # noqa: E731
+    else:
+        raise ValueError(f"Unknown similarity method: {method}")
+
+    for row in range(matrix.n_rows):
+        playlist_id = int(matrix.playlist_ids[row])
+        db.bulk_insert_mappings(
+            PlaylistSimilarity,
+            [
+                {
+                    "playlist_id": playlist_id,
+                    "similar_playlist_id": other_id,
+                    "shared_tracks": shared,
+                    "jaccard": jaccard,
+                    "cosine": cosine,
+                }
+                for other_id, shared, jaccard, cosine in neighbours_of(row)
+            ],
+        )
+    db.commit()
+    return matrix.n_rows
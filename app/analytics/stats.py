@@ -0,0 +1,397 @@
+"""
+Catalog statistics kept in summary tables so ``/stats`` reads are O(1).
+
+The loader calls ``apply_ingest`` inside each ingest transaction with what
+that ingest added; counters are bumped with ``x = x + n`` updates. Whether
+an album or song is new depends on rows other ingests may be writing, so
+the loader takes ``lock_catalog_counts`` before it creates song groups and
+holds it until commit; with that, concurrent ingests compose. On SQLite
+the database write lock already serialises writers. ``compute_from_scratch``
+derives the same numbers with full aggregates; ``rebuild_stats`` writes
+them and ``verify_stats`` diffs them against the maintained tables.
+"""
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import bindparam, func, text, update
+from sqlalchemy.orm import Session
+
+from app.db.models import (
+    Artist,
+    ArtistStats,
+    CatalogStats,
+    Playlist,
+    PlaylistStats,
+    PlaylistTrack,
+    SongGroup,
+    Track,
+)
+
+logger = logging.getLogger(__name__)
+
+CATALOG_ROW_ID = 1
+_IN_CHUNK = 1000
+# Arbitrary key for pg_advisory_xact_lock around new-album/new-song counting.
+_CATALOG_COUNTS_LOCK_KEY = 7_320_114_003
+
+
+@dataclass
+class IngestDelta:
+    """
+    What one ingest changed in the catalog.
+    """
+
+    playlist_id: int
+    new_playlist: bool = False
+    new_artist_ids: List[int] = field(default_factory=list)
+    # (track id, artist id, album name, duration ms) of newly created tracks
+    new_tracks: List[Tuple[int, int, str, int]] = field(default_factory=list)
+    # artist id of every newly linked playlist track
+    linked_artist_ids: List[int] = field(default_factory=list)
+    # artist id of every track the playlist no longer contains
+    unlinked_artist_ids: List[int] = field(default_factory=list)
+    new_song_groups: int = 0
+
+
+def _median(values: List[int]) -> int:
+    if not values:
+        return 0
+    mid = len(values) // 2
+    if len(values) % 2:
+        return values[mid]
+    return (values[mid - 1] + values[mid]) // 2
+
+
+def _playlist_rows(db: Session, playlist_id: int) -> list:
+    return (
+        db.query(
+            Track.id, Track.duration_ms, Track.artist_id, Track.album_name, Track.song_group_id
+        )
+        .join(PlaylistTrack, PlaylistTrack.track_id == Track.id)
+        .filter(PlaylistTrack.playlist_id == playlist_id)
+        .all()
+    )
+
+
+def _playlist_stats_values(db: Session, playlist_id: int, rows=None) -> Dict[str, Any]:
+    if rows is None:
+        rows = _playlist_rows(db, playlist_id)
+    durations = sorted(r.duration_ms or 0 for r in rows)
+    return {
+        "playlist_id": playlist_id,
+        "track_count": len(rows),
+        "artist_count": len({r.artist_id for r in rows}),
+        "album_count": len({r.album_name for r in rows}),
+        "total_duration_ms": sum(durations),
+        "median_duration_ms": _median(durations),
+        # Ungrouped tracks count as their own song.
+        "song_count": len({r.song_group_id or -r.id for r in rows}),
+        "updated_at": datetime.utcnow(),
+    }
+
+
+def _ensure_catalog_row(db: Session) -> None:
+    if db.get(CatalogStats, CATALOG_ROW_ID) is None:
+        db.add(CatalogStats(id=CATALOG_ROW_ID))
+        db.flush()
+
+
+def lock_catalog_counts(db: Session) -> None:
+    """
+    Serialise ingests from here to commit, so each one sees the albums and
+    song groups that earlier ingests created. No-op outside Postgres.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(
+            text("SELECT pg_advisory_xact_lock(:key)"), {"key": _CATALOG_COUNTS_LOCK_KEY}
+        )
+
+
+def _new_album_count(db: Session, new_tracks: List[Tuple[int, int, str, int]]) -> int:
+    albums = {album for _, _, album, _ in new_tracks}
+    if not albums:
+        return 0
+    new_ids = [track_id for track_id, _, _, _ in new_tracks]
+    existing: set[str] = set()
+    album_list = list(albums)
+    for i in range(0, len(album_list), _IN_CHUNK):
+        chunk = album_list[i : i + _IN_CHUNK]
+        existing.update(
+            a
+            for (a,) in db.query(Track.album_name)
+            .filter(Track.album_name.in_(chunk), Track.id.notin_(new_ids))
+            .distinct()
+        )
+    return len(albums - existing)
+
+
+def apply_ingest(db: Session, delta: IngestDelta) -> None:
+    """
+    Fold one ingest into the summary tables. Does not commit; callers hold
+    ``lock_catalog_counts`` for the rest of the transaction.
+    """
+    _ensure_catalog_row(db)
+
+    if delta.new_artist_ids:
+        # A stale row can survive if artists were deleted out of band and
+        # their ids reused; reset it rather than failing the ingest.
+        stale = {
+            a
+            for (a,) in db.query(ArtistStats.artist_id).filter(
+                ArtistStats.artist_id.in_(delta.new_artist_ids)
+            )
+        }
+        if stale:
+            db.query(ArtistStats).filter(ArtistStats.artist_id.in_(stale)).delete(
+                synchronize_session=False
+            )
+        db.bulk_insert_mappings(
+            ArtistStats,
+            [
+                {"artist_id": a, "track_count": 0, "appearance_count": 0, "playlist_count": 0}
+                for a in delta.new_artist_ids
+            ],
+        )
+
+    track_counts = Counter(artist_id for _, artist_id, _, _ in delta.new_tracks)
+    appearances = Counter(delta.linked_artist_ids)
+    appearances.subtract(delta.unlinked_artist_ids)
+    # An artist's playlist count moves when its link count in this playlist
+    # goes from zero to some, or back. The count after the ingest comes from
+    # the playlist's rows (needed below anyway); before = after - delta.
+    rows = _playlist_rows(db, delta.playlist_id)
+    links_after = Counter(r.artist_id for r in rows)
+    playlist_counts = {
+        artist_id: int(links_after[artist_id] > 0)
+        - int(links_after[artist_id] - appearances[artist_id] > 0)
+        for artist_id in appearances
+    }
+    # One executemany against the table rather than an ORM update per
+    # artist: the ORM form re-scans the session's identity map (every
+    # object the ingest loaded) for each statement.
+    stats = ArtistStats.__table__
+    counters = [
+        {
+            "b_artist_id": artist_id,
+            "b_tracks": track_counts.get(artist_id, 0),
+            "b_appearances": appearances.get(artist_id, 0),
+            "b_playlists": playlist_counts.get(artist_id, 0),
+        }
+        for artist_id in sorted(set(track_counts) | set(appearances))
+    ]
+    if counters:
+        db.connection().execute(
+            stats.update()
+            .where(stats.c.artist_id == bindparam("b_artist_id"))
+            .values(
+                track_count=stats.c.track_count + bindparam("b_tracks"),
+                appearance_count=stats.c.appearance_count + bindparam("b_appearances"),
+                playlist_count=stats.c.playlist_count + bindparam("b_playlists"),
+            ),
+            counters,
+        )
+
+    db.execute(
+        update(CatalogStats)
+        .where(CatalogStats.id == CATALOG_ROW_ID)
+        .values(
+            playlist_count=CatalogStats.playlist_count + int(delta.new_playlist),
+            artist_count=CatalogStats.artist_count + len(delta.new_artist_ids),
+            track_count=CatalogStats.track_count + len(delta.new_tracks),
+            album_count=CatalogStats.album_count
+            + _new_album_count(db, delta.new_tracks),
+            playlist_track_count=CatalogStats.playlist_track_count
+            + len(delta.linked_artist_ids)
+            - len(delta.unlinked_artist_ids),
+            total_duration_ms=CatalogStats.total_duration_ms
+            + sum(d or 0 for _, _, _, d in delta.new_tracks),
+            song_count=CatalogStats.song_count + delta.new_song_groups,
+            updated_at=datetime.utcnow(),
+        )
+    )
+
+    # Per-playlist numbers (median in particular) are recomputed for the
+    # ingested playlist only: O(playlist size).
+    values = _playlist_stats_values(db, delta.playlist_id, rows)
+    db.merge(PlaylistStats(**values))
+    db.flush()
+
+
+# ---------------------------------------------------------------------------
+# Reads
+# ---------------------------------------------------------------------------
+
+
+def get_catalog_stats(db: Session) -> Dict[str, Any]:
+    row = db.get(CatalogStats, CATALOG_ROW_ID)
+    if row is None:
+        row = CatalogStats(id=CATALOG_ROW_ID)
+    return {
+        "playlist_count": row.playlist_count or 0,
+        "track_count": row.track_count or 0,
+        "artist_count": row.artist_count or 0,
+        "album_count": row.album_count or 0,
+        "playlist_track_count": row.playlist_track_count or 0,
+        "total_duration_ms": row.total_duration_ms or 0,
+        "song_count": row.song_count or 0,
+        "updated_at": row.updated_at,
+    }
+
+
+def get_top_artists(db: Session, limit: int) -> List[Dict[str, Any]]:
+    rows = (
+        db.query(
+            Artist.id,
+            Artist.name,
+            ArtistStats.track_count,
+            ArtistStats.appearance_count,
+            ArtistStats.playlist_count,
+        )
+        .join(Artist, Artist.id == ArtistStats.artist_id)
+        .order_by(ArtistStats.appearance_count.desc(), ArtistStats.artist_id.asc())
+        .limit(limit)
+        .all()
+    )
+    return [
+        {
+            "id": r.id,
+            "name": r.name,
+            "track_count": r.track_count,
+            "appearance_count": r.appearance_count,
+            "playlist_count": r.playlist_count,
+        }
+        for r in rows
+    ]
+
+
+def get_playlist_stats(db: Session, playlist_id: int) -> Dict[str, Any] | None:
+    row = db.get(PlaylistStats, playlist_id)
+    if row is None:
+        return None
+    return {
+        "playlist_id": row.playlist_id,
+        "track_count": row.track_count,
+        "artist_count": row.artist_count,
+        "album_count": row.album_count,
+        "total_duration_ms": row.total_duration_ms,
+        "median_duration_ms": row.median_duration_ms,
+        "song_count": row.song_count,
+        "updated_at": row.updated_at,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Full recomputation
+# ---------------------------------------------------------------------------
+
+
+def compute_from_scratch(db: Session) -> Dict[str, Any]:
+    catalog = {
+        "playlist_count": db.query(func.count(Playlist.id)).scalar() or 0,
+        "track_count": db.query(func.count(Track.id)).scalar() or 0,
+        "artist_count": db.query(func.count(Artist.id)).scalar() or 0,
+        "album_count": db.query(func.count(func.distinct(Track.album_name))).scalar() or 0,
+        "playlist_track_count": db.query(func.count()).select_from(PlaylistTrack).scalar()
+        or 0,
+        "total_duration_ms": db.query(func.coalesce(func.sum(Track.duration_ms), 0)).scalar()
+        or 0,
+        "song_count": db.query(func.count(SongGroup.id)).scalar() or 0,
+    }
+
+    artists = {a: [0, 0, 0] for (a,) in db.query(Artist.id)}
+    for artist_id, n in db.query(Track.artist_id, func.count()).group_by(Track.artist_id):
+        artists[artist_id][0] = n
+    for artist_id, n in (
+        db.query(Track.artist_id, func.count())
+        .join(PlaylistTrack, PlaylistTrack.track_id == Track.id)
+        .group_by(Track.artist_id)
+    ):
+        artists[artist_id][1] = n
+    for artist_id, n in (
+        db.query(Track.artist_id, func.count(func.distinct(PlaylistTrack.playlist_id)))
+        .join(PlaylistTrack, PlaylistTrack.track_id == Track.id)
+        .group_by(Track.artist_id)
+    ):
+        artists[artist_id][2] = n
+
+    playlists = {}
+    for (playlist_id,) in db.query(Playlist.id):
+        values = _playlist_stats_values(db, playlist_id)
+        values.pop("updated_at")
+        playlists[playlist_id] = values
+
+    return {
+        "catalog": catalog,
+        "artists": {a: tuple(v) for a, v in artists.items()},
+        "playlists": playlists,
+    }
+
+
+def _maintained(db: Session) -> Dict[str, Any]:
+    catalog = get_catalog_stats(db)
+    catalog.pop("updated_at")
+    artists = {
+        r.artist_id: (r.track_count, r.appearance_count, r.playlist_count)
+        for r in db.query(ArtistStats)
+    }
+    playlists = {}
+    for row in db.query(PlaylistStats):
+        values = get_playlist_stats(db, row.playlist_id)
+        values.pop("updated_at")
+        playlists[row.playlist_id] = values
+    return {"catalog": catalog, "artists": artists, "playlists": playlists}
+
+
+def verify_stats(db: Session) -> List[str]:
+    """
+    Compare maintained tables against a full recomputation; returns a list
+    of human-readable mismatches (empty when consistent).
+    """
+    expected = compute_from_scratch(db)
+    actual = _maintained(db)
+    problems = []
+    for key, value in expected["catalog"].items():
+        if actual["catalog"].get(key) != value:
+            problems.append(f"catalog.{key}: {actual['catalog'].get(key)} != {value}")
+    for section in ("artists", "playlists"):
+        for ident in expected[section].keys() | actual[section].keys():
+            if expected[section].get(ident) != actual[section].get(ident):
+                problems.append(
+                    f"{section}[{ident}]: {actual[section].get(ident)} != "
+                    f"{expected[section].get(ident)}"
+                )
+    return problems
+
+
+def rebuild_stats(db: Session) -> None:
+    """
+    Replace every summary table with a full recomputation. Commits.
+    """
+    fresh = compute_from_scratch(db)
+    now = datetime.utcnow()
+
+    db.query(PlaylistStats).delete(synchronize_session=False)
+    db.query(ArtistStats).delete(synchronize_session=False)
+    db.query(CatalogStats).delete(synchronize_session=False)
+
+    db.add(CatalogStats(id=CATALOG_ROW_ID, updated_at=now, **fresh["catalog"]))
+    db.bulk_insert_mappings(
+        ArtistStats,
+        [
+            {"artist_id": a, "track_count": t, "appearance_count": n, "playlist_count": p}
+            for a, (t, n, p) in fresh["artists"].items()
+        ],
+    )
+    db.bulk_insert_mappings(
+        PlaylistStats,
+        [dict(values, updated_at=now) for values in fresh["playlists"].values()],
+    )
+    db.commit()
+    logger.info(
+        "Rebuilt stats for %d playlists, %d artists",
+        len(fresh["playlists"]),
+        len(fresh["artists"]),
+    )
@@ -0,0 +1,151 @@
+"""
+Negotiated response compression.
+
+The ``compress_responses`` middleware picks an encoding from the request's
+``Accept-Encoding``: brotli when the client offers it and the Brotli package
+is installed, gzip otherwise. Responses with a known length below
+``RESPONSE_COMPRESSION_MIN_BYTES`` are sent as-is, since the framing costs
+more than it saves. Streamed bodies (no ``Content-Length``) are compressed
+chunk by chunk and flushed after each one, so the client keeps receiving
+rows while the cursor is still being read.
+"""
+import zlib
+from typing import AsyncIterator, Optional
+
+from fastapi import Request
+from starlette.responses import Response
+
+from app.core.config import get_settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - Brotli is in requirements.txt
+    brotli = None
+
+BROTLI = "br"
+GZIP = "gzip"
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript")
+
+
+def available_encodings() -> tuple:
+    # In order of preference when the client weighs them equally.
+    return (BROTLI, GZIP) if brotli is not None else (GZIP,)
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    The encoding to use for an ``Accept-Encoding`` header, or None for
+    identity. Honours q-values, including ``q=0`` and ``*``.
+    """
+    if not accept_encoding:
+        return None
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip().lower() == "q":
+            try:
+                q = float(value)
+            except ValueError:
+                q = 0.0
+        weights[coding] = q
+    best, best_q = None, 0.0
+    for coding in available_encodings():
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class Compressor:
+    """
+    Incremental gzip or brotli encoder. ``compress`` flushes, so every
+    chunk it returns can be decoded as soon as it arrives.
+    """
+
+    def __init__(self, encoding: str) -> None:
+        settings = get_settings()
+        self.encoding = encoding
+        if encoding == BROTLI:
+            self._brotli = brotli.Compressor(quality=settings.response_brotli_quality)
+        else:
+            # wbits 16 + 15: gzip container, 32 KiB window.
+            self._zlib = zlib.compressobj(settings.response_gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, flush: bool = True) -> bytes:
+        if self.encoding == BROTLI:
+            out = self._brotli.process(data)
+            return out + self._brotli.flush() if flush else out
+        out = self._zlib.compress(data)
+        return out + self._zlib.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self) -> bytes:
+        if self.encoding == BROTLI:
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+
+def _compressible(response: Response) -> bool:
+    if response.status_code < 200 or response.status_code in (204, 304):
+        return False
+    if "content-encoding" in response.headers:
+        return False
+    content_type = response.headers.get("content-type", "")
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def _add_vary(response: Response) -> None:
+    vary = response.headers.get("vary")
+    if not vary:
+        response.headers["Vary"] = "Accept-Encoding"
+    elif "accept-encoding" not in vary.lower():
+        response.headers["Vary"] = f"{vary}, Accept-Encoding"
+
+
+async def _stream(body: AsyncIterator[bytes], compressor: Compressor) -> AsyncIterator[bytes]:
+    async for chunk in body:
+        if chunk:
+            yield compressor.compress(chunk)
+    yield compressor.finish()
+
+
+async def compress_response(request: Request, response: Response) -> Response:
+    """
+    Compress the body of a ``call_next`` response in place, when the client
+    accepts an encoding and the body is worth it.
+    """
+    settings = get_settings()
+    if not settings.response_compression or not _compressible(response):
+        return response
+    length = response.headers.get("content-length")
+    if length is not None and int(length) < settings.response_compression_min_bytes:
+        return response
+    _add_vary(response)
+    encoding = negotiate(request.headers.get("accept-encoding"))
+    if encoding is None:
+        return response
+
+    compressor = Compressor(encoding)
+    response.headers["Content-Encoding"] = encoding
+    # The compressed bytes are a different representation of the same data.
+    etag = response.headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        response.headers["ETag"] = f"W/{etag}"
+    if length is None:
+        response.body_iterator = _stream(response.body_iterator, compressor)
+        return response
+
+    # Known length: the body is already in memory, compress it in one go.
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    compressed = compressor.compress(body, flush=False) + compressor.finish()
+    response.headers["Content-Length"] = str(len(compressed))
+
+    async def _once() -> AsyncIterator[bytes]:
+        yield compressed
+
+    response.body_iterator = _once()
+    return response
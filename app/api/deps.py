@@ -1,13 +1,67 @@
-from typing import Generator
-from fastapi import Depends
+import time
+from typing import Generator, Optional
+
+from fastapi import Request, Response
 from sqlalchemy.orm import Session
 
-from app.db.session import SessionLocal
+from app.core.config import get_settings
+from app.db.session import SessionLocal, get_engine, get_read_engine, has_read_replica
+from app.db.snapshot import CatalogSnapshot, get_catalog_snapshot
+
+# Set on write responses; holds the epoch second until which this client's
+# reads go to the primary.
+READ_AFTER_WRITE_COOKIE = "primary_until"
 
 
-def get_db() -> Generator[Session, None, None]:
-    db = SessionLocal()
+def get_db(response: Response) -> Generator[Session, None, None]:
+    """
+    Session on the primary, for endpoints that write. Pins the caller's
+    subsequent reads to the primary for the read-after-write window.
+    """
+    if has_read_replica():
+        window = get_settings().read_after_write_window_seconds
+        response.set_cookie(
+            READ_AFTER_WRITE_COOKIE,
+            f"{time.time() + window:.3f}",
+            max_age=max(1, int(window + 0.999)),
+            httponly=True,
+            samesite="lax",
+        )
+    db = SessionLocal(bind=get_engine())
     try:
         yield db
     finally:
         db.close()
+
+
+def _recently_wrote(request: Request) -> bool:
+    try:
+        until = float(request.cookies.get(READ_AFTER_WRITE_COOKIE, ""))
+    except ValueError:
+        return False
+    now = time.time()
+    # Ignore values beyond the configured window (forged or stale config).
+    return now < until <= now + get_settings().read_after_write_window_seconds
+
+
+def get_read_db(request: Request) -> Generator[Session, None, None]:
+    """
+    Session for read-only endpoints: the replica when one is configured,
+    unless this client wrote within the read-after-write window.
+    """
+    engine = get_engine() if _recently_wrote(request) else get_read_engine()
+    db = SessionLocal(bind=engine)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_snapshot(request: Request) -> Optional[CatalogSnapshot]:
+    """
+    The published catalog snapshot, if any. Clients inside their
+    read-after-write window get None so they read their own writes.
+    """
+    if _recently_wrote(request):
+        return None
+    return get_catalog_snapshot()
@@ -0,0 +1,38 @@
+import hashlib
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+
+from app.api.responses import FastJSONResponse
+
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match.
+    bare = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == bare for tag in header.split(","))
+
+
+def cached_json_response(
+    request: Request,
+    content: Any,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    Render plain ``content`` as JSON with an ETag of the body. When the client
+    already holds that representation (``If-None-Match``) answer 304 with
+    no body so unchanged pages are not transferred again.
+    """
+    response = FastJSONResponse(content=content, headers=headers)
+    etag = f'"{hashlib.sha1(response.body).hexdigest()}"'
+    cache_headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers={**(headers or {}), **cache_headers})
+    response.headers.update(cache_headers)
+    return response
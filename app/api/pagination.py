@@ -0,0 +1,35 @@
+"""
+Opaque keyset-pagination cursors.
+
+A cursor carries the sort key of the last row on a page (for example
+``(playlist_count, artist_id)``), so the next page is a range scan on the
+index behind that sort rather than an ``OFFSET`` that reads and discards
+every earlier row.
+"""
+import base64
+import json
+from typing import Any, Sequence, Tuple
+
+from fastapi import HTTPException
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, types: Sequence[type]) -> Tuple[Any, ...]:
+    """
+    Decode a cursor from ``encode_cursor`` whose values have ``types``;
+    a malformed or foreign cursor is a 400.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if len(values) != len(types) or not all(
+            isinstance(v, t) and not isinstance(v, bool) for v, t in zip(values, types)
+        ):
+            raise ValueError(values)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+    return tuple(values)
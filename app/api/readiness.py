@@ -0,0 +1,206 @@
+"""
+Startup warmup and readiness state for the API.
+
+The lifespan starts a ``ReadinessMonitor``: a daemon thread that first warms
+the process, then re-checks the database every
+``READINESS_CHECK_INTERVAL_SECONDS``. Warming up covers what the first real
+requests would otherwise pay for:
+
+- ``mappers``: SQLAlchemy mapper configuration
+- ``pool``: ``WARMUP_POOL_CONNECTIONS`` connections opened per engine
+  (on a SQLite file, the reader pool; the writer's one connection is left
+  for writes)
+- ``snapshot``: the memory-mapped catalog snapshot, if configured
+- ``requests``: the ``WARMUP_PATHS`` GETs, run in-process, which fill the
+  statement caches and pull the search and listing indexes into the
+  database's cache
+- ``spotify_token``: the process-wide Spotify token, when this worker
+  ingests inline
+
+A failed step is logged and recorded but does not hold readiness back.
+``/readyz`` reports the last state without touching the database (whose
+checks, like ``/health``, go through ``app.db.session.probe_engines``), and
+``/livez`` only shows that the event loop answers.
+"""
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import text
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+WARMUP_REQUEST_ID = "warmup"
+
+
+@dataclass
+class ReadinessState:
+    warmed_up: bool = False
+    database_ok: bool = False
+    stopping: bool = False
+    checked_at: Optional[float] = None
+    error: Optional[str] = None
+    # step -> duration in ms, or the error it failed with
+    warmup: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def ready(self) -> bool:
+        return self.warmed_up and self.database_ok and not self.stopping
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "status": "ready" if self.ready else "not_ready",
+            "warmed_up": self.warmed_up,
+            "database_ok": self.database_ok,
+            "checked_at": self.checked_at,
+            "error": self.error,
+            "warmup": self.warmup,
+        }
+
+
+def _engines() -> List:
+    # On a SQLite file this is the reader pool only: the single writer
+    # connection is busy for as long as an ingest runs.
+    from app.db.session import probe_engines
+
+    return probe_engines()
+
+
+def fill_pools(connections: int) -> None:
+    """
+    Hold up to ``connections`` connections per engine at once, so the pool
+    keeps that many open for the first requests. Pools of one connection
+    (or without a size) are left alone; there is nothing to fill.
+    """
+    for engine in _engines():
+        size = getattr(engine.pool, "size", None)
+        if not callable(size) or size() <= 1:
+            continue
+        held = []
+        try:
+            for _ in range(min(connections, size())):
+                conn = engine.connect()
+                held.append(conn)
+                conn.execute(text("SELECT 1"))
+                conn.rollback()
+        finally:
+            for conn in held:
+                conn.close()
+
+
+def _configure_mappers() -> None:
+    from sqlalchemy.orm import configure_mappers
+
+    configure_mappers()
+
+
+def _load_snapshot() -> None:
+    from app.db.snapshot import get_catalog_snapshot
+
+    get_catalog_snapshot()
+
+
+async def _get_paths(app, paths: List[str]) -> None:
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://warmup") as client:
+        for path in paths:
+            resp = await client.get(path, headers={"X-Request-ID": WARMUP_REQUEST_ID})
+            if resp.status_code >= 400:
+                raise RuntimeError(f"GET {path} returned {resp.status_code}")
+
+
+def _prefetch_spotify_token() -> None:
+    settings = get_settings()
+    if (
+        settings.app_role == "read"
+        or settings.ingest_mode != "inline"
+        or settings.spotify_offline
+        or not (settings.spotify_client_id and settings.spotify_client_secret)
+    ):
+        return
+    from app.etl.spotify_client import SpotifyClient
+
+    SpotifyClient().prefetch_token()
+
+
+class ReadinessMonitor:
+    def __init__(self, app, warmup: Optional[bool] = None) -> None:
+        settings = get_settings()
+        self.app = app
+        self.warmup = settings.warmup_enabled if warmup is None else warmup
+        self.interval = settings.readiness_check_interval_seconds
+        self.state = ReadinessState()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="readiness", daemon=True)
+
+    def start(self) -> "ReadinessMonitor":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        # Probes see "not ready" while in-flight requests drain.
+        self.state.stopping = True
+        self._stop.set()
+        self._thread.join(timeout=5)
+
+    def steps(self) -> Dict[str, Callable[[], None]]:
+        settings = get_settings()
+        return {
+            "mappers": _configure_mappers,
+            "pool": lambda: fill_pools(settings.warmup_pool_connections),
+            "snapshot": _load_snapshot,
+            "requests": lambda: asyncio.run(_get_paths(self.app, settings.warmup_paths)),
+            "spotify_token": _prefetch_spotify_token,
+        }
+
+    def run_warmup(self) -> None:
+        started = time.perf_counter()
+        for name, step in self.steps().items():
+            if self._stop.is_set():
+                return
+            step_started = time.perf_counter()
+            try:
+                step()
+            except Exception as exc:  # noqa: BLE001 - warmup is best effort
+                logger.warning("Warmup step %s failed: %r", name, exc)
+                self.state.warmup[name] = repr(exc)
+            else:
+                self.state.warmup[name] = round((time.perf_counter() - step_started) * 1000, 1)
+        duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        logger.info(
+            "Warmup finished in %.0fms",
+            duration_ms,
+            extra={"duration_ms": duration_ms, "steps": self.state.warmup},
+        )
+
+    def check(self) -> None:
+        try:
+            for engine in _engines():
+                with engine.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+        except Exception as exc:  # noqa: BLE001
+            if self.state.database_ok or self.state.checked_at is None:
+                logger.warning("Readiness check failed: %r", exc)
+            self.state.database_ok = False
+            self.state.error = repr(exc)
+        else:
+            if not self.state.database_ok and self.state.checked_at is not None:
+                logger.info("Readiness check passed again")
+            self.state.database_ok = True
+            self.state.error = None
+        self.state.checked_at = time.time()
+
+    def _run(self) -> None:
+        if self.warmup:
+            self.run_warmup()
+        self.state.warmed_up = True
+        while not self._stop.is_set():
+            self.check()
+            self._stop.wait(self.interval)
@@ -0,0 +1,57 @@
+import json
+from typing import Any, Iterable, Iterator, List
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson when available.
+
+    Content must already be plain JSON types (dicts, lists, str, numbers,
+    datetimes); it is not run through ``jsonable_encoder`` again.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, ensure_ascii=False, separators=(",", ":"), default=str
+    ).encode("utf-8")
+
+
+def stream_json_array(batches: Iterable[List[Any]]) -> Iterator[bytes]:
+    """
+    Encode batches of plain JSON values as a single JSON array, one chunk
+    per batch, so only the current batch is held in memory. The opening
+    bracket goes out before the first batch is fetched.
+    """
+    yield b"["
+    first = True
+    for batch in batches:
+        if not batch:
+            continue
+        body = dumps(batch)[1:-1]
+        yield body if first else b"," + body
+        first = False
+    yield b"]"
+
+
+def raw_json(text: str) -> Any:
+    """
+    Embed an already-serialised JSON document in ``FastJSONResponse``
+    content. With orjson >= 3.9 the text is spliced in as-is instead of
+    being parsed and dumped again.
+    """
+    if orjson is not None and hasattr(orjson, "Fragment"):
+        return orjson.Fragment(text)
+    return json.loads(text)
@@ -0,0 +1,114 @@
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_read_db
+from app.api.pagination import decode_cursor, encode_cursor
+from app.api.responses import FastJSONResponse
+from app.api.track_rows import TRACK_COLUMNS, track_rows, with_genius_links
+from app.db.models import Artist, ArtistStats, Track
+from app.schemas.artist import ArtistOut, ArtistPage, ArtistTracksPage
+
+router = APIRouter(prefix="/artists", tags=["artists"])
+
+# Rankings read the counters ingest maintains in artist_stats, each backed
+# by an (count, artist_id) index scanned backwards; artist id breaks ties.
+_RANKINGS = {
+    "playlists": ArtistStats.playlist_count,
+    "appearances": ArtistStats.appearance_count,
+    "tracks": ArtistStats.track_count,
+}
+
+_ARTIST_COLUMNS = (
+    Artist.id,
+    Artist.spotify_id,
+    Artist.name,
+    Artist.genres,
+    ArtistStats.track_count,
+    ArtistStats.appearance_count,
+    ArtistStats.playlist_count,
+)
+
+
+def _artist(row) -> dict:
+    id_, spotify_id, name, genres, tracks, appearances, playlists = row
+    return {
+        "id": id_,
+        "spotify_id": spotify_id,
+        "name": name,
+        "genres": genres or "",
+        "track_count": tracks or 0,
+        "appearance_count": appearances or 0,
+        "playlist_count": playlists or 0,
+    }
+
+
+@router.get("", response_model=ArtistPage)
+def list_artists(
+    sort: Literal["playlists", "appearances", "tracks"] = Query(
+        "playlists", description="Rank by distinct playlists, playlist entries or tracks"
+    ),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    db: Session = Depends(get_read_db),
+):
+    count = _RANKINGS[sort]
+    q = db.query(*_ARTIST_COLUMNS).select_from(ArtistStats).join(
+        Artist, Artist.id == ArtistStats.artist_id
+    )
+    if cursor is not None:
+        after = decode_cursor(cursor, (int, int))
+        q = q.filter(tuple_(count, ArtistStats.artist_id) < after)
+    rows = q.order_by(count.desc(), ArtistStats.artist_id.desc()).limit(limit + 1).all()
+
+    items = [_artist(row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor((last[count.key], last["id"]))
+    return FastJSONResponse({"items": items, "next_cursor": next_cursor})
+
+
+def _get_artist(db: Session, artist_id: int) -> dict:
+    row = (
+        db.query(*_ARTIST_COLUMNS)
+        .outerjoin(ArtistStats, ArtistStats.artist_id == Artist.id)
+        .filter(Artist.id == artist_id)
+        .first()
+    )
+    if row is None:
+        raise HTTPException(status_code=404, detail="Artist not found")
+    return _artist(row)
+
+
+@router.get("/{artist_id}", response_model=ArtistOut)
+def get_artist(artist_id: int, db: Session = Depends(get_read_db)):
+    return FastJSONResponse(_get_artist(db, artist_id))
+
+
+@router.get("/{artist_id}/tracks", response_model=ArtistTracksPage)
+def get_artist_tracks(
+    artist_id: int,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    db: Session = Depends(get_read_db),
+):
+    artist = _get_artist(db, artist_id)
+    # By name, then id: a range scan of ix_tracks_artist_id_name.
+    q = with_genius_links(
+        db.query(*TRACK_COLUMNS).join(Artist, Artist.id == Track.artist_id)
+    ).filter(Track.artist_id == artist_id)
+    if cursor is not None:
+        after = decode_cursor(cursor, (str, int))
+        q = q.filter(tuple_(Track.name, Track.id) > after)
+    rows = q.order_by(Track.name.asc(), Track.id.asc()).limit(limit + 1).all()
+
+    items = track_rows(rows[:limit])
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor((items[-1]["name"], items[-1]["id"]))
+    return FastJSONResponse(
+        {"total": artist["track_count"], "items": items, "next_cursor": next_cursor}
+    )
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_read_db
+from app.api.responses import FastJSONResponse, raw_json
+from app.db.changes import latest_seq, read_changes
+from app.schemas.changes import ChangeFeedOut
+
+router = APIRouter(prefix="/changes", tags=["changes"])
+
+
+@router.get("", response_model=ChangeFeedOut)
+def list_changes(
+    since: int = Query(0, ge=0, description="Return changes after this sequence number"),
+    limit: int = Query(1000, ge=1, le=10_000),
+    db: Session = Depends(get_read_db),
+):
+    rows, has_more = read_changes(db, since, limit)
+    changes = [
+        {
+            "seq": seq,
+            "entity": entity,
+            "id": entity_id,
+            "op": op,
+            # Stored as JSON already; spliced into the body without a re-parse.
+            "data": raw_json(data) if data is not None else None,
+        }
+        for seq, entity, entity_id, op, data in rows
+    ]
+    return FastJSONResponse(
+        {
+            "changes": changes,
+            "next_since": rows[-1][0] if rows else since,
+            "has_more": has_more,
+            "latest_seq": latest_seq(db),
+        }
+    )
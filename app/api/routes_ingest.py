@@ -0,0 +1,81 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db, get_read_db
+from app.core.config import get_settings
+from app.db.models import Playlist, PlaylistTrack
+
+
+router = APIRouter(prefix="/playlists", tags=["playlists"])
+
+
+class IngestPlaylistPayload(BaseModel):
+    playlist_id: str
+
+
+def _playlist_summary(db: Session, playlist: Playlist) -> dict:
+    track_count = (
+        db.query(PlaylistTrack)
+        .filter(PlaylistTrack.playlist_id == playlist.id)
+        .count()
+    )
+    return {
+        "id": playlist.id,
+        "spotify_id": playlist.spotify_id,
+        "name": playlist.name,
+        "track_count": track_count,
+    }
+
+
+def _job_summary(db: Session, job) -> dict:
+    playlist = None
+    if job.result_playlist_id is not None:
+        found = db.get(Playlist, job.result_playlist_id)
+        playlist = _playlist_summary(db, found) if found else None
+    return {
+        "job_id": job.id,
+        "playlist_id": job.playlist_id,
+        "status": job.status,
+        "attempts": job.attempts,
+        "last_error": job.last_error,
+        "playlist": playlist,
+    }
+
+
+@router.post("/ingest")
+def ingest_playlist_from_spotify(
+    payload: IngestPlaylistPayload,
+    db: Session = Depends(get_db),
+):
+    settings = get_settings()
+    if settings.ingest_mode == "queue":
+        # API workers only record the request; python -m app.worker runs it.
+        from app.worker.queue import enqueue
+
+        job = enqueue(db, payload.playlist_id, settings.job_max_attempts)
+        return JSONResponse(_job_summary(db, job), status_code=202)
+
+    # Imported on first ingest: the ETL stack (pandas, requests) is heavy
+    # and read-only workers should never pay for it at boot.
+    from app.etl.pipeline import SpotifyETLPipeline
+    from app.etl.spotify_client import SpotifyClient
+
+    client = SpotifyClient()
+    pipeline = SpotifyETLPipeline(client=client)
+    playlist = pipeline.ingest_playlist(db=db, playlist_id=payload.playlist_id)
+    return _playlist_summary(db, playlist)
+
+
+@router.get("/ingest/jobs/{job_id}")
+def get_ingest_job(job_id: int, db: Session = Depends(get_read_db)):
+    # A read: polling must not renew the read-after-write pin. Right after
+    # enqueueing, the pin set by POST /ingest still routes this to the
+    # primary.
+    from app.worker.queue import get_job
+
+    job = get_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_summary(db, job)
@@ -1,98 +1,166 @@
-from typing import List
-
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-
-from app.api.deps import get_db
-from app.db.models import Playlist, PlaylistTrack, Track
-from app.etl.pipeline import SpotifyETLPipeline
-from app.etl.spotify_client import SpotifyClient
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.orm import Query as OrmQuery, Session
+
+from app.analytics.similarity import get_similar_playlists
+from app.api.deps import get_read_db, get_snapshot
+from app.api.http_cache import TOTAL_COUNT_HEADER, cached_json_response
+from app.api.responses import stream_json_array
+from app.api.track_rows import TRACK_COLUMNS, track_rows, with_genius_links
+from app.core.config import get_settings
+from app.db.models import Artist, Playlist, PlaylistTrack, Track
+from app.db.snapshot import CatalogSnapshot
+from app.schemas.playlist import SimilarPlaylist
 from app.schemas.track import TrackBase
-from app.utils.genius import build_genius_url
-from pydantic import BaseModel
 
 
 router = APIRouter(prefix="/playlists", tags=["playlists"])
 
 
-class IngestPlaylistPayload(BaseModel):
-    playlist_id: str
-
-
-@router.post("/ingest")
-def ingest_playlist_from_spotify(
-    payload: IngestPlaylistPayload,
-    db: Session = Depends(get_db),
-):
-    client = SpotifyClient()
-    pipeline = SpotifyETLPipeline(client=client)
-    playlist = pipeline.ingest_playlist(db=db, playlist_id=payload.playlist_id)
-    track_count = (
-        db.query(PlaylistTrack)
-        .filter(PlaylistTrack.playlist_id == playlist.id)
-        .count()
-    )
-    return {
-        "id": playlist.id,
-        "spotify_id": playlist.spotify_id,
-        "name": playlist.name,
-        "track_count": track_count,
-    }
-
-
 @router.get("/", response_model=list[dict])
-def list_playlists(db: Session = Depends(get_db)):
-    playlists = db.query(Playlist).all()
-    result = []
-    for p in playlists:
+def list_playlists(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db),
+    snapshot: Optional[CatalogSnapshot] = Depends(get_snapshot),
+):
+    if snapshot is not None:
+        rows = snapshot.playlists(offset, limit)
+        total = snapshot.playlist_count()
+    else:
+        # Per-row correlated count: an index-only lookup per playlist on the
+        # page instead of one extra round trip per playlist.
         track_count = (
-            db.query(PlaylistTrack)
-            .filter(PlaylistTrack.playlist_id == p.id)
-            .count()
+            select(func.count())
+            .where(PlaylistTrack.playlist_id == Playlist.id)
+            .scalar_subquery()
         )
+        q = (
+            db.query(
+                Playlist.id,
+                Playlist.spotify_id,
+                Playlist.name,
+                Playlist.description,
+                Playlist.owner_display_name,
+                Playlist.is_curated,
+                track_count,
+            )
+            .order_by(Playlist.id)
+            .offset(offset)
+        )
+        if limit is not None:
+            q = q.limit(limit)
+        rows = q.all()
+        total = db.query(func.count(Playlist.id)).scalar()
+
+    result = []
+    for id_, spotify_id, name, description, owner, is_curated, count in rows:
         result.append(
             {
-                "id": p.id,
-                "spotify_id": p.spotify_id,
-                "name": p.name,
-                "description": p.description,
-                "owner_display_name": p.owner_display_name,
-                "is_curated": p.is_curated,
-                "track_count": track_count,
+                "id": id_,
+                "spotify_id": spotify_id,
+                "name": name,
+                "description": description,
+                "owner_display_name": owner,
+                "is_curated": is_curated,
+                "track_count": count,
             }
         )
-    return result
+    return cached_json_response(request, result, {TOTAL_COUNT_HEADER: str(total)})
 
 
 @router.get("/{playlist_id}/tracks", response_model=List[TrackBase])
-def get_playlist_tracks(playlist_id: int, db: Session = Depends(get_db)) -> List[TrackBase]:
-    playlist = db.query(Playlist).filter(Playlist.id == playlist_id).one_or_none()
-    if not playlist:
+def get_playlist_tracks(
+    playlist_id: int,
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db),
+    snapshot: Optional[CatalogSnapshot] = Depends(get_snapshot),
+):
+    settings = get_settings()
+    batch_rows = settings.json_stream_batch_rows
+    # Playlists newer than the snapshot fall through to the database.
+    found = snapshot.playlist_tracks(playlist_id, offset, limit) if snapshot else None
+    if found is not None:
+        rows, total = found
+        headers = {TOTAL_COUNT_HEADER: str(total)}
+        if len(rows) > settings.json_stream_min_rows:
+            return _stream_tracks(_snapshot_batches(rows, batch_rows), headers)
+        return cached_json_response(request, track_rows(rows), headers)
+
+    exists = db.query(Playlist.id).filter(Playlist.id == playlist_id).first()
+    if not exists:
         raise HTTPException(status_code=404, detail="Playlist not found")
 
+    total = (
+        db.query(func.count())
+        .select_from(PlaylistTrack)
+        .filter(PlaylistTrack.playlist_id == playlist_id)
+        .scalar()
+    )
     q = (
-        db.query(Track)
-        .join(PlaylistTrack, PlaylistTrack.track_id == Track.id)
+        with_genius_links(
+            db.query(*TRACK_COLUMNS)
+            .join(PlaylistTrack, PlaylistTrack.track_id == Track.id)
+            .join(Artist, Artist.id == Track.artist_id)
+        )
         .filter(PlaylistTrack.playlist_id == playlist_id)
-        .order_by(Track.name.asc())
+        .order_by(Track.name.asc(), Track.id.asc())
+        .offset(offset)
+    )
+    if limit is not None:
+        q = q.limit(limit)
+
+    headers = {TOTAL_COUNT_HEADER: str(total)}
+    remaining = max(0, total - offset)
+    page_rows = remaining if limit is None else min(limit, remaining)
+    if page_rows > settings.json_stream_min_rows:
+        return _stream_tracks(_cursor_batches(db, q, batch_rows), headers)
+    return cached_json_response(request, track_rows(q.all()), headers)
+
+
+def _stream_tracks(
+    batches: Iterator[List[Dict[str, Any]]], headers: Dict[str, str]
+) -> StreamingResponse:
+    # No ETag: it would need the whole body before the first byte.
+    return StreamingResponse(
+        stream_json_array(batches), media_type="application/json", headers=headers
     )
 
-    items: List[TrackBase] = []
-    for t in q.all():
-        artist_name = t.artist.name if t.artist else ""
-        genius_url = build_genius_url(artist_name, t.name)
-        items.append(
-            TrackBase(
-                id=t.id,
-                spotify_id=t.spotify_id,
-                name=t.name,
-                album_name=t.album_name,
-                artist_name=artist_name,
-                duration_ms=t.duration_ms,
-                genius_url=genius_url,
-            )
-        )
-    return items
+
+def _snapshot_batches(rows: Sequence[tuple], size: int) -> Iterator[List[Dict[str, Any]]]:
+    for start in range(0, len(rows), size):
+        yield track_rows(rows[start : start + size])
 
 
+def _cursor_batches(db: Session, q: OrmQuery, size: int) -> Iterator[List[Dict[str, Any]]]:
+    """
+    ``track_rows`` batches fetched ``size`` rows at a time (a server-side
+    cursor on PostgreSQL). The request's session has been closed by the
+    time the body is sent, so this checks a connection out again and
+    returns it when the stream ends.
+    """
+    try:
+        result = db.execute(q.statement.execution_options(yield_per=size))
+        for rows in result.partitions():
+            yield track_rows(rows)
+    finally:
+        db.close()
 
+
+@router.get("/{playlist_id}/similar", response_model=List[SimilarPlaylist])
+def get_similar(
+    playlist_id: int,
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+):
+    # Served from the precomputed playlist_similarity cache.
+    exists = db.query(Playlist.id).filter(Playlist.id == playlist_id).first()
+    if not exists:
+        raise HTTPException(status_code=404, detail="Playlist not found")
+    return get_similar_playlists(db, playlist_id, limit)
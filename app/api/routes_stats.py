@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.analytics.stats import get_catalog_stats, get_playlist_stats, get_top_artists
+from app.api.deps import get_read_db
+from app.schemas.stats import CatalogStatsOut, PlaylistStatsOut
+
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+
+@router.get("", response_model=CatalogStatsOut)
+def catalog_stats(
+    top: int = Query(10, ge=0, le=100),
+    db: Session = Depends(get_read_db),
+):
+    # Read from the maintained summary tables; no scans of the catalog.
+    stats = get_catalog_stats(db)
+    stats["top_artists"] = get_top_artists(db, top) if top else []
+    return stats
+
+
+@router.get("/playlists/{playlist_id}", response_model=PlaylistStatsOut)
+def playlist_stats(playlist_id: int, db: Session = Depends(get_read_db)):
+    stats = get_playlist_stats(db, playlist_id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="Playlist not found")
+    return stats
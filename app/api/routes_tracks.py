@@ -1,45 +1,85 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Literal, Optional
 
 from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
+from app.api.deps import get_read_db
+from app.api.responses import FastJSONResponse
+from app.api.track_facets import TrackFilters, facet_counts
+from app.api.track_rows import TRACK_COLUMNS, track_rows, with_genius_links
 from app.db.models import Track, Artist
-from app.schemas.track import TrackBase, TrackSearchResponse
-from app.utils.genius import build_genius_url
+from app.schemas.track import TrackSearchResponse
 
 router = APIRouter(prefix="/tracks", tags=["tracks"])
 
 
+# Each sort is backed by an index: ix_tracks_name, ix_tracks_duration_ms
+# and ix_tracks_album_name (ix_tracks_artist_id_name when filtering by
+# artist). Track id breaks ties so pages are stable.
+_SORTS = {
+    "name": (Track.name.asc(), Track.id.asc()),
+    "-name": (Track.name.desc(), Track.id.desc()),
+    "duration": (Track.duration_ms.asc(), Track.id.asc()),
+    "-duration": (Track.duration_ms.desc(), Track.id.desc()),
+    "album": (Track.album_name.asc(), Track.id.asc()),
+}
+
+
 @router.get("/search", response_model=TrackSearchResponse)
 def search_tracks(
     q: Optional[str] = Query(None, description="Free-text search term"),
-    limit: int = 50,
-    db: Session = Depends(get_db),
-) -> TrackSearchResponse:
-    query = db.query(Track).join(Artist)
-    if q:
-        like_pattern = f"%{q.lower()}%"
-        query = query.filter(
-            Track.name.ilike(like_pattern) | Artist.name.ilike(like_pattern)
-        )
-    # No popularity; just sort by track name for deterministic ordering
-    query = query.order_by(Track.name.asc()).limit(limit)
-
-    items: List[TrackBase] = []
-    for t in query.all():
-        artist_name = t.artist.name if t.artist else ""
-        genius_url = build_genius_url(artist_name, t.name)
-        items.append(
-            TrackBase(
-                id=t.id,
-                spotify_id=t.spotify_id,
-                name=t.name,
-                album_name=t.album_name,
-                artist_name=artist_name,
-                duration_ms=t.duration_ms,
-                genius_url=genius_url,
-            )
+    artist_id: List[int] = Query([], description="Only tracks by these artists"),
+    album: List[str] = Query([], description="Only tracks on these albums"),
+    min_duration_ms: Optional[int] = Query(None, ge=0),
+    max_duration_ms: Optional[int] = Query(None, ge=0),
+    playlist_id: List[int] = Query([], description="Only tracks in these playlists"),
+    added_after: Optional[datetime] = Query(
+        None, description="Only tracks added to a playlist at or after this time"
+    ),
+    added_before: Optional[datetime] = Query(
+        None, description="Only tracks added to a playlist before this time"
+    ),
+    sort: Literal["name", "-name", "duration", "-duration", "album"] = Query("name"),
+    facets: bool = Query(False, description="Also return facet counts"),
+    limit: int = Query(50, ge=1, le=500),
+    collapse: bool = Query(
+        False, description="Return one track per canonical song (hide duplicates)"
+    ),
+    db: Session = Depends(get_read_db),
+):
+    filters = TrackFilters(
+        q=q,
+        artist_ids=artist_id,
+        albums=album,
+        min_duration_ms=min_duration_ms,
+        max_duration_ms=max_duration_ms,
+        playlist_ids=playlist_id,
+        added_after=added_after,
+        added_before=added_before,
+        dialect=db.get_bind().dialect.name,
+    )
+    conditions = filters.conditions()
+
+    query = with_genius_links(
+        db.query(*TRACK_COLUMNS).join(Artist, Artist.id == Track.artist_id)
+    )
+    query = query.filter(*conditions)
+    if collapse:
+        # Lowest matching track id per song group; ungrouped tracks stand
+        # alone. Groups are precomputed, so this is a GROUP BY, not a join.
+        representatives = (
+            select(func.min(Track.id))
+            .join(Artist, Artist.id == Track.artist_id)
+            .where(*conditions)
+            .group_by(func.coalesce(Track.song_group_id, -Track.id))
         )
-    return TrackSearchResponse(total=len(items), items=items)
+        query = query.filter(Track.id.in_(representatives))
+    query = query.order_by(*_SORTS[sort]).limit(limit)
 
+    items = track_rows(query.all())
+    content = {"total": len(items), "items": items}
+    if facets:
+        content["facets"] = facet_counts(db, filters)
+    return FastJSONResponse(content)
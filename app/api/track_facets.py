@@ -0,0 +1,208 @@
+"""
+Server-side filters and facet counts for ``/tracks/search``.
+
+Filters combine with AND across dimensions and OR within one (several
+``artist_id`` values match any of those artists). Playlist membership and
+the ``added_at`` window are an ``IN (SELECT track_id ...)`` on
+``playlist_tracks``, which the planner can drive from its primary key or
+``ix_playlist_tracks_playlist_id_added_at`` instead of probing per track.
+
+Facets are disjunctive: each dimension is counted under every filter
+except its own, so a client can show how many tracks the other values of
+an already-selected facet would add. All dimensions are computed by a
+single ``UNION ALL`` statement of grouped, top-N branches.
+
+The free-text term is an ``ILIKE`` on Postgres and a lookup in the FTS5
+trigram index (``app.db.search``) on SQLite.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, FrozenSet, List, Optional, Sequence
+
+from sqlalchemy import (
+    String,
+    case,
+    cast,
+    extract,
+    func,
+    literal,
+    literal_column,
+    select,
+    union_all,
+)
+from sqlalchemy.orm import Session
+
+from app.db.models import Artist, Playlist, PlaylistTrack, Track
+from app.db.search import matching_track_ids
+
+ARTIST = "artist"
+ALBUM = "album"
+DURATION = "duration"
+PLAYLIST = "playlist"
+ADDED = "added_year"
+FACETS = (ARTIST, ALBUM, DURATION, PLAYLIST, ADDED)
+_MEMBERSHIP = frozenset({PLAYLIST, ADDED})
+
+# Lower bounds of the duration facet buckets, in ms (last one is open).
+DURATION_BUCKETS_MS = (0, 120_000, 180_000, 240_000, 300_000, 420_000)
+
+
+def _bucket_label(lower: int) -> str:
+    edges = list(DURATION_BUCKETS_MS)
+    i = edges.index(lower)
+    if i + 1 == len(edges):
+        return f"{lower // 60_000}+ min"
+    return f"{lower // 60_000}-{edges[i + 1] // 60_000} min"
+
+
+@dataclass(frozen=True)
+class TrackFilters:
+    q: Optional[str] = None
+    artist_ids: Sequence[int] = ()
+    albums: Sequence[str] = ()
+    min_duration_ms: Optional[int] = None
+    max_duration_ms: Optional[int] = None
+    playlist_ids: Sequence[int] = ()
+    added_after: Optional[datetime] = None
+    added_before: Optional[datetime] = None
+    # Name of the session's dialect; picks the free-text strategy.
+    dialect: str = ""
+
+    def membership_conditions(self, skip: FrozenSet[str] = frozenset()) -> list:
+        """Conditions on a ``PlaylistTrack`` row."""
+        conditions = []
+        if self.playlist_ids and PLAYLIST not in skip:
+            conditions.append(PlaylistTrack.playlist_id.in_(self.playlist_ids))
+        if ADDED not in skip:
+            if self.added_after is not None:
+                conditions.append(PlaylistTrack.added_at >= self.added_after)
+            if self.added_before is not None:
+                conditions.append(PlaylistTrack.added_at < self.added_before)
+        return conditions
+
+    def conditions(self, skip: FrozenSet[str] = frozenset()) -> list:
+        """
+        WHERE conditions on ``tracks`` joined to ``artists``, leaving out
+        the dimensions in ``skip``.
+        """
+        conditions = []
+        if self.q:
+            indexed = matching_track_ids(self.q) if self.dialect == "sqlite" else None
+            if indexed is not None:
+                conditions.append(Track.id.in_(indexed))
+            else:
+                pattern = f"%{self.q.lower()}%"
+                conditions.append(Track.name.ilike(pattern) | Artist.name.ilike(pattern))
+        if self.artist_ids and ARTIST not in skip:
+            conditions.append(Track.artist_id.in_(self.artist_ids))
+        if self.albums and ALBUM not in skip:
+            conditions.append(Track.album_name.in_(self.albums))
+        if DURATION not in skip:
+            if self.min_duration_ms is not None:
+                conditions.append(Track.duration_ms >= self.min_duration_ms)
+            if self.max_duration_ms is not None:
+                conditions.append(Track.duration_ms <= self.max_duration_ms)
+        membership = self.membership_conditions(skip)
+        if membership:
+            conditions.append(
+                Track.id.in_(select(PlaylistTrack.track_id).where(*membership))
+            )
+        return conditions
+
+
+def _tracks(*columns):
+    return select(*columns).select_from(Track).join(Artist, Artist.id == Track.artist_id)
+
+
+def facet_counts(db: Session, filters: TrackFilters, top: int = 20) -> Dict[str, List[dict]]:
+    """
+    ``{dimension: [{"value", "label", "count"}, ...]}`` with the ``top``
+    largest values per dimension (all duration buckets), in one query.
+    """
+    track_count = func.count(Track.id)
+    # Inlined constants, not bind parameters: the expression is repeated in
+    # GROUP BY and must match the select list textually on Postgres.
+    bucket = case(
+        *[
+            (Track.duration_ms >= literal_column(str(lower)), literal_column(str(lower)))
+            for lower in reversed(DURATION_BUCKETS_MS[1:])
+        ],
+        else_=literal_column("0"),
+    )
+    distinct_tracks = func.count(func.distinct(PlaylistTrack.track_id))
+    # Membership facets count the joined rows, so both membership filters
+    # move from the IN subquery onto the join.
+    joined = _tracks().join(PlaylistTrack, PlaylistTrack.track_id == Track.id)
+    branches = [
+        _tracks(
+            literal(ARTIST).label("facet"),
+            cast(Artist.id, String).label("value"),
+            Artist.name.label("label"),
+            track_count.label("count"),
+        )
+        .where(*filters.conditions(frozenset({ARTIST})))
+        .group_by(Artist.id, Artist.name)
+        .order_by(track_count.desc(), Artist.id)
+        .limit(top),
+        _tracks(
+            literal(ALBUM).label("facet"),
+            Track.album_name.label("value"),
+            Track.album_name.label("label"),
+            track_count.label("count"),
+        )
+        .where(*filters.conditions(frozenset({ALBUM})))
+        .group_by(Track.album_name)
+        .order_by(track_count.desc(), Track.album_name)
+        .limit(top),
+        _tracks(
+            literal(DURATION).label("facet"),
+            cast(bucket, String).label("value"),
+            cast(bucket, String).label("label"),
+            track_count.label("count"),
+        )
+        .where(*filters.conditions(frozenset({DURATION})))
+        .group_by(bucket),
+        joined.join(Playlist, Playlist.id == PlaylistTrack.playlist_id)
+        .with_only_columns(
+            literal(PLAYLIST).label("facet"),
+            cast(Playlist.id, String).label("value"),
+            Playlist.name.label("label"),
+            distinct_tracks.label("count"),
+        )
+        .where(
+            *filters.conditions(_MEMBERSHIP),
+            *filters.membership_conditions(frozenset({PLAYLIST})),
+        )
+        .group_by(Playlist.id, Playlist.name)
+        .order_by(distinct_tracks.desc(), Playlist.id)
+        .limit(top),
+        joined.with_only_columns(
+            literal(ADDED).label("facet"),
+            cast(extract("year", PlaylistTrack.added_at), String).label("value"),
+            cast(extract("year", PlaylistTrack.added_at), String).label("label"),
+            distinct_tracks.label("count"),
+        )
+        .where(
+            *filters.conditions(_MEMBERSHIP),
+            *filters.membership_conditions(frozenset({ADDED})),
+            PlaylistTrack.added_at.is_not(None),
+        )
+        .group_by(extract("year", PlaylistTrack.added_at))
+        .order_by(extract("year", PlaylistTrack.added_at).desc())
+        .limit(top),
+    ]
+    # Wrapped as subqueries: SQLite rejects ORDER BY/LIMIT on bare
+    # compound-select members.
+    statement = union_all(*[select(b.subquery()) for b in branches])
+
+    facets: Dict[str, List[dict]] = {name: [] for name in FACETS}
+    for facet, value, label, count in db.execute(statement):
+        facets[facet].append({"value": value, "label": label, "count": count})
+    facets[DURATION] = sorted(
+        (
+            {**item, "label": _bucket_label(int(item["value"]))}
+            for item in facets[DURATION]
+        ),
+        key=lambda item: int(item["value"]),
+    )
+    return facets
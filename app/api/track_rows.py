@@ -0,0 +1,78 @@
+"""
+Lean read path for track listings.
+
+Rows are selected as plain columns (no ORM identity map, no lazy
+``Track.artist`` loads), turned into dicts once, validated in a single
+bulk pass against ``TrackRow`` and handed to ``FastJSONResponse`` without
+FastAPI re-validating them against the ``response_model``.
+
+Genius links come from the ``genius_links`` cache (outer-join it with
+``with_genius_links``): a verified link is served as its canonical URL, a
+known-missing one as "", and unchecked tracks get the guessed URL.
+"""
+from typing import Any, Dict, Iterable, List, Optional
+
+from pydantic import TypeAdapter
+
+from app.db.models import Artist, GeniusLink, Track
+from app.schemas.track import TrackRow
+from app.utils.genius import build_genius_url
+
+TRACK_COLUMNS = (
+    Track.id,
+    Track.spotify_id,
+    Track.name,
+    Track.album_name,
+    Artist.name.label("artist_name"),
+    Track.duration_ms,
+    GeniusLink.status.label("genius_status"),
+    GeniusLink.canonical_url,
+)
+
+_TRACK_ROWS = TypeAdapter(List[TrackRow])
+
+
+def with_genius_links(query):
+    return query.outerjoin(GeniusLink, GeniusLink.track_id == Track.id)
+
+
+def _genius(artist_name: str, name: str, status: Optional[str], canonical: Optional[str]):
+    if status == "verified" and canonical:
+        return canonical, "verified"
+    if status == "missing":
+        return "", "missing"
+    # Unchecked, or the last check failed: fall back to the guess.
+    return build_genius_url(artist_name, name), "unverified"
+
+
+def track_rows(rows: Iterable[Any]) -> List[Dict[str, Any]]:
+    """
+    Build response dicts from ``TRACK_COLUMNS`` result tuples.
+    """
+    items = []
+    for (
+        track_id,
+        spotify_id,
+        name,
+        album_name,
+        artist_name,
+        duration_ms,
+        genius_status,
+        canonical_url,
+    ) in rows:
+        genius_url, genius_status = _genius(
+            artist_name or "", name, genius_status, canonical_url
+        )
+        items.append(
+            {
+                "id": track_id,
+                "spotify_id": spotify_id,
+                "name": name,
+                "album_name": album_name,
+                "artist_name": artist_name or "",
+                "duration_ms": duration_ms,
+                "genius_url": genius_url,
+                "genius_status": genius_status,
+            }
+        )
+    return _TRACK_ROWS.validate_python(items)
@@ -8,21 +8,171 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     app_name: str = Field("Spotify Playlist Catalog", alias="APP_NAME")
     app_env: str = Field("local", alias="APP_ENV")
+    # "all" serves reads and inline ingest; "read" serves read endpoints only
+    # and never loads the ETL stack.
+    app_role: str = Field("all", alias="APP_ROLE")
 
     backend_cors_origins: List[AnyHttpUrl] = Field(
         default_factory=list,
         alias="BACKEND_CORS_ORIGINS",
     )
 
+    # Full SQLAlchemy URL; overrides the POSTGRES_* settings below. A
+    # sqlite:/// URL runs the embedded mode (app.db.session): WAL journal,
+    # one writer connection per process, concurrent readers.
+    database_url_override: str = Field("", alias="DATABASE_URL")
+    sqlite_synchronous: str = Field("NORMAL", alias="SQLITE_SYNCHRONOUS")
+    sqlite_mmap_size_mb: int = Field(256, alias="SQLITE_MMAP_SIZE_MB")
+    sqlite_cache_size_mb: int = Field(64, alias="SQLITE_CACHE_SIZE_MB")
+    # How long a writer waits for the write lock (held by another process)
+    # or for this process's writer connection before failing.
+    sqlite_busy_timeout_seconds: float = Field(30.0, alias="SQLITE_BUSY_TIMEOUT_SECONDS")
+
     postgres_host: str = Field("localhost", alias="POSTGRES_HOST")
     postgres_port: int = Field(5432, alias="POSTGRES_PORT")
     postgres_db: str = Field("spotify_catalog", alias="POSTGRES_DB")
     postgres_user: str = Field("task_user", alias="POSTGRES_USER")
     postgres_password: str = Field("task_password", alias="POSTGRES_PASSWORD")
+    # Optional streaming replica for read endpoints. Clients that just wrote
+    # are pinned to the primary for the read-after-write window so they do
+    # not read behind their own ingest while the replica catches up.
+    database_read_url: str = Field("", alias="DATABASE_READ_URL")
+    read_after_write_window_seconds: float = Field(
+        5.0, alias="READ_AFTER_WRITE_WINDOW_SECONDS"
+    )
+    # Hash partitions for playlist_tracks on Postgres, applied when migration
+    # 0007 rewrites the table; 0 keeps a single heap.
+    playlist_tracks_partitions: int = Field(0, alias="PLAYLIST_TRACKS_PARTITIONS")
 
     spotify_client_id: str = Field("", alias="SPOTIFY_CLIENT_ID")
     spotify_client_secret: str = Field("", alias="SPOTIFY_CLIENT_SECRET")
     spotify_country_market: str = Field("US", alias="SPOTIFY_COUNTRY_MARKET")
+    # Point these at app.etl.fake_spotify_server for offline runs.
+    spotify_api_base: str = Field("https://api.spotify.com/v1", alias="SPOTIFY_API_BASE")
+    spotify_token_url: str = Field(
+        "https://accounts.spotify.com/api/token", alias="SPOTIFY_TOKEN_URL"
+    )
+
+    # Client-side rate limiting of api.spotify.com calls. When shared, the
+    # token bucket lives in a lock-guarded state file so every worker and
+    # ingest process on the host draws from the same budget.
+    spotify_rate_limit_per_second: float = Field(
+        10.0, alias="SPOTIFY_RATE_LIMIT_PER_SECOND"
+    )
+    spotify_rate_limit_burst: int = Field(10, alias="SPOTIFY_RATE_LIMIT_BURST")
+    spotify_rate_limit_shared: bool = Field(True, alias="SPOTIFY_RATE_LIMIT_SHARED")
+    spotify_rate_limit_state_file: str = Field(
+        "", alias="SPOTIFY_RATE_LIMIT_STATE_FILE"
+    )
+    spotify_max_retries: int = Field(3, alias="SPOTIFY_MAX_RETRIES")
+    # Compressed on-disk cache of raw API responses (app.etl.payload_cache),
+    # revalidated with If-None-Match; "" disables it. SPOTIFY_OFFLINE serves
+    # ingests from that cache only, without touching the network.
+    spotify_payload_cache_dir: str = Field("", alias="SPOTIFY_PAYLOAD_CACHE_DIR")
+    spotify_offline: bool = Field(False, alias="SPOTIFY_OFFLINE")
+
+    # Genius link verification (python -m app.etl.genius_links verify).
+    # Verified and missing results are cached for the TTL; errors (timeouts,
+    # 5xx, 429) are retried after GENIUS_ERROR_RETRY_SECONDS.
+    genius_verify_concurrency: int = Field(8, alias="GENIUS_VERIFY_CONCURRENCY")
+    genius_verify_rate_per_second: float = Field(
+        5.0, alias="GENIUS_VERIFY_RATE_PER_SECOND"
+    )
+    genius_request_timeout_seconds: float = Field(
+        10.0, alias="GENIUS_REQUEST_TIMEOUT_SECONDS"
+    )
+    genius_link_ttl_days: float = Field(30.0, alias="GENIUS_LINK_TTL_DAYS")
+    genius_error_retry_seconds: float = Field(3600.0, alias="GENIUS_ERROR_RETRY_SECONDS")
+
+    # "inline" runs ingest inside the API request; "queue" only enqueues an
+    # ingest_jobs row for the worker pool (python -m app.worker).
+    ingest_mode: str = Field("inline", alias="INGEST_MODE")
+    worker_processes: int = Field(2, alias="WORKER_PROCESSES")
+    worker_poll_interval_seconds: float = Field(1.0, alias="WORKER_POLL_INTERVAL_SECONDS")
+    # A claimed job is leased for this long and the lease is renewed by
+    # heartbeats; jobs whose lease lapses (crashed worker) are retried.
+    job_visibility_timeout_seconds: float = Field(
+        300.0, alias="JOB_VISIBILITY_TIMEOUT_SECONDS"
+    )
+    job_max_attempts: int = Field(5, alias="JOB_MAX_ATTEMPTS")
+    job_retry_backoff_seconds: float = Field(10.0, alias="JOB_RETRY_BACKOFF_SECONDS")
+
+    # Logging (app.core.logging_config): "json" (one object per line) or
+    # "text". DEBUG records are sampled at LOG_DEBUG_SAMPLE_RATE; records
+    # beyond LOG_QUEUE_SIZE waiting for the writer thread are dropped.
+    log_level: str = Field("INFO", alias="LOG_LEVEL")
+    log_format: str = Field("json", alias="LOG_FORMAT")
+    log_debug_sample_rate: float = Field(0.01, alias="LOG_DEBUG_SAMPLE_RATE")
+    log_queue_size: int = Field(10_000, alias="LOG_QUEUE_SIZE")
+
+    # Tracing (app.core.tracing): fraction of requests / jobs whose spans are
+    # exported; 0 disables span recording (trace ids still reach the logs).
+    tracing_sample_rate: float = Field(0.0, alias="TRACING_SAMPLE_RATE")
+    # "file" (JSON lines at TRACING_FILE) or "http" (POST to TRACING_ENDPOINT)
+    tracing_exporter: str = Field("file", alias="TRACING_EXPORTER")
+    tracing_file: str = Field("traces.jsonl", alias="TRACING_FILE")
+    tracing_endpoint: str = Field("", alias="TRACING_ENDPOINT")
+
+    # SQL profiling (app.core.query_profiler): per-request statement counts
+    # and time in a Server-Timing header, a warning for requests issuing
+    # more than SQL_QUERY_BUDGET statements (0 = no budget), and a log line
+    # (with the query plan, if enabled) for statements over SQL_SLOW_QUERY_MS.
+    sql_profiling: bool = Field(True, alias="SQL_PROFILING")
+    sql_query_budget: int = Field(0, alias="SQL_QUERY_BUDGET")
+    sql_slow_query_ms: float = Field(500.0, alias="SQL_SLOW_QUERY_MS")
+    sql_explain_slow_queries: bool = Field(False, alias="SQL_EXPLAIN_SLOW_QUERIES")
+
+    # Memory-mapped catalog snapshot (python -m app.db.snapshot build). When
+    # set, playlist reads are served from the file instead of the database;
+    # a newly published file is picked up within the check interval.
+    catalog_snapshot_path: str = Field("", alias="CATALOG_SNAPSHOT_PATH")
+    catalog_snapshot_check_seconds: float = Field(
+        5.0, alias="CATALOG_SNAPSHOT_CHECK_SECONDS"
+    )
+
+    # Startup warmup and readiness (app.api.readiness). The lifespan warms
+    # the process in the background (connection pools, mappers, the
+    # WARMUP_PATHS requests, a Spotify token); /readyz reports ready once
+    # that is done and the last database check, repeated every
+    # READINESS_CHECK_INTERVAL_SECONDS, passed.
+    warmup_enabled: bool = Field(True, alias="WARMUP_ENABLED")
+    warmup_paths: List[str] = Field(
+        default_factory=lambda: [
+            "/playlists/?limit=50",
+            "/tracks/search?q=love&limit=50",
+            "/stats",
+        ],
+        alias="WARMUP_PATHS",
+    )
+    warmup_pool_connections: int = Field(5, alias="WARMUP_POOL_CONNECTIONS")
+    readiness_check_interval_seconds: float = Field(
+        5.0, alias="READINESS_CHECK_INTERVAL_SECONDS"
+    )
+
+    # Response compression (app.api.compression): brotli when the client
+    # accepts it and Brotli is installed, else gzip. Bodies of known length
+    # under RESPONSE_COMPRESSION_MIN_BYTES are sent uncompressed.
+    response_compression: bool = Field(True, alias="RESPONSE_COMPRESSION")
+    response_compression_min_bytes: int = Field(1024, alias="RESPONSE_COMPRESSION_MIN_BYTES")
+    response_gzip_level: int = Field(6, alias="RESPONSE_GZIP_LEVEL")
+    response_brotli_quality: int = Field(4, alias="RESPONSE_BROTLI_QUALITY")
+    # Track listings of more than JSON_STREAM_MIN_ROWS rows are streamed off
+    # the cursor, JSON_STREAM_BATCH_ROWS at a time, instead of being built
+    # in memory (and so carry no ETag).
+    json_stream_min_rows: int = Field(1000, alias="JSON_STREAM_MIN_ROWS")
+    json_stream_batch_rows: int = Field(500, alias="JSON_STREAM_BATCH_ROWS")
+
+    # Similar-playlist cache (app.analytics.similarity). Full rebuilds switch
+    # from exact sparse products to MinHash/LSH above the playlist threshold.
+    similarity_top_k: int = Field(20, alias="SIMILARITY_TOP_K")
+    similarity_exact_max_playlists: int = Field(
+        20_000, alias="SIMILARITY_EXACT_MAX_PLAYLISTS"
+    )
+    similarity_minhash_permutations: int = Field(
+        128, alias="SIMILARITY_MINHASH_PERMUTATIONS"
+    )
+    # 64 bands x 2 rows: pairs above roughly 0.15 Jaccard become candidates.
+    similarity_minhash_bands: int = Field(64, alias="SIMILARITY_MINHASH_BANDS")
 
     # Used only by the Streamlit dashboard; harmless in backend
     streamlit_backend_url: AnyHttpUrl | None = Field(
@@ -36,6 +186,8 @@ class Settings(BaseSettings):
 
     @property
     def database_url(self) -> str:
+        if self.database_url_override:
+            return self.database_url_override
         return (
             f"postgresql://{self.postgres_user}:{self.postgres_password}"
             f"@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
@@ -1,12 +1,163 @@
+"""
+Logging setup shared by the API, the workers and the CLIs.
+
+Callers only enqueue records: a ``QueueHandler`` on the root logger formats
+the message in the calling thread, and a ``QueueListener`` thread does the
+encoding and the write. A slow stdout (a container log pipe, a full disk)
+therefore never stalls request or ingest threads; when the queue is full,
+records are dropped and counted rather than blocking.
+
+Every record carries ``trace_id`` / ``span_id`` (see ``app.core.tracing``),
+and ``extra=`` fields become top-level keys in JSON output. DEBUG records
+are sampled (``LOG_DEBUG_SAMPLE_RATE``) so per-row ETL logs can be switched
+on in production without flooding the sink.
+"""
+import atexit
 import logging
+import logging.handlers
+import queue
+import random
 import sys
+from datetime import datetime, timezone
+from typing import Optional
+
+import orjson
+
+from app.core.tracing import TraceContextFilter
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s [trace=%(trace_id)s] - %(message)s"
+
+# Attributes every LogRecord has; anything else was passed via ``extra=``.
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message",
+    "asctime",
+    "trace_id",
+    "span_id",
+}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        trace_id = getattr(record, "trace_id", "-")
+        if trace_id != "-":
+            entry["trace_id"] = trace_id
+            span_id = getattr(record, "span_id", "-")
+            if span_id != "-":
+                entry["span_id"] = span_id
+        for key, value in vars(record).items():
+            if key not in _RESERVED:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return orjson.dumps(entry, default=str).decode()
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps all records above DEBUG and a ``rate`` fraction of DEBUG ones."""
+
+    def __init__(self, rate: float) -> None:
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or random.random() < self.rate
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Drops (and counts) records when the queue is full instead of blocking,
+    and keeps tracebacks out of ``msg`` so formatters can place them.
+    """
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render the message and traceback now, in the calling thread: args
+        # may be mutated and exc_info cannot be handed across threads safely.
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_handler: Optional[NonBlockingQueueHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure_logging(
+    level: Optional[str] = None,
+    fmt: Optional[str] = None,
+    debug_sample_rate: Optional[float] = None,
+    stream=None,
+) -> NonBlockingQueueHandler:
+    """
+    Install the queue handler on the root logger (replacing one installed
+    by an earlier call). Arguments default to the ``LOG_*`` settings.
+    """
+    global _handler, _listener
+    from app.core.config import get_settings
+
+    settings = get_settings()
+    level = (level or settings.log_level).upper()
+    fmt = fmt or settings.log_format
+    if debug_sample_rate is None:
+        debug_sample_rate = settings.log_debug_sample_rate
+
+    stop_logging()
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(LOG_FORMAT))
+
+    handler = NonBlockingQueueHandler(queue.Queue(settings.log_queue_size))
+    # On the handler rather than a logger so records from every logger
+    # (ours, uvicorn's, SQLAlchemy's) carry the trace id. The filters run
+    # in the calling thread, where the trace context lives.
+    handler.addFilter(TraceContextFilter())
+    if debug_sample_rate < 1:
+        handler.addFilter(SamplingFilter(debug_sample_rate))
+
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(level)
+    _listener = logging.handlers.QueueListener(handler.queue, output)
+    _listener.start()
+    _handler = handler
+    return handler
+
 
-LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s - %(message)s"
+def stop_logging() -> None:
+    """Flush queued records and remove the handler installed by ``configure_logging``."""
+    global _handler, _listener
+    if _handler is not None:
+        logging.getLogger().removeHandler(_handler)
+    if _listener is not None:
+        _listener.stop()
+    _handler = _listener = None
 
 
-def configure_logging() -> None:
-    logging.basicConfig(
-        level=logging.INFO,
-        format=LOG_FORMAT,
-        handlers=[logging.StreamHandler(sys.stdout)],
-    )
+atexit.register(stop_logging)
@@ -0,0 +1,159 @@
+"""
+Per-request SQL accounting and slow-statement logging.
+
+``configure_query_profiler`` hooks SQLAlchemy's ``before_cursor_execute``
+and ``after_cursor_execute`` on every engine. Statements run inside a
+``query_scope`` (the API opens one per request) are counted and timed;
+the API reports them in a ``Server-Timing`` header::
+
+    Server-Timing: db;dur=3.4;desc="3 queries", app;dur=5.1
+
+and logs a warning for requests over ``SQL_QUERY_BUDGET``. Any statement
+slower than ``SQL_SLOW_QUERY_MS`` is logged on ``app.sql``, inside a
+request or not, with its query plan when ``SQL_EXPLAIN_SLOW_QUERIES`` is
+on.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional
+
+logger = logging.getLogger("app.sql")
+
+_START_KEY = "_query_profiler_start"
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    duration_ms: float = 0.0
+    # Statement text, kept only while ``record_statements`` is set (tests).
+    statements: List[str] = field(default_factory=list)
+    record_statements: bool = False
+
+
+_scope: ContextVar[Optional[QueryStats]] = ContextVar("query_scope", default=None)
+
+_slow_ms = 500.0
+_explain = False
+_installed = False
+
+
+@contextmanager
+def query_scope(record_statements: bool = False) -> Iterator[QueryStats]:
+    """
+    Count and time the statements executed until the block exits, also
+    from tasks and threadpool calls started inside it (they share the
+    context's ``QueryStats`` object).
+    """
+    stats = QueryStats(record_statements=record_statements)
+    token = _scope.set(stats)
+    try:
+        yield stats
+    finally:
+        _scope.reset(token)
+
+
+def server_timing(stats: QueryStats, total_ms: float) -> str:
+    return (
+        f'db;dur={stats.duration_ms:.1f};desc="{stats.count} queries", '
+        f"app;dur={total_ms:.1f}"
+    )
+
+
+def _explain_plan(cursor, statement: str, parameters) -> Optional[str]:
+    # Reads only: EXPLAIN of a write is harmless on Postgres but pointless.
+    if not statement.lstrip()[:6].upper().startswith(("SELECT", "WITH")):
+        return None
+    # A separate DBAPI cursor: no SQLAlchemy events, and the caller's
+    # pending result set is left alone.
+    dbapi_connection = cursor.connection
+    prefix = (
+        "EXPLAIN QUERY PLAN "
+        if type(dbapi_connection).__module__.startswith("sqlite3")
+        else "EXPLAIN "
+    )
+    explain_cursor = dbapi_connection.cursor()
+    try:
+        explain_cursor.execute(prefix + statement, parameters)
+        return "\n".join(" ".join(str(col) for col in row) for row in explain_cursor.fetchall())
+    except Exception as exc:  # noqa: BLE001 - the plan is best effort
+        return f"(EXPLAIN failed: {exc!r})"
+    finally:
+        explain_cursor.close()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get(_START_KEY)
+    if not starts:
+        return
+    duration_ms = (time.perf_counter() - starts.pop()) * 1000
+    stats = _scope.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration_ms += duration_ms
+        if stats.record_statements:
+            stats.statements.append(statement)
+    if duration_ms >= _slow_ms:
+        plan = None
+        if _explain and not executemany:
+            plan = _explain_plan(cursor, statement, parameters)
+        logger.warning(
+            "Slow query (%.0fms): %s%s",
+            duration_ms,
+            statement[:1000],
+            f"\nplan:\n{plan}" if plan else "",
+            extra={"duration_ms": round(duration_ms, 1), "plan": plan},
+        )
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    starts = conn.info.get(_START_KEY) if conn is not None else None
+    if starts:
+        starts.pop()
+
+
+def configure_query_profiler(
+    enabled: Optional[bool] = None,
+    slow_query_ms: Optional[float] = None,
+    explain: Optional[bool] = None,
+) -> None:
+    """
+    Install (or remove) the engine hooks. Arguments left as None come from
+    settings (``SQL_PROFILING``, ``SQL_SLOW_QUERY_MS``,
+    ``SQL_EXPLAIN_SLOW_QUERIES``).
+    """
+    global _slow_ms, _explain, _installed
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    from app.core.config import get_settings
+
+    settings = get_settings()
+    enabled = settings.sql_profiling if enabled is None else enabled
+    _slow_ms = settings.sql_slow_query_ms if slow_query_ms is None else slow_query_ms
+    _explain = settings.sql_explain_slow_queries if explain is None else explain
+
+    hooks = (
+        ("before_cursor_execute", _before_cursor_execute),
+        ("after_cursor_execute", _after_cursor_execute),
+        ("handle_error", _handle_error),
+    )
+    # Listening on the Engine class covers engines created later too.
+    for name, fn in hooks:
+        if enabled and not event.contains(Engine, name, fn):
+            event.listen(Engine, name, fn)
+        elif not enabled and event.contains(Engine, name, fn):
+            event.remove(Engine, name, fn)
+    _installed = enabled
+
+
+def is_enabled() -> bool:
+    return _installed
@@ -0,0 +1,436 @@
+"""
+Lightweight tracing: nested timing spans, correlated by a per-request (or
+per-job) trace id, exported as JSON lines to a file or an HTTP collector.
+
+    with start_trace("worker.job", job_id=7):
+        with span("etl.transform", rows=120):
+            ...
+
+Every request or job gets a trace id; the logging filter stamps it on
+records whether or not the trace is sampled. Spans are recorded only for
+sampled traces (``TRACING_SAMPLE_RATE``). For unsampled traces ``span()``
+returns a shared no-op after a single context-variable lookup, and the
+per-statement SQL hooks are detached while the sample rate is 0.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_SAFE_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+def new_trace_id() -> str:
+    return os.urandom(16).hex()
+
+
+def clean_trace_id(value: Optional[str]) -> str:
+    """
+    Accept a caller-supplied id (e.g. ``X-Request-ID``) only if it is short
+    and log-safe; otherwise mint a new one.
+    """
+    if value and _SAFE_ID.match(value):
+        return value
+    return new_trace_id()
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "attrs", "start", "_t0", "error")
+
+    def __init__(self, trace_id: str, parent_id: Optional[str], name: str, attrs: Dict[str, Any]):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.attrs = attrs
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        self.error: Optional[str] = None
+
+    sampled = True
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    def finish(self) -> Dict[str, Any]:
+        record = {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round((time.perf_counter() - self._t0) * 1000, 3),
+            "attrs": self.attrs,
+        }
+        if self.error:
+            record["error"] = self.error
+        return record
+
+
+class _NoopSpan:
+    __slots__ = ()
+    sampled = False
+    span_id = None
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _TraceContext:
+    __slots__ = ("trace_id", "sampled", "span")
+
+    def __init__(self, trace_id: str, sampled: bool, span: Optional[Span] = None):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.span = span
+
+
+_context: ContextVar[Optional[_TraceContext]] = ContextVar("trace_context", default=None)
+
+
+def current_trace_id() -> Optional[str]:
+    ctx = _context.get()
+    return ctx.trace_id if ctx is not None else None
+
+
+def current_span_id() -> Optional[str]:
+    ctx = _context.get()
+    return ctx.span.span_id if ctx is not None and ctx.span is not None else None
+
+
+# ---------------------------------------------------------------------------
+# Exporters
+# ---------------------------------------------------------------------------
+
+
+class InMemoryExporter:
+    """Collects finished spans in a list (tests, benchmarks)."""
+
+    def __init__(self) -> None:
+        self.spans: List[Dict[str, Any]] = []
+
+    def export(self, spans: List[Dict[str, Any]]) -> None:
+        self.spans.extend(spans)
+
+    def shutdown(self) -> None:
+        pass
+
+
+class FileExporter:
+    """Appends spans as JSON lines."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def export(self, spans: List[Dict[str, Any]]) -> None:
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.write("".join(json.dumps(s, default=str) + "\n" for s in spans))
+
+    def shutdown(self) -> None:
+        pass
+
+
+class HttpExporter:
+    """POSTs batches of spans as a JSON array to a collector endpoint."""
+
+    def __init__(self, endpoint: str, timeout: float = 5.0) -> None:
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def export(self, spans: List[Dict[str, Any]]) -> None:
+        body = json.dumps(spans, default=str).encode()
+        request = urllib.request.Request(
+            self.endpoint, data=body, headers={"Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+    def shutdown(self) -> None:
+        pass
+
+
+class BatchProcessor:
+    """
+    Hands finished spans to an exporter from a background thread, so
+    request and ingest threads never block on file or network I/O.
+    """
+
+    def __init__(self, exporter, max_batch: int = 512, interval: float = 1.0) -> None:
+        self.exporter = exporter
+        self.max_batch = max_batch
+        self.interval = interval
+        self._queue: "queue.SimpleQueue[Optional[Dict[str, Any]]]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def on_end(self, record: Dict[str, Any]) -> None:
+        self._queue.put(record)
+
+    def _drain(self, first: Optional[Dict[str, Any]]) -> tuple:
+        batch = [] if first is None else [first]
+        stop = first is None
+        while len(batch) < self.max_batch:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                stop = True
+                break
+            batch.append(item)
+        return batch, stop
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            try:
+                first = self._queue.get(timeout=self.interval)
+            except queue.Empty:
+                continue
+            batch, stop = self._drain(first)
+            if batch:
+                try:
+                    self.exporter.export(batch)
+                except Exception:  # noqa: BLE001 - tracing must never break callers
+                    logger.warning("Dropped %d spans: export failed", len(batch), exc_info=True)
+
+    def shutdown(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+        self.exporter.shutdown()
+
+
+class _SyncProcessor:
+    def __init__(self, exporter) -> None:
+        self.exporter = exporter
+
+    def on_end(self, record: Dict[str, Any]) -> None:
+        self.exporter.export([record])
+
+    def shutdown(self) -> None:
+        self.exporter.shutdown()
+
+
+_sample_rate = 0.0
+_processor = None
+
+
+def configure_tracing(
+    sample_rate: Optional[float] = None,
+    exporter=None,
+    batch: bool = True,
+) -> None:
+    """
+    Set the sampling rate and exporter. Without arguments both come from
+    settings (``TRACING_SAMPLE_RATE``, ``TRACING_EXPORTER`` and its target).
+    """
+    global _sample_rate, _processor
+    if sample_rate is None or exporter is None:
+        from app.core.config import get_settings
+
+        settings = get_settings()
+        if sample_rate is None:
+            sample_rate = settings.tracing_sample_rate
+        if exporter is None:
+            if settings.tracing_exporter == "file":
+                exporter = FileExporter(settings.tracing_file)
+            elif settings.tracing_exporter == "http" and settings.tracing_endpoint:
+                exporter = HttpExporter(settings.tracing_endpoint)
+
+    shutdown_tracing()
+    _sample_rate = sample_rate if exporter is not None else 0.0
+    if exporter is not None and _sample_rate > 0:
+        _processor = BatchProcessor(exporter) if batch else _SyncProcessor(exporter)
+    else:
+        _sample_rate = 0.0
+    for engine in list(_engines):
+        _sync_sql_listeners(engine)
+
+
+def shutdown_tracing() -> None:
+    """Flush pending spans and stop exporting."""
+    global _processor, _sample_rate
+    if _processor is not None:
+        _processor.shutdown()
+    _processor = None
+    _sample_rate = 0.0
+    for engine in list(_engines):
+        _sync_sql_listeners(engine)
+
+
+atexit.register(shutdown_tracing)
+
+
+# ---------------------------------------------------------------------------
+# Spans
+# ---------------------------------------------------------------------------
+
+
+@contextmanager
+def _run_span(ctx: _TraceContext, name: str, attrs: Dict[str, Any]) -> Iterator[Span]:
+    parent = ctx.span
+    current = Span(ctx.trace_id, parent.span_id if parent else None, name, attrs)
+    token = _context.set(_TraceContext(ctx.trace_id, True, current))
+    try:
+        yield current
+    except BaseException as exc:
+        current.error = f"{type(exc).__name__}: {exc}"[:500]
+        raise
+    finally:
+        _context.reset(token)
+        processor = _processor
+        if processor is not None:
+            processor.on_end(current.finish())
+
+
+@contextmanager
+def _noop() -> Iterator[_NoopSpan]:
+    yield NOOP_SPAN
+
+
+@contextmanager
+def start_trace(name: str, trace_id: Optional[str] = None, **attrs: Any):
+    """
+    Begin a trace (one request or job) and its root span. The sampling
+    decision is made here and inherited by every span inside it.
+    """
+    sampled = _processor is not None and random.random() < _sample_rate
+    ctx = _TraceContext(trace_id or new_trace_id(), sampled)
+    token = _context.set(ctx)
+    try:
+        if sampled:
+            with _run_span(ctx, name, attrs) as root:
+                yield root
+        else:
+            yield NOOP_SPAN
+    finally:
+        _context.reset(token)
+
+
+def span(name: str, **attrs: Any):
+    """
+    Child span of the current one; a no-op outside sampled traces.
+    """
+    ctx = _context.get()
+    if ctx is None or not ctx.sampled:
+        return _noop()
+    return _run_span(ctx, name, attrs)
+
+
+def begin_span(name: str, **attrs: Any):
+    """
+    Open a span without a ``with`` block (for callback pairs such as
+    SQLAlchemy's before/after hooks). Returns ``(span, token)`` for
+    ``end_span`` or None when not sampled.
+    """
+    ctx = _context.get()
+    if ctx is None or not ctx.sampled:
+        return None
+    parent = ctx.span
+    current = Span(ctx.trace_id, parent.span_id if parent else None, name, attrs)
+    return current, _context.set(_TraceContext(ctx.trace_id, True, current))
+
+
+def end_span(handle, error: Optional[BaseException] = None) -> None:
+    current, token = handle
+    if error is not None:
+        current.error = f"{type(error).__name__}: {error}"[:500]
+    try:
+        _context.reset(token)
+    except ValueError:
+        pass  # ended from a different context; nothing to restore
+    processor = _processor
+    if processor is not None:
+        processor.on_end(current.finish())
+
+
+# ---------------------------------------------------------------------------
+# Integrations
+# ---------------------------------------------------------------------------
+
+_SQL_SPAN_KEY = "_trace_span"
+_engines: "weakref.WeakSet" = weakref.WeakSet()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    handle = begin_span("sql", statement=statement[:300], executemany=executemany)
+    if handle is not None:
+        conn.info.setdefault(_SQL_SPAN_KEY, []).append(handle)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stack = conn.info.get(_SQL_SPAN_KEY)
+    if stack:
+        handle = stack.pop()
+        if cursor.rowcount is not None and cursor.rowcount >= 0:
+            handle[0].attrs["rows"] = cursor.rowcount
+        end_span(handle)
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    stack = conn.info.get(_SQL_SPAN_KEY) if conn is not None else None
+    if stack:
+        end_span(stack.pop(), exception_context.original_exception)
+
+
+_SQL_LISTENERS = (
+    ("before_cursor_execute", _before_cursor_execute),
+    ("after_cursor_execute", _after_cursor_execute),
+    ("handle_error", _handle_error),
+)
+
+
+def _sync_sql_listeners(engine) -> None:
+    # Listeners are attached only while sampling is on: SQLAlchemy's event
+    # dispatch alone costs a few microseconds per statement.
+    from sqlalchemy import event
+
+    for name, fn in _SQL_LISTENERS:
+        attached = event.contains(engine, name, fn)
+        if _sample_rate > 0 and not attached:
+            event.listen(engine, name, fn)
+        elif _sample_rate <= 0 and attached:
+            event.remove(engine, name, fn)
+
+
+def instrument_engine(engine) -> None:
+    """
+    One ``sql`` span per statement executed on ``engine`` (while tracing
+    is sampling).
+    """
+    _engines.add(engine)
+    _sync_sql_listeners(engine)
+
+
+class TraceContextFilter(logging.Filter):
+    """
+    Adds ``trace_id`` and ``span_id`` to every record ("-" outside traces)
+    so log lines can be joined with exported spans.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        ctx = _context.get()
+        if ctx is None:
+            record.trace_id = "-"
+            record.span_id = "-"
+        else:
+            record.trace_id = ctx.trace_id
+            record.span_id = ctx.span.span_id if ctx.span is not None else "-"
+        return True
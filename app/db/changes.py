@@ -0,0 +1,112 @@
+"""
+Change feed of catalog writes.
+
+``ingest_playlist`` records every artist, track, playlist and playlist
+track it inserts, updates or deletes in ``change_log`` just before it
+commits. ``GET /changes?since=<seq>`` returns the changes after a sequence
+number in order, so downstream copies (search, warehouse) sync in time
+proportional to what changed.
+
+Sequence numbers must become visible in order, or a consumer that has
+read past a gap would skip the late change for good. On Postgres the
+writer therefore takes a transaction-scoped advisory lock before taking
+numbers and keeps it until commit, so commit order matches ``seq`` order.
+On SQLite the database write lock already serialises writers.
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import orjson
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from app.db.models import ChangeLog
+
+ARTIST = "artist"
+TRACK = "track"
+PLAYLIST = "playlist"
+PLAYLIST_TRACK = "playlist_track"
+
+UPSERT = "upsert"
+DELETE = "delete"
+
+# Arbitrary key for pg_advisory_xact_lock around change-log appends.
+_CHANGE_LOG_LOCK_KEY = 7_320_114_002
+
+# (entity, entity id, op, row data or None)
+Change = Tuple[str, str, str, Optional[Dict[str, Any]]]
+
+
+def artist_data(artist) -> Dict[str, Any]:
+    return {"id": artist.id, "spotify_id": artist.spotify_id, "name": artist.name}
+
+
+def track_data(track) -> Dict[str, Any]:
+    return {
+        "id": track.id,
+        "spotify_id": track.spotify_id,
+        "name": track.name,
+        "artist_id": track.artist_id,
+        "album_name": track.album_name,
+        "duration_ms": track.duration_ms,
+        "song_group_id": track.song_group_id,
+    }
+
+
+def playlist_data(playlist) -> Dict[str, Any]:
+    return {
+        "id": playlist.id,
+        "spotify_id": playlist.spotify_id,
+        "name": playlist.name,
+        "description": playlist.description,
+        "owner_display_name": playlist.owner_display_name,
+    }
+
+
+def link_id(playlist_id: int, track_id: int) -> str:
+    return f"{playlist_id}:{track_id}"
+
+
+def record_changes(db: Session, changes: Iterable[Change]) -> int:
+    """
+    Append ``changes`` in order. Call last before commit: on Postgres this
+    blocks other ingests' appends until the caller's transaction ends.
+    """
+    now = datetime.utcnow()
+    rows = [
+        {
+            "entity": entity,
+            "entity_id": entity_id,
+            "op": op,
+            "data": orjson.dumps(data, default=str).decode() if data is not None else None,
+            "created_at": now,
+        }
+        for entity, entity_id, op, data in changes
+    ]
+    if not rows:
+        return 0
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _CHANGE_LOG_LOCK_KEY})
+    db.bulk_insert_mappings(ChangeLog, rows)
+    return len(rows)
+
+
+def latest_seq(db: Session) -> int:
+    return db.query(func.max(ChangeLog.seq)).scalar() or 0
+
+
+def read_changes(db: Session, since: int, limit: int) -> Tuple[List[tuple], bool]:
+    """
+    Up to ``limit`` changes with ``seq > since`` in order, and whether more
+    follow. Rows are ``(seq, entity, entity_id, op, data_json)``.
+    """
+    rows = (
+        db.query(
+            ChangeLog.seq, ChangeLog.entity, ChangeLog.entity_id, ChangeLog.op, ChangeLog.data
+        )
+        .filter(ChangeLog.seq > since)
+        .order_by(ChangeLog.seq)
+        .limit(limit + 1)
+        .all()
+    )
+    return rows[:limit], len(rows) > limit
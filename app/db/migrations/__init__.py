@@ -0,0 +1,120 @@
+"""
+Minimal versioned schema migrations.
+
+Each ``vNNNN_<name>.py`` module in this package defines ``upgrade(conn)``
+and may set ``transactional = False`` when it must run outside a
+transaction (e.g. ``CREATE INDEX CONCURRENTLY`` on Postgres). Applied
+versions are recorded in ``schema_migrations``.
+
+Apply pending migrations with::
+
+    python -m app.db.migrations upgrade
+"""
+import importlib
+import logging
+import pkgutil
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from types import ModuleType
+from typing import List
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, select, text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_MODULE_RE = re.compile(r"^v(\d{4})_(\w+)$")
+# Arbitrary key for pg_advisory_lock so concurrent deploys migrate serially.
+_ADVISORY_LOCK_KEY = 7_320_114_001
+
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    module: ModuleType
+
+    @property
+    def transactional(self) -> bool:
+        return getattr(self.module, "transactional", True)
+
+
+def discover() -> List[Migration]:
+    migrations = []
+    for info in pkgutil.iter_modules(__path__):
+        match = _MODULE_RE.match(info.name)
+        if not match:
+            continue
+        module = importlib.import_module(f"{__name__}.{info.name}")
+        migrations.append(Migration(int(match.group(1)), match.group(2), module))
+    migrations.sort(key=lambda m: m.version)
+    versions = [m.version for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f"Duplicate migration versions: {versions}")
+    return migrations
+
+
+def applied_versions(engine: Engine) -> set[int]:
+    schema_migrations.create(bind=engine, checkfirst=True)
+    with engine.connect() as conn:
+        return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def current_version(engine: Engine) -> int:
+    return max(applied_versions(engine), default=0)
+
+
+def upgrade(engine: Engine, target: int | None = None) -> List[int]:
+    """
+    Apply every pending migration up to ``target`` (default: latest) and
+    return the versions applied.
+    """
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as lock:
+            lock.execute(text("SELECT pg_advisory_lock(:k)"), {"k": _ADVISORY_LOCK_KEY})
+            try:
+                return _upgrade(engine, target)
+            finally:
+                lock.execute(
+                    text("SELECT pg_advisory_unlock(:k)"), {"k": _ADVISORY_LOCK_KEY}
+                )
+    return _upgrade(engine, target)
+
+
+def _upgrade(engine: Engine, target: int | None) -> List[int]:
+    done = applied_versions(engine)
+    applied: List[int] = []
+    for migration in discover():
+        if migration.version in done:
+            continue
+        if target is not None and migration.version > target:
+            break
+
+        logger.info("Applying migration %04d_%s", migration.version, migration.name)
+        record = schema_migrations.insert().values(
+            version=migration.version,
+            name=migration.name,
+            applied_at=datetime.utcnow(),
+        )
+        if migration.transactional:
+            with engine.begin() as conn:
+                migration.module.upgrade(conn)
+                conn.execute(record)
+        else:
+            with engine.connect().execution_options(
+                isolation_level="AUTOCOMMIT"
+            ) as conn:
+                migration.module.upgrade(conn)
+                conn.execute(record)
+        applied.append(migration.version)
+    return applied
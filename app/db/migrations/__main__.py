@@ -0,0 +1,32 @@
+import argparse
+
+from app.core.logging_config import configure_logging
+from app.db import migrations
+from app.db.session import get_engine
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.db.migrations")
+    sub = parser.add_subparsers(dest="command", required=True)
+    up = sub.add_parser("upgrade", help="apply pending migrations")
+    up.add_argument("--target", type=int, default=None)
+    sub.add_parser("current", help="print the applied schema version")
+    sub.add_parser("history", help="list migrations and whether they are applied")
+    args = parser.parse_args()
+
+    configure_logging()
+    engine = get_engine()
+    if args.command == "upgrade":
+        applied = migrations.upgrade(engine, target=args.target)
+        print(f"Applied {len(applied)} migration(s); now at {migrations.current_version(engine)}")
+    elif args.command == "current":
+        print(migrations.current_version(engine))
+    else:
+        done = migrations.applied_versions(engine)
+        for m in migrations.discover():
+            mark = "x" if m.version in done else " "
+            print(f"[{mark}] {m.version:04d} {m.name}")
+
+
+if __name__ == "__main__":
+    main()
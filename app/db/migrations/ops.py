@@ -0,0 +1,73 @@
+from typing import Sequence
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+
+def create_index(
+    conn: Connection,
+    name: str,
+    table: str,
+    columns: Sequence[str],
+    include: Sequence[str] = (),
+    unique: bool = False,
+) -> None:
+    """
+    Create an index without blocking writes where the backend allows it.
+
+    On Postgres this uses ``CREATE INDEX CONCURRENTLY`` (so the calling
+    migration must be non-transactional) and ``INCLUDE`` for covering
+    columns. Other backends get a plain index with the covering columns
+    appended to the key.
+    """
+    unique_sql = "UNIQUE " if unique else ""
+    if conn.dialect.name == "postgresql":
+        # A failed concurrent build leaves an INVALID index behind that
+        # IF NOT EXISTS would happily skip; drop it and rebuild.
+        invalid = conn.execute(
+            text(
+                "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = :name AND NOT i.indisvalid"
+            ),
+            {"name": name},
+        ).first()
+        if invalid:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+        include_sql = f" INCLUDE ({', '.join(include)})" if include else ""
+        conn.execute(
+            text(
+                f"CREATE {unique_sql}INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                f"ON {table} ({', '.join(columns)}){include_sql}"
+            )
+        )
+        return
+
+    key = list(columns) + [c for c in include if c not in columns]
+    conn.execute(
+        text(f"CREATE {unique_sql}INDEX IF NOT EXISTS {name} ON {table} ({', '.join(key)})")
+    )
+
+
+def drop_index(conn: Connection, name: str) -> None:
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    else:
+        conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
+def add_column(conn: Connection, table: str, name: str, ddl: str) -> None:
+    """
+    ``ALTER TABLE ... ADD COLUMN`` unless the column already exists, so
+    non-transactional migrations can be re-run after a partial failure.
+    ``ddl`` is the column type and constraints, e.g. ``"INTEGER DEFAULT 0"``.
+    """
+    existing = {c["name"] for c in inspect(conn).get_columns(table)}
+    if name not in existing:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+
+
+def drop_column(conn: Connection, table: str, name: str) -> None:
+    """``ALTER TABLE ... DROP COLUMN`` if the column is still there."""
+    existing = {c["name"] for c in inspect(conn).get_columns(table)}
+    if name in existing:
+        conn.execute(text(f"ALTER TABLE {table} DROP COLUMN {name}"))
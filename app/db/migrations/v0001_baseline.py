@@ -0,0 +1,64 @@
+"""
+Baseline schema, frozen as it was when tables were created by
+``Base.metadata.create_all``. ``checkfirst`` makes this a no-op on
+databases that already have those tables.
+"""
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    UniqueConstraint,
+)
+from sqlalchemy.engine import Connection
+
+metadata = MetaData()
+
+Table(
+    "artists",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("spotify_id", String, unique=True, index=True, nullable=False),
+    Column("name", String, index=True),
+    Column("genres", String),
+)
+
+Table(
+    "tracks",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("spotify_id", String, unique=True, index=True, nullable=False),
+    Column("name", String, index=True),
+    Column("artist_id", Integer, ForeignKey("artists.id"), nullable=False),
+    Column("album_name", String),
+    Column("duration_ms", Integer),
+)
+
+Table(
+    "playlists",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("spotify_id", String, unique=True, index=True, nullable=True),
+    Column("name", String, index=True),
+    Column("description", String),
+    Column("owner_display_name", String),
+    Column("is_curated", Boolean),
+)
+
+Table(
+    "playlist_tracks",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("playlist_id", Integer, ForeignKey("playlists.id"), nullable=False),
+    Column("track_id", Integer, ForeignKey("tracks.id"), nullable=False),
+    Column("added_at", DateTime),
+    UniqueConstraint("playlist_id", "track_id", name="uix_playlist_track"),
+)
+
+
+def upgrade(conn: Connection) -> None:
+    metadata.create_all(bind=conn, checkfirst=True)
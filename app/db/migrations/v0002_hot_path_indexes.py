@@ -0,0 +1,31 @@
+"""
+Covering indexes for the read paths in routes_playlists and routes_tracks:
+
+- playlist -> tracks ordered by ``added_at`` (covers ``track_id``)
+- track -> playlists reverse lookups
+- tracks -> artist join used by search and track listings
+
+``(playlist_id, track_id)`` lookups are served by ``uix_playlist_track``.
+"""
+from sqlalchemy.engine import Connection
+
+from app.db.migrations.ops import create_index
+
+transactional = False
+
+
+def upgrade(conn: Connection) -> None:
+    create_index(
+        conn,
+        "ix_playlist_tracks_playlist_id_added_at",
+        "playlist_tracks",
+        ["playlist_id", "added_at"],
+        include=["track_id"],
+    )
+    create_index(
+        conn,
+        "ix_playlist_tracks_track_id_playlist_id",
+        "playlist_tracks",
+        ["track_id", "playlist_id"],
+    )
+    create_index(conn, "ix_tracks_artist_id", "tracks", ["artist_id"])
@@ -0,0 +1,35 @@
+"""
+Cache table for playlist similarity neighbours (app.analytics.similarity).
+"""
+from sqlalchemy import Column, Float, ForeignKey, Index, Integer, MetaData, Table
+from sqlalchemy.engine import Connection
+
+metadata = MetaData()
+
+Table("playlists", metadata, Column("id", Integer, primary_key=True))
+
+Table(
+    "playlist_similarity",
+    metadata,
+    Column(
+        "playlist_id",
+        Integer,
+        ForeignKey("playlists.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column(
+        "similar_playlist_id",
+        Integer,
+        ForeignKey("playlists.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column("shared_tracks", Integer, nullable=False),
+    Column("jaccard", Float, nullable=False),
+    Column("cosine", Float, nullable=False),
+    Index("ix_playlist_similarity_playlist_id_jaccard", "playlist_id", "jaccard"),
+    Index("ix_playlist_similarity_similar_playlist_id", "similar_playlist_id"),
+)
+
+
+def upgrade(conn: Connection) -> None:
+    metadata.tables["playlist_similarity"].create(bind=conn, checkfirst=True)
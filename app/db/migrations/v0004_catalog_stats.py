@@ -0,0 +1,125 @@
+"""
+Summary tables behind /stats (app.analytics.stats), backfilled from the
+existing catalog.
+"""
+from datetime import datetime
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    Table,
+    text,
+)
+from sqlalchemy.engine import Connection
+
+metadata = MetaData()
+
+Table("artists", metadata, Column("id", Integer, primary_key=True))
+Table("playlists", metadata, Column("id", Integer, primary_key=True))
+
+catalog_stats = Table(
+    "catalog_stats",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("playlist_count", Integer, nullable=False),
+    Column("track_count", Integer, nullable=False),
+    Column("artist_count", Integer, nullable=False),
+    Column("album_count", Integer, nullable=False),
+    Column("playlist_track_count", Integer, nullable=False),
+    Column("total_duration_ms", BigInteger, nullable=False),
+    Column("updated_at", DateTime),
+)
+
+artist_stats = Table(
+    "artist_stats",
+    metadata,
+    Column(
+        "artist_id", Integer, ForeignKey("artists.id", ondelete="CASCADE"), primary_key=True
+    ),
+    Column("track_count", Integer, nullable=False),
+    Column("appearance_count", Integer, nullable=False),
+    Index("ix_artist_stats_appearance_count", "appearance_count", "artist_id"),
+)
+
+playlist_stats = Table(
+    "playlist_stats",
+    metadata,
+    Column(
+        "playlist_id",
+        Integer,
+        ForeignKey("playlists.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column("track_count", Integer, nullable=False),
+    Column("artist_count", Integer, nullable=False),
+    Column("album_count", Integer, nullable=False),
+    Column("total_duration_ms", BigInteger, nullable=False),
+    Column("median_duration_ms", Integer, nullable=False),
+    Column("updated_at", DateTime),
+)
+
+
+def _median(values):
+    if not values:
+        return 0
+    mid = len(values) // 2
+    if len(values) % 2:
+        return values[mid]
+    return (values[mid - 1] + values[mid]) // 2
+
+
+def upgrade(conn: Connection) -> None:
+    for name in ("catalog_stats", "artist_stats", "playlist_stats"):
+        metadata.tables[name].create(bind=conn, checkfirst=True)
+
+    now = datetime.utcnow()
+    conn.execute(
+        text(
+            "INSERT INTO catalog_stats (id, playlist_count, track_count, artist_count, "
+            "album_count, playlist_track_count, total_duration_ms, updated_at) SELECT 1, "
+            "(SELECT count(*) FROM playlists), (SELECT count(*) FROM tracks), "
+            "(SELECT count(*) FROM artists), "
+            "(SELECT count(DISTINCT album_name) FROM tracks), "
+            "(SELECT count(*) FROM playlist_tracks), "
+            "(SELECT coalesce(sum(duration_ms), 0) FROM tracks), :now"
+        ),
+        {"now": now},
+    )
+    conn.execute(
+        text(
+            "INSERT INTO artist_stats (artist_id, track_count, appearance_count) "
+            "SELECT a.id, "
+            "(SELECT count(*) FROM tracks t WHERE t.artist_id = a.id), "
+            "(SELECT count(*) FROM playlist_tracks pt JOIN tracks t "
+            " ON t.id = pt.track_id WHERE t.artist_id = a.id) "
+            "FROM artists a"
+        )
+    )
+
+    playlist_ids = [r[0] for r in conn.execute(text("SELECT id FROM playlists"))]
+    for playlist_id in playlist_ids:
+        rows = conn.execute(
+            text(
+                "SELECT t.duration_ms, t.artist_id, t.album_name FROM tracks t "
+                "JOIN playlist_tracks pt ON pt.track_id = t.id "
+                "WHERE pt.playlist_id = :p"
+            ),
+            {"p": playlist_id},
+        ).all()
+        durations = sorted(r[0] or 0 for r in rows)
+        conn.execute(
+            playlist_stats.insert().values(
+                playlist_id=playlist_id,
+                track_count=len(rows),
+                artist_count=len({r[1] for r in rows}),
+                album_count=len({r[2] for r in rows}),
+                total_duration_ms=sum(durations),
+                median_duration_ms=_median(durations),
+                updated_at=now,
+            )
+        )
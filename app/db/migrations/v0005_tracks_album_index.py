@@ -0,0 +1,13 @@
+"""
+Index tracks.album_name: used by the stats loader to detect new albums and
+by album lookups.
+"""
+from sqlalchemy.engine import Connection
+
+from app.db.migrations.ops import create_index
+
+transactional = False
+
+
+def upgrade(conn: Connection) -> None:
+    create_index(conn, "ix_tracks_album_name", "tracks", ["album_name"])
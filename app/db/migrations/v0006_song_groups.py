@@ -0,0 +1,36 @@
+"""
+Canonical song groups (app.analytics.dedup): the song_groups table, the
+tracks.song_group_id pointer and song counts on the stats tables.
+
+Existing catalogs are clustered afterwards with
+``python -m app.analytics rebuild-song-groups``.
+"""
+from sqlalchemy import Column, Index, Integer, MetaData, String, Table
+from sqlalchemy.engine import Connection
+
+from app.db.migrations.ops import add_column, create_index
+
+transactional = False
+
+metadata = MetaData()
+
+Table(
+    "song_groups",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("artist_key", String, nullable=False),
+    Column("title_key", String, nullable=False),
+    Column("duration_bucket", Integer, nullable=False),
+    Column("duration_ms", Integer, nullable=False),
+    Column("canonical_track_id", Integer, nullable=False),
+    Column("track_count", Integer, nullable=False),
+    Index("ix_song_groups_key", "artist_key", "title_key", "duration_bucket"),
+)
+
+
+def upgrade(conn: Connection) -> None:
+    metadata.tables["song_groups"].create(bind=conn, checkfirst=True)
+    add_column(conn, "tracks", "song_group_id", "INTEGER REFERENCES song_groups (id)")
+    create_index(conn, "ix_tracks_song_group_id", "tracks", ["song_group_id"])
+    add_column(conn, "catalog_stats", "song_count", "INTEGER NOT NULL DEFAULT 0")
+    add_column(conn, "playlist_stats", "song_count", "INTEGER NOT NULL DEFAULT 0")
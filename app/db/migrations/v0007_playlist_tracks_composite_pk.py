@@ -0,0 +1,183 @@
+"""
+Rebuild playlist_tracks around a composite primary key
+``(playlist_id, track_id)``. This drops the surrogate ``id``, its index and
+``uix_playlist_track``, which duplicated the new key. On Postgres the new
+table can be hash-partitioned by playlist_id (PLAYLIST_TRACKS_PARTITIONS).
+
+Postgres rewrites the table online:
+
+1. create ``playlist_tracks_new`` with its indexes under temporary names;
+2. a trigger mirrors every write on the old table into the new one;
+3. existing rows are copied in id-range batches, each batch committed
+   separately so no long transaction holds locks or bloats WAL;
+4. a short transaction swaps the tables: drop the old table, then rename
+   the new table, its constraints and its indexes.
+
+If the migration is interrupted it can be re-run; it starts the copy over.
+Other backends rebuild the table in one transaction (``WITHOUT ROWID`` on
+SQLite, so rows are clustered on the key).
+"""
+import logging
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+from app.core.config import get_settings
+
+transactional = False
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50_000
+
+_MIRROR_FUNCTION = """
+CREATE OR REPLACE FUNCTION playlist_tracks_mirror() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        DELETE FROM playlist_tracks_new
+        WHERE playlist_id = OLD.playlist_id AND track_id = OLD.track_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO playlist_tracks_new (playlist_id, track_id, added_at)
+        VALUES (NEW.playlist_id, NEW.track_id, NEW.added_at)
+        ON CONFLICT (playlist_id, track_id) DO UPDATE SET added_at = EXCLUDED.added_at;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+def _run_in_transaction(conn: Connection, statements) -> None:
+    # The migration connection is in autocommit mode; group these explicitly.
+    conn.execute(text("BEGIN"))
+    try:
+        for statement in statements:
+            conn.execute(text(statement))
+    except Exception:
+        conn.execute(text("ROLLBACK"))
+        raise
+    conn.execute(text("COMMIT"))
+
+
+def _create_table_sql(name: str, timestamp_type: str, suffix: str = "") -> str:
+    return (
+        f"CREATE TABLE {name} ("
+        "playlist_id INTEGER NOT NULL REFERENCES playlists (id), "
+        "track_id INTEGER NOT NULL REFERENCES tracks (id), "
+        f"added_at {timestamp_type}, "
+        f"CONSTRAINT {name}_pkey PRIMARY KEY (playlist_id, track_id)"
+        f"){suffix}"
+    )
+
+
+def _upgrade_postgresql(conn: Connection, partitions: int) -> None:
+    # Leftovers of an interrupted run (partitions go with their parent).
+    conn.execute(text("DROP TRIGGER IF EXISTS playlist_tracks_mirror ON playlist_tracks"))
+    conn.execute(text("DROP TABLE IF EXISTS playlist_tracks_new"))
+
+    partition_sql = " PARTITION BY HASH (playlist_id)" if partitions else ""
+    create_sql = _create_table_sql(
+        "playlist_tracks_new", "TIMESTAMP WITHOUT TIME ZONE", partition_sql
+    )
+    conn.execute(text(create_sql))
+    for i in range(partitions):
+        conn.execute(
+            text(
+                f"CREATE TABLE playlist_tracks_p{i} PARTITION OF playlist_tracks_new "
+                f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {i})"
+            )
+        )
+    # Built while the table is empty: cheaper than building afterwards, and
+    # CONCURRENTLY is not available on partitioned parents anyway.
+    conn.execute(
+        text(
+            "CREATE INDEX ix_playlist_tracks_playlist_id_added_at_new "
+            "ON playlist_tracks_new (playlist_id, added_at) INCLUDE (track_id)"
+        )
+    )
+    conn.execute(
+        text(
+            "CREATE INDEX ix_playlist_tracks_track_id_playlist_id_new "
+            "ON playlist_tracks_new (track_id, playlist_id)"
+        )
+    )
+
+    conn.execute(text(_MIRROR_FUNCTION))
+    conn.execute(
+        text(
+            "CREATE TRIGGER playlist_tracks_mirror "
+            "AFTER INSERT OR UPDATE OR DELETE ON playlist_tracks "
+            "FOR EACH ROW EXECUTE FUNCTION playlist_tracks_mirror()"
+        )
+    )
+
+    # Rows written from here on are mirrored by the trigger; everything up
+    # to the current max id is copied below.
+    low, high = conn.execute(
+        text("SELECT coalesce(min(id), 0), coalesce(max(id), 0) FROM playlist_tracks")
+    ).one()
+    copied = 0
+    for start in range(low, high + 1, BATCH_SIZE):
+        result = conn.execute(
+            text(
+                "INSERT INTO playlist_tracks_new (playlist_id, track_id, added_at) "
+                "SELECT playlist_id, track_id, added_at FROM playlist_tracks "
+                "WHERE id >= :lo AND id < :hi ON CONFLICT DO NOTHING"
+            ),
+            {"lo": start, "hi": start + BATCH_SIZE},
+        )
+        copied += result.rowcount
+        logger.info("playlist_tracks: copied %d rows (ids < %d)", copied, start + BATCH_SIZE)
+    conn.execute(text("ANALYZE playlist_tracks_new"))
+
+    _run_in_transaction(
+        conn,
+        [
+            # Give up rather than queue every reader behind the swap.
+            "SET LOCAL lock_timeout = '5s'",
+            "LOCK TABLE playlist_tracks IN ACCESS EXCLUSIVE MODE",
+            "DROP TABLE playlist_tracks",
+            "DROP FUNCTION playlist_tracks_mirror()",
+            "ALTER TABLE playlist_tracks_new RENAME TO playlist_tracks",
+            "ALTER TABLE playlist_tracks "
+            "RENAME CONSTRAINT playlist_tracks_new_pkey TO playlist_tracks_pkey",
+            "ALTER TABLE playlist_tracks RENAME CONSTRAINT "
+            "playlist_tracks_new_playlist_id_fkey TO playlist_tracks_playlist_id_fkey",
+            "ALTER TABLE playlist_tracks RENAME CONSTRAINT "
+            "playlist_tracks_new_track_id_fkey TO playlist_tracks_track_id_fkey",
+            "ALTER INDEX ix_playlist_tracks_playlist_id_added_at_new "
+            "RENAME TO ix_playlist_tracks_playlist_id_added_at",
+            "ALTER INDEX ix_playlist_tracks_track_id_playlist_id_new "
+            "RENAME TO ix_playlist_tracks_track_id_playlist_id",
+        ],
+    )
+
+
+def _upgrade_generic(conn: Connection) -> None:
+    suffix = " WITHOUT ROWID" if conn.dialect.name == "sqlite" else ""
+    _run_in_transaction(
+        conn,
+        [
+            "DROP TABLE IF EXISTS playlist_tracks_new",
+            _create_table_sql("playlist_tracks_new", "DATETIME", suffix),
+            "INSERT INTO playlist_tracks_new (playlist_id, track_id, added_at) "
+            "SELECT playlist_id, track_id, added_at FROM playlist_tracks",
+            "DROP TABLE playlist_tracks",
+            "ALTER TABLE playlist_tracks_new RENAME TO playlist_tracks",
+            "CREATE INDEX ix_playlist_tracks_playlist_id_added_at "
+            "ON playlist_tracks (playlist_id, added_at, track_id)",
+            "CREATE INDEX ix_playlist_tracks_track_id_playlist_id "
+            "ON playlist_tracks (track_id, playlist_id)",
+        ],
+    )
+
+
+def upgrade(conn: Connection) -> None:
+    columns = {c["name"] for c in inspect(conn).get_columns("playlist_tracks")}
+    if "id" not in columns:
+        return  # already rebuilt
+    if conn.dialect.name == "postgresql":
+        _upgrade_postgresql(conn, get_settings().playlist_tracks_partitions)
+    else:
+        _upgrade_generic(conn)
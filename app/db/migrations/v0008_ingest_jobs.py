@@ -0,0 +1,45 @@
+"""
+Durable ingest job queue consumed by ``python -m app.worker``.
+"""
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+)
+from sqlalchemy.engine import Connection
+
+metadata = MetaData()
+
+Table("playlists", metadata, Column("id", Integer, primary_key=True))
+
+Table(
+    "ingest_jobs",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("playlist_id", String, nullable=False),
+    Column("status", String, nullable=False),
+    Column("attempts", Integer, nullable=False),
+    Column("max_attempts", Integer, nullable=False),
+    Column("available_at", DateTime, nullable=False),
+    Column("locked_by", String),
+    Column("locked_until", DateTime),
+    Column("heartbeat_at", DateTime),
+    Column("last_error", Text),
+    Column(
+        "result_playlist_id", Integer, ForeignKey("playlists.id", ondelete="SET NULL")
+    ),
+    Column("created_at", DateTime),
+    Column("finished_at", DateTime),
+    Index("ix_ingest_jobs_status_available_at", "status", "available_at"),
+    Index("ix_ingest_jobs_playlist_id", "playlist_id"),
+)
+
+
+def upgrade(conn: Connection) -> None:
+    metadata.tables["ingest_jobs"].create(bind=conn, checkfirst=True)
@@ -0,0 +1,31 @@
+"""
+Cache of verified Genius lyrics links (app.etl.genius_links).
+"""
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, MetaData, String, Table
+from sqlalchemy.engine import Connection
+
+metadata = MetaData()
+
+Table("tracks", metadata, Column("id", Integer, primary_key=True))
+
+Table(
+    "genius_links",
+    metadata,
+    Column(
+        "track_id",
+        Integer,
+        ForeignKey("tracks.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column("url", String, nullable=False),
+    Column("status", String, nullable=False),
+    Column("canonical_url", String),
+    Column("http_status", Integer),
+    Column("checked_at", DateTime, nullable=False),
+    Column("expires_at", DateTime, nullable=False),
+    Index("ix_genius_links_expires_at", "expires_at"),
+)
+
+
+def upgrade(conn: Connection) -> None:
+    metadata.tables["genius_links"].create(bind=conn, checkfirst=True)
@@ -0,0 +1,27 @@
+"""
+Change feed of catalog writes (app.db.changes, GET /changes).
+"""
+from sqlalchemy import BigInteger, Column, DateTime, Integer, MetaData, String, Table, Text
+from sqlalchemy.engine import Connection
+
+metadata = MetaData()
+
+Table(
+    "change_log",
+    metadata,
+    Column(
+        "seq",
+        BigInteger().with_variant(Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+    ),
+    Column("entity", String, nullable=False),
+    Column("entity_id", String, nullable=False),
+    Column("op", String, nullable=False),
+    Column("data", Text),
+    Column("created_at", DateTime),
+)
+
+
+def upgrade(conn: Connection) -> None:
+    metadata.tables["change_log"].create(bind=conn, checkfirst=True)
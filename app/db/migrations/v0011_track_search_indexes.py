@@ -0,0 +1,16 @@
+"""
+Indexes for filtered and sorted /tracks/search:
+
+- duration range filters and duration sorts (``id`` breaks ties)
+- artist filter with the default name sort
+"""
+from sqlalchemy.engine import Connection
+
+from app.db.migrations.ops import create_index
+
+transactional = False
+
+
+def upgrade(conn: Connection) -> None:
+    create_index(conn, "ix_tracks_duration_ms", "tracks", ["duration_ms", "id"])
+    create_index(conn, "ix_tracks_artist_id_name", "tracks", ["artist_id", "name"])
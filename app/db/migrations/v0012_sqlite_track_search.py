@@ -0,0 +1,42 @@
+"""
+SQLite only: FTS5 trigram index over track and artist names for
+/tracks/search (app.db.search), with the triggers that keep it current,
+backfilled from the existing catalog. No-op on Postgres.
+"""
+from sqlalchemy.engine import Connection
+
+DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tracks_fts "
+    "USING fts5(name, artist_name, tokenize='trigram')",
+    """CREATE TRIGGER IF NOT EXISTS tracks_fts_insert AFTER INSERT ON tracks BEGIN
+        INSERT INTO tracks_fts (rowid, name, artist_name)
+        SELECT new.id, new.name, (SELECT name FROM artists WHERE id = new.artist_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tracks_fts_update
+    AFTER UPDATE OF name, artist_id ON tracks BEGIN
+        UPDATE tracks_fts
+        SET name = new.name,
+            artist_name = (SELECT name FROM artists WHERE id = new.artist_id)
+        WHERE rowid = old.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tracks_fts_delete AFTER DELETE ON tracks BEGIN
+        DELETE FROM tracks_fts WHERE rowid = old.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS artists_fts_update AFTER UPDATE OF name ON artists BEGIN
+        UPDATE tracks_fts SET artist_name = new.name
+        WHERE rowid IN (SELECT id FROM tracks WHERE artist_id = new.id);
+    END""",
+)
+
+
+def upgrade(conn: Connection) -> None:
+    if conn.dialect.name != "sqlite":
+        return
+    for statement in DDL:
+        conn.exec_driver_sql(statement)
+    conn.exec_driver_sql(
+        "INSERT INTO tracks_fts (rowid, name, artist_name) "
+        "SELECT tracks.id, tracks.name, artists.name FROM tracks "
+        "JOIN artists ON artists.id = tracks.artist_id "
+        "WHERE tracks.id NOT IN (SELECT rowid FROM tracks_fts)"
+    )
@@ -0,0 +1,30 @@
+"""
+Per-artist playlist counts for /artists: artist_stats.playlist_count,
+backfilled from the catalog, and the indexes behind the rankings by
+playlists and by tracks.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.db.migrations.ops import add_column, create_index
+
+transactional = False
+
+
+def upgrade(conn: Connection) -> None:
+    add_column(conn, "artist_stats", "playlist_count", "INTEGER NOT NULL DEFAULT 0")
+    # Recomputes every row, so a re-run after a partial failure is safe.
+    conn.execute(
+        text(
+            "UPDATE artist_stats SET playlist_count = ("
+            "SELECT count(DISTINCT pt.playlist_id) FROM playlist_tracks pt "
+            "JOIN tracks t ON t.id = pt.track_id "
+            "WHERE t.artist_id = artist_stats.artist_id)"
+        )
+    )
+    create_index(
+        conn, "ix_artist_stats_playlist_count", "artist_stats", ["playlist_count", "artist_id"]
+    )
+    create_index(
+        conn, "ix_artist_stats_track_count", "artist_stats", ["track_count", "artist_id"]
+    )
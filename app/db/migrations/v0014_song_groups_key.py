@@ -0,0 +1,17 @@
+"""
+Drop song_groups.duration_bucket: song groups are blocked on (artist key,
+title key) and matched by duration tolerance, so the bucket was written
+but never read. ix_song_groups_key is rebuilt on the two keys first
+(SQLite cannot drop an indexed column).
+"""
+from sqlalchemy.engine import Connection
+
+from app.db.migrations.ops import create_index, drop_column, drop_index
+
+transactional = False
+
+
+def upgrade(conn: Connection) -> None:
+    drop_index(conn, "ix_song_groups_key")
+    create_index(conn, "ix_song_groups_key", "song_groups", ["artist_key", "title_key"])
+    drop_column(conn, "song_groups", "duration_bucket")
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy import BigInteger, Column, Integer, String, Float, ForeignKey, DateTime, Index, Text, event
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from datetime import datetime
+from app.db import search
 from app.db.base import Base
 
 
@@ -24,12 +25,47 @@ class Track(Base):
     artist_id: Mapped[int] = mapped_column(ForeignKey("artists.id"), nullable=False)
     album_name: Mapped[str] = mapped_column(String, default="")
     duration_ms: Mapped[int] = mapped_column(Integer)
+    # Canonical song this recording belongs to (app.analytics.dedup).
+    song_group_id: Mapped[int | None] = mapped_column(
+        ForeignKey("song_groups.id"), nullable=True
+    )
 
     artist: Mapped["Artist"] = relationship("Artist", back_populates="tracks")
     playlist_items: Mapped[list["PlaylistTrack"]] = relationship(
         "PlaylistTrack", back_populates="track"
     )
 
+    __table_args__ = (
+        Index("ix_tracks_artist_id", "artist_id"),
+        Index("ix_tracks_album_name", "album_name"),
+        Index("ix_tracks_song_group_id", "song_group_id"),
+        # Sort/filter indexes for /tracks/search (migration 0011).
+        Index("ix_tracks_duration_ms", "duration_ms", "id"),
+        Index("ix_tracks_artist_id_name", "artist_id", "name"),
+    )
+
+
+class SongGroup(Base):
+    """
+    One canonical song: tracks whose normalized artist and title match and
+    whose durations are within a few seconds (remasters, regional releases,
+    compilation copies). Maintained by app.analytics.dedup.
+    """
+
+    __tablename__ = "song_groups"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    artist_key: Mapped[str] = mapped_column(String, nullable=False)
+    title_key: Mapped[str] = mapped_column(String, nullable=False)
+    duration_ms: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Lowest track id in the group; not a foreign key to avoid a cycle.
+    canonical_track_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    track_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        Index("ix_song_groups_key", "artist_key", "title_key"),
+    )
+
 
 class Playlist(Base):
     __tablename__ = "playlists"
@@ -49,12 +85,184 @@ class Playlist(Base):
 class PlaylistTrack(Base):
     __tablename__ = "playlist_tracks"
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    playlist_id: Mapped[int] = mapped_column(ForeignKey("playlists.id"), nullable=False)
-    track_id: Mapped[int] = mapped_column(ForeignKey("tracks.id"), nullable=False)
+    # Composite key (migration 0007): no surrogate id, and the primary key
+    # doubles as the playlist -> tracks lookup index. On Postgres the table
+    # may be hash-partitioned by playlist_id (PLAYLIST_TRACKS_PARTITIONS).
+    playlist_id: Mapped[int] = mapped_column(ForeignKey("playlists.id"), primary_key=True)
+    track_id: Mapped[int] = mapped_column(ForeignKey("tracks.id"), primary_key=True)
     added_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
     playlist: Mapped["Playlist"] = relationship("Playlist", back_populates="items")
     track: Mapped["Track"] = relationship("Track", back_populates="playlist_items")
 
-    __table_args__ = (UniqueConstraint("playlist_id", "track_id", name="uix_playlist_track"),)
+    # The indexes are built on existing databases by migrations 0002/0007;
+    # they are declared here too so create_all (tests) matches production.
+    __table_args__ = (
+        Index(
+            "ix_playlist_tracks_playlist_id_added_at",
+            "playlist_id",
+            "added_at",
+            postgresql_include=["track_id"],
+        ),
+        Index("ix_playlist_tracks_track_id_playlist_id", "track_id", "playlist_id"),
+        # Clustered on the key in SQLite too, instead of a rowid heap plus a
+        # separate key index.
+        {"sqlite_with_rowid": False},
+    )
+
+
+class PlaylistSimilarity(Base):
+    """
+    Cached top-k most similar playlists per playlist, maintained by
+    app.analytics.similarity after each ingest.
+    """
+
+    __tablename__ = "playlist_similarity"
+
+    playlist_id: Mapped[int] = mapped_column(
+        ForeignKey("playlists.id", ondelete="CASCADE"), primary_key=True
+    )
+    similar_playlist_id: Mapped[int] = mapped_column(
+        ForeignKey("playlists.id", ondelete="CASCADE"), primary_key=True
+    )
+    shared_tracks: Mapped[int] = mapped_column(Integer, nullable=False)
+    jaccard: Mapped[float] = mapped_column(Float, nullable=False)
+    cosine: Mapped[float] = mapped_column(Float, nullable=False)
+
+    __table_args__ = (
+        Index("ix_playlist_similarity_playlist_id_jaccard", "playlist_id", "jaccard"),
+        Index("ix_playlist_similarity_similar_playlist_id", "similar_playlist_id"),
+    )
+
+
+class CatalogStats(Base):
+    """
+    Single-row catalog totals, maintained by app.analytics.stats.
+    """
+
+    __tablename__ = "catalog_stats"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    playlist_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    track_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    artist_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    album_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    playlist_track_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    total_duration_ms: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    song_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class ArtistStats(Base):
+    __tablename__ = "artist_stats"
+
+    artist_id: Mapped[int] = mapped_column(
+        ForeignKey("artists.id", ondelete="CASCADE"), primary_key=True
+    )
+    track_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # Number of playlist_tracks rows whose track is by this artist.
+    appearance_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # Number of distinct playlists with at least one track by this artist.
+    playlist_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        Index("ix_artist_stats_appearance_count", "appearance_count", "artist_id"),
+        # Rankings behind /artists (migration 0013).
+        Index("ix_artist_stats_playlist_count", "playlist_count", "artist_id"),
+        Index("ix_artist_stats_track_count", "track_count", "artist_id"),
+    )
+
+
+class PlaylistStats(Base):
+    __tablename__ = "playlist_stats"
+
+    playlist_id: Mapped[int] = mapped_column(
+        ForeignKey("playlists.id", ondelete="CASCADE"), primary_key=True
+    )
+    track_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    artist_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    album_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    total_duration_ms: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    median_duration_ms: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    song_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class IngestJob(Base):
+    """
+    Durable ingest queue consumed by ``python -m app.worker`` (see
+    app.worker.queue for the lease protocol).
+    """
+
+    __tablename__ = "ingest_jobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # Spotify playlist id to ingest.
+    playlist_id: Mapped[str] = mapped_column(String, nullable=False)
+    status: Mapped[str] = mapped_column(String, nullable=False, default="queued")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=5)
+    available_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    locked_by: Mapped[str | None] = mapped_column(String, nullable=True)
+    locked_until: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    result_playlist_id: Mapped[int | None] = mapped_column(
+        ForeignKey("playlists.id", ondelete="SET NULL"), nullable=True
+    )
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_ingest_jobs_status_available_at", "status", "available_at"),
+        Index("ix_ingest_jobs_playlist_id", "playlist_id"),
+    )
+
+
+class GeniusLink(Base):
+    """
+    Verified Genius lyrics link per track (app.etl.genius_links). ``url`` is
+    the guessed URL that was checked; ``canonical_url`` is where it resolved.
+    """
+
+    __tablename__ = "genius_links"
+
+    track_id: Mapped[int] = mapped_column(
+        ForeignKey("tracks.id", ondelete="CASCADE"), primary_key=True
+    )
+    url: Mapped[str] = mapped_column(String, nullable=False)
+    # "verified", "missing" (404/410) or "error" (retried sooner)
+    status: Mapped[str] = mapped_column(String, nullable=False)
+    canonical_url: Mapped[str | None] = mapped_column(String, nullable=True)
+    http_status: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    checked_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    __table_args__ = (Index("ix_genius_links_expires_at", "expires_at"),)
+
+
+class ChangeLog(Base):
+    """
+    Ordered feed of catalog writes (app.db.changes), served by /changes.
+    """
+
+    __tablename__ = "change_log"
+
+    # BIGSERIAL on Postgres; SQLite only autoincrements INTEGER keys.
+    seq: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True
+    )
+    # "artist", "track", "playlist" or "playlist_track"
+    entity: Mapped[str] = mapped_column(String, nullable=False)
+    # Row id; "<playlist_id>:<track_id>" for playlist_track
+    entity_id: Mapped[str] = mapped_column(String, nullable=False)
+    # "upsert" or "delete"
+    op: Mapped[str] = mapped_column(String, nullable=False)
+    # JSON of the row after the write; NULL for deletes
+    data: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+# SQLite full-text index behind /tracks/search (migration 0012); not a
+# mapped table, so create_all builds it from the same DDL.
+event.listen(Base.metadata, "after_create", search._after_create)
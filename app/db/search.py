@@ -0,0 +1,72 @@
+"""
+Free-text track search index for SQLite deployments.
+
+``tracks_fts`` is an FTS5 table with the trigram tokenizer over each
+track's name and its artist's name, keyed by track id and kept current by
+triggers on ``tracks`` and ``artists``. A trigram phrase query matches any
+case-insensitive substring of three or more characters, so it answers the
+same questions as ``ILIKE '%term%'`` without scanning every track.
+
+Created by migration 0012 and, for ``create_all`` databases (tests,
+benchmarks), by the ``after_create`` hook in ``app.db.models``. Postgres
+keeps using ``ILIKE``.
+"""
+from typing import Optional
+
+from sqlalchemy import literal_column, select, table
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import Select
+
+TRACKS_FTS = "tracks_fts"
+# Trigrams: shorter terms cannot use the index.
+MIN_TERM_LENGTH = 3
+
+DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TRACKS_FTS} "
+    "USING fts5(name, artist_name, tokenize='trigram')",
+    f"""CREATE TRIGGER IF NOT EXISTS tracks_fts_insert AFTER INSERT ON tracks BEGIN
+        INSERT INTO {TRACKS_FTS} (rowid, name, artist_name)
+        SELECT new.id, new.name, (SELECT name FROM artists WHERE id = new.artist_id);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS tracks_fts_update
+    AFTER UPDATE OF name, artist_id ON tracks BEGIN
+        UPDATE {TRACKS_FTS}
+        SET name = new.name,
+            artist_name = (SELECT name FROM artists WHERE id = new.artist_id)
+        WHERE rowid = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS tracks_fts_delete AFTER DELETE ON tracks BEGIN
+        DELETE FROM {TRACKS_FTS} WHERE rowid = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS artists_fts_update AFTER UPDATE OF name ON artists BEGIN
+        UPDATE {TRACKS_FTS} SET artist_name = new.name
+        WHERE rowid IN (SELECT id FROM tracks WHERE artist_id = new.id);
+    END""",
+)
+
+
+def create_track_search_index(conn: Connection) -> None:
+    if conn.dialect.name != "sqlite":
+        return
+    for statement in DDL:
+        conn.exec_driver_sql(statement)
+
+
+def _after_create(target, connection: Connection, **kw) -> None:
+    create_track_search_index(connection)
+
+
+def matching_track_ids(term: str) -> Optional[Select]:
+    """
+    ``SELECT rowid FROM tracks_fts WHERE tracks_fts MATCH <term>``, or None
+    when ``term`` is too short for the trigram index.
+    """
+    if len(term) < MIN_TERM_LENGTH:
+        return None
+    # One quoted phrase: the term's characters are matched literally.
+    phrase = '"' + term.replace('"', '""') + '"'
+    return (
+        select(literal_column("rowid"))
+        .select_from(table(TRACKS_FTS))
+        .where(literal_column(TRACKS_FTS).match(phrase))
+    )
@@ -1,8 +1,158 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker
 from app.core.config import get_settings
+from app.core.tracing import instrument_engine
 
-settings = get_settings()
+# The engine is created on first use (normally in the app lifespan) rather
+# than at import time, so importing the app stays cheap for every process.
+_engine: Engine | None = None
+# Read replica, when DATABASE_READ_URL is set; otherwise reads use _engine.
+_read_engine: Engine | None = None
+# Reader pool on the same file when DATABASE_URL is a SQLite file.
+_sqlite_read_engine: Engine | None = None
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
 
-engine = create_engine(settings.database_url, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def is_sqlite_file(url: str) -> bool:
+    parsed = make_url(url)
+    return (
+        parsed.get_backend_name() == "sqlite"
+        and parsed.database not in (None, "", ":memory:")
+        and parsed.query.get("mode") != "memory"
+    )
+
+
+def _sqlite_pragmas(read_only: bool) -> list[str]:
+    settings = get_settings()
+    pragmas = [
+        f"PRAGMA busy_timeout = {int(settings.sqlite_busy_timeout_seconds * 1000)}",
+        f"PRAGMA synchronous = {settings.sqlite_synchronous}",
+        f"PRAGMA mmap_size = {settings.sqlite_mmap_size_mb * 1024 * 1024}",
+        # Negative: KiB rather than pages.
+        f"PRAGMA cache_size = {-settings.sqlite_cache_size_mb * 1024}",
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA foreign_keys = ON",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only = ON")
+    else:
+        # Persistent in the file; readers then never block the writer.
+        pragmas.insert(0, "PRAGMA journal_mode = WAL")
+    return pragmas
+
+
+def _create_sqlite_engine(url: str, read_only: bool) -> Engine:
+    """
+    SQLite only allows one writer at a time. The write engine holds a
+    single connection, so this process's writers queue on the pool (for up
+    to SQLITE_BUSY_TIMEOUT_SECONDS) instead of failing with "database is
+    locked", and each write transaction starts with BEGIN IMMEDIATE, taking
+    the file's write lock up front rather than failing to upgrade a read
+    lock halfway through. Read engines open deferred transactions, which
+    under WAL read a consistent snapshot alongside the writer.
+
+    Every transaction on the write engine waits for the running ingest, so
+    it is only for sessions that write; reads, probes included, use the
+    read engine.
+    """
+    settings = get_settings()
+    timeout = settings.sqlite_busy_timeout_seconds
+    pool_args = (
+        {"pool_size": 8, "max_overflow": 8}
+        if read_only
+        else {"pool_size": 1, "max_overflow": 0, "pool_timeout": timeout}
+    )
+    engine = create_engine(
+        url, connect_args={"check_same_thread": False, "timeout": timeout}, **pool_args
+    )
+    pragmas = _sqlite_pragmas(read_only)
+    begin = "BEGIN" if read_only else "BEGIN IMMEDIATE"
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        # Transactions are begun below, not implicitly by the driver.
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(conn):
+        if conn.get_execution_options().get("isolation_level") != "AUTOCOMMIT":
+            conn.exec_driver_sql(begin)
+
+    return engine
+
+
+def create_db_engine(url: str, read_only: bool = False) -> Engine:
+    """
+    Engine for ``url``: a pre-pinged pool on Postgres, the tuned WAL setup
+    above on SQLite.
+    """
+    if make_url(url).get_backend_name() == "sqlite":
+        engine = _create_sqlite_engine(url, read_only)
+    else:
+        engine = create_engine(url, pool_pre_ping=True)
+    instrument_engine(engine)
+    return engine
+
+
+def init_engine() -> Engine:
+    global _engine, _read_engine, _sqlite_read_engine
+    settings = get_settings()
+    if _engine is None:
+        _engine = create_db_engine(settings.database_url)
+        if is_sqlite_file(settings.database_url):
+            # Switch the file to WAL before any reader opens it.
+            _engine.connect().close()
+            _sqlite_read_engine = create_db_engine(settings.database_url, read_only=True)
+    if _read_engine is None and settings.database_read_url:
+        _read_engine = create_db_engine(settings.database_read_url)
+    SessionLocal.configure(bind=_engine)
+    return _engine
+
+
+def get_engine() -> Engine:
+    return _engine if _engine is not None else init_engine()
+
+
+def get_read_engine() -> Engine:
+    engine = get_engine()
+    if _read_engine is not None:
+        return _read_engine
+    return _sqlite_read_engine if _sqlite_read_engine is not None else engine
+
+
+def probe_engines() -> list[Engine]:
+    """
+    The engines health checks should reach: the primary and the replica
+    if any. On a SQLite file the reader pool stands in for the writer: it
+    opens the same file, while the writer's one connection may be held by
+    an ingest for as long as that runs.
+    """
+    engine = get_engine()
+    if _sqlite_read_engine is not None:
+        return [_sqlite_read_engine]
+    return [engine] if _read_engine is None else [engine, _read_engine]
+
+
+def has_read_replica() -> bool:
+    """
+    True with a separate replica (which may lag). SQLite readers share the
+    writer's file and see every commit, so they need no read-after-write
+    routing.
+    """
+    get_engine()
+    return _read_engine is not None
+
+
+def dispose_engine() -> None:
+    global _engine, _read_engine, _sqlite_read_engine
+    for engine in (_engine, _read_engine, _sqlite_read_engine):
+        if engine is not None:
+            engine.dispose()
+    _engine = None
+    _read_engine = None
+    _sqlite_read_engine = None
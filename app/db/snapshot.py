@@ -0,0 +1,348 @@
+"""
+Read-only, memory-mapped catalog snapshot for read workers.
+
+``build_snapshot`` exports tracks, artists and playlists to one columnar
+file: fixed-width columns are raw little-endian arrays, strings are a
+UTF-8 blob plus an ``int64`` offset array, and each playlist's tracks are
+a slice of one ``int32`` array of track row numbers. Track rows are stored
+in API order (name, then id), so a playlist slice sorted by row number is
+already in ``/playlists/{id}/tracks`` order.
+
+Layout: an 8-byte magic, the offset and length of a JSON table of
+contents, then 8-byte aligned sections. Opening a snapshot reads only the
+table of contents; columns are ``memoryview`` casts over the shared
+mapping, so worker processes share the page cache and pay no parse cost.
+
+The builder writes a temporary file next to the target and renames it
+over the target, so publishing is atomic. Readers notice the new inode
+within ``CATALOG_SNAPSHOT_CHECK_SECONDS``; requests already running keep
+the old mapping until they finish.
+
+    python -m app.db.snapshot build --output /var/lib/catalog/catalog.snap
+    python -m app.db.snapshot info
+"""
+import argparse
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db.changes import latest_seq
+from app.db.models import Artist, GeniusLink, Playlist, PlaylistTrack, Track
+
+MAGIC = b"CATSNAP1"
+_HEADER = struct.Struct("<8sQQ")
+# Genius link status codes; index 0 is "never checked".
+_GENIUS_STATUSES = (None, "verified", "missing", "error")
+_BATCH = 10_000
+
+
+class _Writer:
+    def __init__(self, fh) -> None:
+        self.fh = fh
+        self.sections: Dict[str, Tuple[int, int, str]] = {}
+        fh.write(b"\0" * _HEADER.size)
+
+    def add(self, name: str, fmt: str, data: bytes) -> None:
+        pad = -self.fh.tell() % 8
+        self.fh.write(b"\0" * pad)
+        self.sections[name] = (self.fh.tell(), len(data), fmt)
+        self.fh.write(data)
+
+    def add_strings(self, name: str, values: List[str]) -> None:
+        import numpy as np
+
+        encoded = [v.encode() for v in values]
+        offsets = np.zeros(len(encoded) + 1, dtype="<i8")
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        self.add(f"{name}.offsets", "q", offsets.tobytes())
+        self.add(f"{name}.data", "B", b"".join(encoded))
+
+    def finish(self, meta: Dict[str, Any]) -> None:
+        toc = json.dumps({"meta": meta, "sections": self.sections}).encode()
+        toc_offset = self.fh.tell()
+        self.fh.write(toc)
+        self.fh.seek(0)
+        self.fh.write(_HEADER.pack(MAGIC, toc_offset, len(toc)))
+
+
+def build_snapshot(db: Session, path: str | Path) -> Dict[str, Any]:
+    """
+    Export the catalog to ``path`` and atomically publish it. Returns the
+    snapshot's metadata.
+    """
+    import numpy as np  # deferred: only the builder needs numpy
+
+    path = Path(path)
+    # One transaction for every query, so the snapshot is a consistent cut
+    # (on Postgres that needs REPEATABLE READ; SQLite reads are snapshots).
+    if db.get_bind().dialect.name == "postgresql":
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    change_seq = latest_seq(db)
+
+    artist_rows = db.query(Artist.id, Artist.name).order_by(Artist.id).all()
+    artist_ids = np.array([a for a, _ in artist_rows], dtype="<i8")
+
+    track_ids, spotify_ids, names, albums, durations = [], [], [], [], []
+    artist_index, genius_status, canonical_urls = [], [], []
+    tracks = (
+        db.query(
+            Track.id,
+            Track.spotify_id,
+            Track.name,
+            Track.album_name,
+            Track.artist_id,
+            Track.duration_ms,
+            GeniusLink.status,
+            GeniusLink.canonical_url,
+        )
+        .outerjoin(GeniusLink, GeniusLink.track_id == Track.id)
+        .order_by(Track.name.asc(), Track.id.asc())
+        .yield_per(_BATCH)
+    )
+    for track_id, spotify_id, name, album, artist_id, duration, status, canonical in tracks:
+        track_ids.append(track_id)
+        spotify_ids.append(spotify_id)
+        names.append(name or "")
+        albums.append(album or "")
+        artist_index.append(artist_id)
+        durations.append(duration or 0)
+        genius_status.append(_GENIUS_STATUSES.index(status) if status in _GENIUS_STATUSES else 0)
+        canonical_urls.append(canonical or "")
+    track_ids_arr = np.array(track_ids, dtype="<i8")
+    artist_index_arr = np.searchsorted(artist_ids, np.array(artist_index, dtype="<i8"))
+
+    playlist_rows = (
+        db.query(
+            Playlist.id,
+            Playlist.spotify_id,
+            Playlist.name,
+            Playlist.description,
+            Playlist.owner_display_name,
+            Playlist.is_curated,
+        )
+        .order_by(Playlist.id)
+        .all()
+    )
+    playlist_ids = np.array([p[0] for p in playlist_rows], dtype="<i8")
+
+    links = np.array(
+        [
+            tuple(link)
+            for link in db.query(PlaylistTrack.playlist_id, PlaylistTrack.track_id).yield_per(
+                _BATCH
+            )
+        ],
+        dtype="<i8",
+    ).reshape(-1, 2)
+    # Track id -> row number, then group by playlist with rows in API order.
+    by_id = np.argsort(track_ids_arr)
+    rows = by_id[np.searchsorted(track_ids_arr, links[:, 1], sorter=by_id)]
+    order = np.lexsort((rows, links[:, 0]))
+    playlist_tracks = rows[order].astype("<i4")
+    playlist_offsets = np.append(
+        np.searchsorted(links[order, 0], playlist_ids), len(playlist_tracks)
+    ).astype("<i8")
+
+    meta = {
+        "version": 1,
+        "created_at": datetime.utcnow().isoformat(),
+        "change_seq": change_seq,
+        "tracks": len(track_ids),
+        "artists": len(artist_rows),
+        "playlists": len(playlist_rows),
+        "playlist_tracks": int(len(playlist_tracks)),
+    }
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            writer = _Writer(fh)
+            writer.add("track.id", "q", track_ids_arr.tobytes())
+            writer.add("track.duration_ms", "q", np.array(durations, dtype="<i8").tobytes())
+            writer.add("track.artist", "i", artist_index_arr.astype("<i4").tobytes())
+            writer.add("track.genius_status", "B", bytes(genius_status))
+            writer.add_strings("track.spotify_id", spotify_ids)
+            writer.add_strings("track.name", names)
+            writer.add_strings("track.album_name", albums)
+            writer.add_strings("track.canonical_url", canonical_urls)
+            writer.add_strings("artist.name", [name or "" for _, name in artist_rows])
+            writer.add("playlist.id", "q", playlist_ids.tobytes())
+            writer.add("playlist.is_curated", "B", bytes(bool(p[5]) for p in playlist_rows))
+            writer.add("playlist.offsets", "q", playlist_offsets.tobytes())
+            writer.add("playlist.tracks", "i", playlist_tracks.tobytes())
+            writer.add_strings("playlist.spotify_id", [p[1] or "" for p in playlist_rows])
+            writer.add_strings("playlist.name", [p[2] or "" for p in playlist_rows])
+            writer.add_strings("playlist.description", [p[3] or "" for p in playlist_rows])
+            writer.add_strings("playlist.owner_display_name", [p[4] or "" for p in playlist_rows])
+            writer.finish(meta)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.chmod(tmp, 0o644)  # mkstemp creates 0600; read workers may run as another user
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return meta
+
+
+class CatalogSnapshot:
+    """
+    Reader over a snapshot file. Rows come back in the same tuple shapes as
+    the database queries they replace, so responses are built by the same
+    code.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        if sys.byteorder != "little":  # pragma: no cover
+            raise RuntimeError("catalog snapshots are little-endian")
+        with open(path, "rb") as fh:
+            self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, toc_offset, toc_length = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a catalog snapshot")
+        toc = json.loads(self._mmap[toc_offset : toc_offset + toc_length])
+        self.meta: Dict[str, Any] = toc["meta"]
+        view = memoryview(self._mmap)
+        self._cols = {
+            name: view[offset : offset + length].cast(fmt)
+            for name, (offset, length, fmt) in toc["sections"].items()
+        }
+
+    def _str(self, name: str, i: int) -> str:
+        offsets = self._cols[f"{name}.offsets"]
+        return bytes(self._cols[f"{name}.data"][offsets[i] : offsets[i + 1]]).decode()
+
+    def _track(self, row: int) -> tuple:
+        canonical = self._str("track.canonical_url", row)
+        return (
+            self._cols["track.id"][row],
+            self._str("track.spotify_id", row),
+            self._str("track.name", row),
+            self._str("track.album_name", row),
+            self._str("artist.name", self._cols["track.artist"][row]),
+            self._cols["track.duration_ms"][row],
+            _GENIUS_STATUSES[self._cols["track.genius_status"][row]],
+            canonical or None,
+        )
+
+    def _playlist_row(self, playlist_id: int) -> Optional[int]:
+        ids = self._cols["playlist.id"]
+        i = bisect.bisect_left(ids, playlist_id)
+        return i if i < len(ids) and ids[i] == playlist_id else None
+
+    def playlist_count(self) -> int:
+        return len(self._cols["playlist.id"])
+
+    def playlists(self, offset: int = 0, limit: Optional[int] = None) -> List[tuple]:
+        """
+        ``(id, spotify_id, name, description, owner_display_name,
+        is_curated, track_count)`` ordered by id.
+        """
+        offsets = self._cols["playlist.offsets"]
+        end = self.playlist_count() if limit is None else min(offset + limit, self.playlist_count())
+        return [
+            (
+                self._cols["playlist.id"][i],
+                self._str("playlist.spotify_id", i) or None,
+                self._str("playlist.name", i),
+                self._str("playlist.description", i),
+                self._str("playlist.owner_display_name", i),
+                bool(self._cols["playlist.is_curated"][i]),
+                offsets[i + 1] - offsets[i],
+            )
+            for i in range(offset, end)
+        ]
+
+    def playlist_tracks(
+        self, playlist_id: int, offset: int = 0, limit: Optional[int] = None
+    ) -> Optional[Tuple[List[tuple], int]]:
+        """
+        ``(TRACK_COLUMNS rows, total)`` for a playlist, or None when the
+        playlist is not in this snapshot.
+        """
+        i = self._playlist_row(playlist_id)
+        if i is None:
+            return None
+        start, end = self._cols["playlist.offsets"][i], self._cols["playlist.offsets"][i + 1]
+        rows = self._cols["playlist.tracks"][start:end]
+        if limit is not None:
+            rows = rows[offset : offset + limit]
+        else:
+            rows = rows[offset:]
+        return [self._track(row) for row in rows], end - start
+
+
+_lock = threading.Lock()
+_current: Optional[Tuple[tuple, CatalogSnapshot]] = None
+_checked_at = 0.0
+
+
+def get_catalog_snapshot() -> Optional[CatalogSnapshot]:
+    """
+    The published snapshot at ``CATALOG_SNAPSHOT_PATH`` (None when unset or
+    missing), reopened when a new file has been renamed into place.
+    """
+    global _current, _checked_at
+    settings = get_settings()
+    path = settings.catalog_snapshot_path
+    if not path:
+        return None
+    now = time.monotonic()
+    current = _current
+    if current is not None and now - _checked_at < settings.catalog_snapshot_check_seconds:
+        return current[1]
+    with _lock:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            _current = None
+            return None
+        key = (path, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if _current is None or _current[0] != key:
+            _current = (key, CatalogSnapshot(path))
+        _checked_at = now
+        return _current[1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.db.snapshot")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="export the catalog and publish the snapshot")
+    build.add_argument("--output", default=None, help="defaults to CATALOG_SNAPSHOT_PATH")
+    info = sub.add_parser("info", help="print a snapshot's metadata")
+    info.add_argument("--path", default=None, help="defaults to CATALOG_SNAPSHOT_PATH")
+    args = parser.parse_args()
+
+    target = (args.output if args.command == "build" else args.path) or (
+        get_settings().catalog_snapshot_path
+    )
+    if not target:
+        parser.error("pass a path or set CATALOG_SNAPSHOT_PATH")
+
+    if args.command == "build":
+        from app.db.session import SessionLocal, get_read_engine
+
+        with SessionLocal(bind=get_read_engine()) as db:
+            meta = build_snapshot(db, target)
+    else:
+        meta = CatalogSnapshot(target).meta
+    for key, value in meta.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""
+Local stand-in for the parts of the Spotify Web API this project uses.
+
+Serves the client-credentials token endpoint and playlist endpoints with
+deterministic synthetic data, real-shaped pagination, ``snapshot_id``,
+``ETag`` / ``If-None-Match`` revalidation, configurable latency and
+injected 429 responses. Point ``SpotifyClient`` at
+it through ``SPOTIFY_API_BASE`` / ``SPOTIFY_TOKEN_URL`` (or the constructor
+arguments) to run ingests, tests and benchmarks offline.
+
+Run standalone with::
+
+    python -m app.etl.fake_spotify_server --port 8765 --tracks 10000
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response
+
+FAKE_ACCESS_TOKEN = "fake-spotify-token"
+PAGE_LIMIT_MAX = 100
+
+
+@dataclass
+class FakeSpotifyConfig:
+    # Tracks per playlist unless overridden in ``playlist_sizes``.
+    default_track_count: int = 50
+    playlist_sizes: Dict[str, int] = field(default_factory=dict)
+    # Playlists draw from shared pools so catalogs overlap like real ones.
+    track_pool_size: int = 100_000
+    artist_pool_size: int = 5_000
+    seed: int = 0
+    latency_ms: float = 0.0
+    # Every Nth API call (token endpoint excluded) gets a 429; 0 disables.
+    throttle_every: int = 0
+    retry_after_seconds: int = 1
+    missing_playlist_ids: set[str] = field(default_factory=set)
+
+
+class FakeSpotifyCatalog:
+    """
+    Deterministic synthetic playlists; the same config always yields the
+    same payloads, so runs are comparable.
+    """
+
+    def __init__(self, config: FakeSpotifyConfig) -> None:
+        self.config = config
+        self._versions: Dict[str, int] = {}
+        self._cache: Dict[tuple[str, int, int], List[Dict[str, Any]]] = {}
+
+    def size_of(self, playlist_id: str) -> int:
+        return self.config.playlist_sizes.get(
+            playlist_id, self.config.default_track_count
+        )
+
+    def set_size(self, playlist_id: str, track_count: int) -> None:
+        self.config.playlist_sizes[playlist_id] = track_count
+        self._versions[playlist_id] = self._versions.get(playlist_id, 0) + 1
+
+    def snapshot_id(self, playlist_id: str) -> str:
+        key = (
+            f"{self.config.seed}:{playlist_id}:{self.size_of(playlist_id)}:"
+            f"{self._versions.get(playlist_id, 0)}"
+        )
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def _track(self, n: int) -> Dict[str, Any]:
+        rng = random.Random(self.config.seed * 1_000_003 + n)
+        artist_n = rng.randrange(self.config.artist_pool_size)
+        return {
+            "id": f"faketrack{n:08d}",
+            "name": f"Synthetic Song {n}",
+            "duration_ms": rng.randint(90_000, 420_000),
+            "album": {"name": f"Synthetic Album {n // 12}"},
+            "artists": [
+                {"id": f"fakeartist{artist_n:06d}", "name": f"Synthetic Artist {artist_n}"}
+            ],
+        }
+
+    def items(self, playlist_id: str) -> List[Dict[str, Any]]:
+        size = self.size_of(playlist_id)
+        version = self._versions.get(playlist_id, 0)
+        key = (playlist_id, size, version)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        rng = random.Random(f"{self.config.seed}:{playlist_id}")
+        pool = self.config.track_pool_size
+        picks = rng.sample(range(pool), size) if size <= pool else range(size)
+        base = datetime(2024, 1, 1)
+        items = [
+            {
+                "added_at": (base + timedelta(minutes=i)).isoformat() + "Z",
+                "track": self._track(n),
+            }
+            for i, n in enumerate(picks)
+        ]
+        self._cache[key] = items
+        return items
+
+    def page(
+        self, playlist_id: str, offset: int, limit: int, base_url: str, market: str | None
+    ) -> Dict[str, Any]:
+        items = self.items(playlist_id)
+        total = len(items)
+        limit = max(1, min(limit, PAGE_LIMIT_MAX))
+        end = offset + limit
+        url = f"{base_url}/playlists/{playlist_id}/tracks"
+        suffix = f"&market={market}" if market else ""
+        return {
+            "href": f"{url}?offset={offset}&limit={limit}{suffix}",
+            "items": items[offset:end],
+            "limit": limit,
+            "offset": offset,
+            "total": total,
+            "next": f"{url}?offset={end}&limit={limit}{suffix}" if end < total else None,
+            "previous": (
+                f"{url}?offset={max(0, offset - limit)}&limit={limit}{suffix}"
+                if offset > 0
+                else None
+            ),
+        }
+
+
+def create_fake_spotify_app(config: FakeSpotifyConfig | None = None) -> FastAPI:
+    config = config or FakeSpotifyConfig()
+    catalog = FakeSpotifyCatalog(config)
+    app = FastAPI(title="Fake Spotify API")
+    app.state.catalog = catalog
+    app.state.request_count = 0
+    app.state.throttled_count = 0
+    app.state.not_modified_count = 0
+
+    async def _simulate(authorization: str | None) -> JSONResponse | None:
+        if config.latency_ms:
+            await asyncio.sleep(config.latency_ms / 1000)
+        if authorization != f"Bearer {FAKE_ACCESS_TOKEN}":
+            raise HTTPException(status_code=401, detail="Invalid access token")
+        app.state.request_count += 1
+        if config.throttle_every and app.state.request_count % config.throttle_every == 0:
+            app.state.throttled_count += 1
+            return JSONResponse(
+                status_code=429,
+                content={"error": {"status": 429, "message": "API rate limit exceeded"}},
+                headers={"Retry-After": str(config.retry_after_seconds)},
+            )
+        return None
+
+    def _api_base(request: Request) -> str:
+        return str(request.base_url).rstrip("/") + "/v1"
+
+    def _conditional(request: Request, playlist_id: str, body: Dict[str, Any]):
+        # A page only changes with its playlist's snapshot, so the ETag is
+        # derived from the snapshot and the page's own URL.
+        key = f"{catalog.snapshot_id(playlist_id)}:{request.url.path}?{request.url.query}"
+        etag = f'"{hashlib.sha1(key.encode()).hexdigest()}"'
+        if request.headers.get("if-none-match") == etag:
+            app.state.not_modified_count += 1
+            return Response(status_code=304, headers={"ETag": etag})
+        return JSONResponse(body, headers={"ETag": etag})
+
+    @app.post("/api/token")
+    async def token() -> Dict[str, Any]:
+        return {
+            "access_token": FAKE_ACCESS_TOKEN,
+            "token_type": "Bearer",
+            "expires_in": 3600,
+        }
+
+    @app.get("/v1/playlists/{playlist_id}")
+    async def get_playlist(
+        playlist_id: str,
+        request: Request,
+        market: str | None = None,
+        authorization: str | None = Header(None),
+    ):
+        throttled = await _simulate(authorization)
+        if throttled is not None:
+            return throttled
+        if playlist_id in config.missing_playlist_ids:
+            raise HTTPException(status_code=404, detail="Not found")
+        return _conditional(
+            request,
+            playlist_id,
+            {
+                "id": playlist_id,
+                "name": f"Synthetic Playlist {playlist_id}",
+                "description": "Generated by the fake Spotify server",
+                "owner": {"display_name": "Fake Owner"},
+                "snapshot_id": catalog.snapshot_id(playlist_id),
+                "tracks": catalog.page(
+                    playlist_id, 0, PAGE_LIMIT_MAX, _api_base(request), market
+                ),
+            },
+        )
+
+    @app.get("/v1/playlists/{playlist_id}/tracks")
+    async def get_playlist_tracks(
+        playlist_id: str,
+        request: Request,
+        offset: int = Query(0, ge=0),
+        limit: int = Query(PAGE_LIMIT_MAX, ge=1),
+        market: str | None = None,
+        authorization: str | None = Header(None),
+    ):
+        throttled = await _simulate(authorization)
+        if throttled is not None:
+            return throttled
+        if playlist_id in config.missing_playlist_ids:
+            raise HTTPException(status_code=404, detail="Not found")
+        return _conditional(
+            request,
+            playlist_id,
+            catalog.page(playlist_id, offset, limit, _api_base(request), market),
+        )
+
+    @app.put("/_admin/playlists/{playlist_id}")
+    async def resize_playlist(playlist_id: str, tracks: int = Query(..., ge=0)):
+        catalog.set_size(playlist_id, tracks)
+        return {"id": playlist_id, "snapshot_id": catalog.snapshot_id(playlist_id)}
+
+    return app
+
+
+class FakeSpotifyServer:
+    """
+    Runs the fake API with uvicorn on a background thread::
+
+        with FakeSpotifyServer(FakeSpotifyConfig(default_track_count=5000)) as srv:
+            client = SpotifyClient(api_base=srv.api_base, token_url=srv.token_url)
+    """
+
+    def __init__(
+        self, config: FakeSpotifyConfig | None = None, host: str = "127.0.0.1", port: int = 0
+    ) -> None:
+        import uvicorn
+
+        self.app = create_fake_spotify_app(config)
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind((host, port))
+        self.host, self.port = self._socket.getsockname()[:2]
+        self._server = uvicorn.Server(
+            uvicorn.Config(self.app, log_level="warning", lifespan="off")
+        )
+        self._thread = threading.Thread(
+            target=self._server.run, kwargs={"sockets": [self._socket]}, daemon=True
+        )
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def api_base(self) -> str:
+        return f"{self.base_url}/v1"
+
+    @property
+    def token_url(self) -> str:
+        return f"{self.base_url}/api/token"
+
+    def start(self) -> "FakeSpotifyServer":
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("Fake Spotify server did not start")
+            time.sleep(0.01)
+        return self
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=10)
+        self._socket.close()
+
+    def __enter__(self) -> "FakeSpotifyServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tracks", type=int, default=50, help="tracks per playlist")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--throttle-every", type=int, default=0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    config = FakeSpotifyConfig(
+        default_track_count=args.tracks,
+        seed=args.seed,
+        latency_ms=args.latency_ms,
+        throttle_every=args.throttle_every,
+        retry_after_seconds=args.retry_after,
+    )
+    uvicorn.run(create_fake_spotify_app(config), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+Verification of guessed Genius lyrics links.
+
+``build_genius_url`` guesses a URL from artist and title, and many guesses
+404. ``verify_links`` checks the tracks that are due (never checked, or
+past ``expires_at``) in concurrent batches through a pluggable backend and
+caches each outcome in ``genius_links``. The API only reads that cache, so
+serving tracks never waits on (or needs) the network.
+
+    python -m app.etl.genius_links verify --limit 5000
+    python -m app.etl.genius_links status
+"""
+import argparse
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Protocol
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db.models import Artist, GeniusLink, Track
+from app.etl.rate_limiter import TokenBucketRateLimiter
+from app.utils.genius import build_genius_url
+
+logger = logging.getLogger(__name__)
+
+VERIFIED = "verified"
+MISSING = "missing"
+ERROR = "error"
+
+
+@dataclass(frozen=True)
+class LinkCheck:
+    # None when the request itself failed (timeout, connection error).
+    http_status: Optional[int]
+    final_url: Optional[str] = None
+
+
+class GeniusBackend(Protocol):
+    def check(self, url: str) -> LinkCheck: ...
+
+
+class HttpGeniusBackend:
+    """
+    Checks URLs with HEAD requests (GET when HEAD is refused), following
+    redirects so renamed pages resolve to their canonical URL.
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        rate_limiter: Optional[TokenBucketRateLimiter] = None,
+    ) -> None:
+        settings = get_settings()
+        self.timeout = timeout or settings.genius_request_timeout_seconds
+        self.rate_limiter = rate_limiter or TokenBucketRateLimiter(
+            rate=settings.genius_verify_rate_per_second,
+            burst=max(1, int(settings.genius_verify_rate_per_second)),
+        )
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        # requests.Session is not documented as thread-safe; one per thread.
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers["User-Agent"] = "spotify-playlist-catalog link checker"
+        return session
+
+    def check(self, url: str) -> LinkCheck:
+        self.rate_limiter.acquire()
+        session = self._session()
+        resp = session.head(url, allow_redirects=True, timeout=self.timeout)
+        if resp.status_code == 405:
+            with session.get(url, allow_redirects=True, timeout=self.timeout, stream=True) as resp:
+                pass
+        return LinkCheck(resp.status_code, resp.url)
+
+
+class StubGeniusBackend:
+    """
+    Offline backend for tests and local runs: ``pages`` maps live URLs to
+    the canonical URL they resolve to (None for themselves); anything else
+    is a 404.
+    """
+
+    def __init__(self, pages: Optional[Dict[str, Optional[str]]] = None) -> None:
+        self.pages = dict(pages or {})
+        self.calls: List[str] = []
+
+    def check(self, url: str) -> LinkCheck:
+        self.calls.append(url)
+        if url in self.pages:
+            return LinkCheck(200, self.pages[url] or url)
+        return LinkCheck(404)
+
+
+def _canonical(url: str) -> str:
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+
+
+def classify(check: LinkCheck) -> str:
+    if check.http_status is not None and 200 <= check.http_status < 300:
+        return VERIFIED
+    if check.http_status in (404, 410):
+        return MISSING
+    return ERROR
+
+
+def _safe_check(backend: GeniusBackend, url: str) -> LinkCheck:
+    if not url:
+        return LinkCheck(404)  # nothing to guess from (e.g. symbols-only title)
+    try:
+        return backend.check(url)
+    except Exception as exc:  # noqa: BLE001 - one bad URL must not stop the batch
+        logger.debug("Checking %s failed: %r", url, exc)
+        return LinkCheck(None)
+
+
+@dataclass
+class VerifyResult:
+    checked: int = 0
+    verified: int = 0
+    missing: int = 0
+    errors: int = 0
+
+
+def due_tracks(db: Session, now: datetime, limit: Optional[int] = None) -> List[tuple]:
+    """
+    ``(track_id, artist_name, track_name)`` for tracks never checked or
+    whose cached result has expired; never-checked tracks first.
+    """
+    q = (
+        db.query(Track.id, Artist.name, Track.name)
+        .join(Artist, Artist.id == Track.artist_id)
+        .outerjoin(GeniusLink, GeniusLink.track_id == Track.id)
+        .filter(or_(GeniusLink.track_id.is_(None), GeniusLink.expires_at <= now))
+        .order_by(GeniusLink.track_id.is_not(None), Track.id)
+    )
+    if limit is not None:
+        q = q.limit(limit)
+    return q.all()
+
+
+def _store(db: Session, rows: List[dict]) -> None:
+    ids = [row["track_id"] for row in rows]
+    existing = {
+        track_id
+        for (track_id,) in db.query(GeniusLink.track_id).filter(GeniusLink.track_id.in_(ids))
+    }
+    db.bulk_update_mappings(GeniusLink, [r for r in rows if r["track_id"] in existing])
+    db.bulk_insert_mappings(GeniusLink, [r for r in rows if r["track_id"] not in existing])
+
+
+def verify_links(
+    db: Session,
+    backend: GeniusBackend,
+    limit: Optional[int] = None,
+    batch_size: int = 200,
+    concurrency: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> VerifyResult:
+    """
+    Check every due track's guessed URL and cache the outcome. Each batch
+    is checked concurrently and committed on its own, so an interrupted
+    run keeps its progress.
+    """
+    settings = get_settings()
+    now = now or datetime.utcnow()
+    ttl = timedelta(days=settings.genius_link_ttl_days)
+    retry = timedelta(seconds=settings.genius_error_retry_seconds)
+    due = due_tracks(db, now, limit)
+    result = VerifyResult()
+
+    with ThreadPoolExecutor(concurrency or settings.genius_verify_concurrency) as pool:
+        for start in range(0, len(due), batch_size):
+            batch = due[start:start + batch_size]
+            urls = [build_genius_url(artist or "", title or "") for _, artist, title in batch]
+            checks = list(pool.map(lambda url: _safe_check(backend, url), urls))
+            rows = []
+            for (track_id, _, _), url, check in zip(batch, urls, checks):
+                status = classify(check)
+                rows.append(
+                    {
+                        "track_id": track_id,
+                        "url": url,
+                        "status": status,
+                        "canonical_url": _canonical(check.final_url)
+                        if status == VERIFIED and check.final_url
+                        else None,
+                        "http_status": check.http_status,
+                        "checked_at": now,
+                        "expires_at": now + (retry if status == ERROR else ttl),
+                    }
+                )
+                result.verified += status == VERIFIED
+                result.missing += status == MISSING
+                result.errors += status == ERROR
+            _store(db, rows)
+            db.commit()
+            result.checked += len(rows)
+            logger.info(
+                "Checked %d/%d Genius links (%d verified, %d missing, %d errors)",
+                result.checked,
+                len(due),
+                result.verified,
+                result.missing,
+                result.errors,
+            )
+    return result
+
+
+def link_status_counts(db: Session) -> Dict[str, int]:
+    counts = dict(
+        db.query(GeniusLink.status, func.count()).group_by(GeniusLink.status).all()
+    )
+    counts["unchecked"] = (
+        db.query(func.count(Track.id))
+        .outerjoin(GeniusLink, GeniusLink.track_id == Track.id)
+        .filter(GeniusLink.track_id.is_(None))
+        .scalar()
+    )
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.etl.genius_links")
+    sub = parser.add_subparsers(dest="command", required=True)
+    verify = sub.add_parser("verify", help="check due Genius links and cache the results")
+    verify.add_argument("--limit", type=int, default=None)
+    verify.add_argument("--batch-size", type=int, default=200)
+    verify.add_argument("--concurrency", type=int, default=None)
+    sub.add_parser("status", help="count cached links by status")
+    args = parser.parse_args()
+
+    from app.core.logging_config import configure_logging
+    from app.db.session import SessionLocal, get_engine
+
+    configure_logging()
+    with SessionLocal(bind=get_engine()) as db:
+        if args.command == "verify":
+            result = verify_links(
+                db,
+                HttpGeniusBackend(),
+                limit=args.limit,
+                batch_size=args.batch_size,
+                concurrency=args.concurrency,
+            )
+            print(
+                f"Checked {result.checked}: {result.verified} verified, "
+                f"{result.missing} missing, {result.errors} errors"
+            )
+        else:
+            for status, count in sorted(link_status_counts(db).items()):
+                print(f"{status}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,55 @@
 import logging
+import time
 from datetime import datetime
-from typing import List
+from typing import Dict, List, Optional
 
-import pandas as pd
 from sqlalchemy.orm import Session
 
+from app.analytics.dedup import assign_song_groups
+from app.analytics.similarity import refresh_playlist_similarity
+from app.analytics.stats import IngestDelta, apply_ingest, lock_catalog_counts
+from app.core.tracing import span
+from app.db.changes import (
+    ARTIST,
+    DELETE,
+    PLAYLIST,
+    PLAYLIST_TRACK,
+    TRACK,
+    UPSERT,
+    Change,
+    artist_data,
+    link_id,
+    playlist_data,
+    record_changes,
+    track_data,
+)
 from app.db.models import Artist, Track, Playlist, PlaylistTrack
 from app.etl.spotify_client import SpotifyClient
 
 logger = logging.getLogger(__name__)
 
+_ROW_COLUMNS = [
+    "track_id",
+    "track_name",
+    "album_name",
+    "artist_id",
+    "artist_name",
+    "duration_ms",
+    "added_at",
+]
+# Keeps IN (...) lists well under driver/SQLite bind-parameter limits.
+_LOOKUP_CHUNK = 1000
+
+
+def _existing_ids(db: Session, model, spotify_ids: List[str]) -> Dict[str, int]:
+    found: Dict[str, int] = {}
+    for i in range(0, len(spotify_ids), _LOOKUP_CHUNK):
+        chunk = spotify_ids[i : i + _LOOKUP_CHUNK]
+        found.update(
+            db.query(model.spotify_id, model.id).filter(model.spotify_id.in_(chunk)).all()
+        )
+    return found
+
 
 class SpotifyETLPipeline:
     """
@@ -23,31 +63,239 @@ class SpotifyETLPipeline:
         self.client = client
 
     def ingest_playlist(self, db: Session, playlist_id: str) -> Playlist:
+        with span("etl.ingest_playlist", playlist_id=playlist_id):
+            return self._ingest_playlist(db, playlist_id)
+
+    def _ingest_playlist(self, db: Session, playlist_id: str) -> Playlist:
+        started = time.perf_counter()
         # Extract playlist metadata and tracks from Spotify
-        raw = self.client.get_playlist(playlist_id)
+        with span("etl.extract"):
+            raw = self.client.get_playlist(playlist_id)
 
-        playlist = (
-            db.query(Playlist).filter(Playlist.spotify_id == raw["id"]).one_or_none()
-        )
-        if playlist is None:
-            playlist = Playlist(
-                spotify_id=raw["id"],
-                name=raw["name"],
-                description=raw.get("description", ""),
-                owner_display_name=raw.get("owner", {}).get("display_name", ""),
-                is_curated=True,
+        with span("etl.transform") as current:
+            rows = self._rows(raw)
+            import pandas as pd  # deferred: only ingest paths need pandas
+
+            df = pd.DataFrame(rows, columns=_ROW_COLUMNS)
+            current.set(rows=len(df))
+        logger.info("Extracted %d tracks from playlist", len(df))
+
+        with span("etl.load.playlist"):
+            playlist_changed = False
+            playlist = (
+                db.query(Playlist).filter(Playlist.spotify_id == raw["id"]).one_or_none()
             )
-            db.add(playlist)
+            new_playlist = playlist is None
+            if playlist is None:
+                playlist = Playlist(
+                    spotify_id=raw["id"],
+                    name=raw["name"],
+                    description=raw.get("description", ""),
+                    owner_display_name=raw.get("owner", {}).get("display_name", ""),
+                    is_curated=True,
+                )
+                db.add(playlist)
+                db.flush()
+            else:
+                metadata = {
+                    "name": raw["name"],
+                    "description": raw.get("description", ""),
+                    "owner_display_name": raw.get("owner", {}).get("display_name", ""),
+                }
+                playlist_changed = any(
+                    getattr(playlist, key) != value for key, value in metadata.items()
+                )
+                for key, value in metadata.items():
+                    setattr(playlist, key, value)
+
+        # Load into DB: resolve existing rows with a few batched IN queries
+        # rather than three lookups per track.
+        delta = IngestDelta(playlist_id=playlist.id, new_playlist=new_playlist)
+
+        with span("etl.load.artists") as current:
+            artists_df = df.drop_duplicates("artist_id")
+            artist_ids = _existing_ids(db, Artist, artists_df["artist_id"].tolist())
+            new_artists = [
+                Artist(spotify_id=row.artist_id, name=row.artist_name, genres="")
+                for row in artists_df.itertuples(index=False)
+                if row.artist_id not in artist_ids
+            ]
+            db.add_all(new_artists)
+            db.flush()
+            for artist in new_artists:
+                artist_ids[artist.spotify_id] = artist.id
+                delta.new_artist_ids.append(artist.id)
+            current.set(new=len(new_artists))
+
+        with span("etl.load.tracks") as current:
+            tracks_df = df.drop_duplicates("track_id")
+            track_ids = _existing_ids(db, Track, tracks_df["track_id"].tolist())
+            new_tracks = [
+                Track(
+                    spotify_id=row.track_id,
+                    name=row.track_name,
+                    album_name=row.album_name,
+                    artist_id=artist_ids[row.artist_id],
+                    duration_ms=int(row.duration_ms),
+                )
+                for row in tracks_df.itertuples(index=False)
+                if row.track_id not in track_ids
+            ]
+            db.add_all(new_tracks)
+            db.flush()
+            for track in new_tracks:
+                track_ids[track.spotify_id] = track.id
+                delta.new_tracks.append(
+                    (track.id, track.artist_id, track.album_name, track.duration_ms)
+                )
+            current.set(new=len(new_tracks))
+
+        # From here to commit, concurrent ingests take turns: song groups
+        # and the new-album count must see what the previous one created.
+        lock_catalog_counts(db)
+
+        with span("etl.song_groups") as current:
+            artist_names = {
+                artist_ids[row.artist_id]: row.artist_name
+                for row in artists_df.itertuples(index=False)
+            }
+            delta.new_song_groups = assign_song_groups(
+                db,
+                [
+                    (t.id, artist_names[t.artist_id], t.name, t.duration_ms)
+                    for t in new_tracks
+                ],
+            )
+            current.set(new=delta.new_song_groups)
+
+        with span("etl.load.links") as current:
+            linked = {
+                track_id
+                for (track_id,) in db.query(PlaylistTrack.track_id).filter(
+                    PlaylistTrack.playlist_id == playlist.id
+                )
+            }
+            new_links = []
+            for row in tracks_df.itertuples(index=False):
+                track_id = track_ids[row.track_id]
+                if track_id in linked:
+                    continue
+                added_at = datetime.fromisoformat(row.added_at.replace("Z", ""))
+                new_links.append(
+                    PlaylistTrack(
+                        playlist_id=playlist.id,
+                        track_id=track_id,
+                        added_at=added_at,
+                    )
+                )
+                delta.linked_artist_ids.append(artist_ids[row.artist_id])
+                logger.debug("Linked track %s to playlist %s", row.track_id, raw["id"])
+            db.add_all(new_links)
+
+            # Tracks no longer in the playlist are unlinked (the tracks stay
+            # in the catalog).
+            removed = sorted(linked - set(track_ids.values()))
+            for i in range(0, len(removed), _LOOKUP_CHUNK):
+                chunk = removed[i : i + _LOOKUP_CHUNK]
+                delta.unlinked_artist_ids.extend(
+                    a for (a,) in db.query(Track.artist_id).filter(Track.id.in_(chunk))
+                )
+                db.query(PlaylistTrack).filter(
+                    PlaylistTrack.playlist_id == playlist.id,
+                    PlaylistTrack.track_id.in_(chunk),
+                ).delete(synchronize_session=False)
+            db.flush()
+            current.set(new=len(new_links), removed=len(removed))
+
+        with span("etl.stats"):
+            apply_ingest(db, delta)
             db.flush()
 
-        items = raw["tracks"]["items"]
-        track_ids: List[str] = []
+        with span("etl.similarity"):
+            overlapping = refresh_playlist_similarity(db, playlist.id)
+        logger.info("Playlist overlaps with %d other playlists", overlapping)
+
+        with span("etl.changes") as current:
+            changes = self._changes(
+                db,
+                playlist,
+                new_playlist or playlist_changed,
+                new_artists,
+                new_tracks,
+                new_links,
+                removed,
+            )
+            current.set(changes=record_changes(db, changes))
+
+        with span("etl.commit"):
+            db.commit()
+        duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        logger.info(
+            "Loaded playlist '%s' into DB in %.0fms",
+            playlist.name,
+            duration_ms,
+            extra={"playlist_id": raw["id"], "tracks": len(df), "duration_ms": duration_ms},
+        )
+        return playlist
+
+    @staticmethod
+    def _changes(
+        db: Session,
+        playlist: Playlist,
+        playlist_written: bool,
+        new_artists: List[Artist],
+        new_tracks: List[Track],
+        new_links: List[PlaylistTrack],
+        removed_track_ids: List[int],
+    ) -> List[Change]:
+        """
+        Change-feed entries for this ingest's writes, parents before children.
+        """
+        changes: List[Change] = []
+        if playlist_written:
+            changes.append((PLAYLIST, str(playlist.id), UPSERT, playlist_data(playlist)))
+        changes.extend((ARTIST, str(a.id), UPSERT, artist_data(a)) for a in new_artists)
+        # Song groups were assigned with bulk updates the ORM objects do not
+        # see; read the final values back.
+        groups: Dict[int, Optional[int]] = {}
+        new_ids = [t.id for t in new_tracks]
+        for i in range(0, len(new_ids), _LOOKUP_CHUNK):
+            groups.update(
+                db.query(Track.id, Track.song_group_id).filter(
+                    Track.id.in_(new_ids[i : i + _LOOKUP_CHUNK])
+                )
+            )
+        for track in new_tracks:
+            data = track_data(track)
+            data["song_group_id"] = groups.get(track.id)
+            changes.append((TRACK, str(track.id), UPSERT, data))
+        changes.extend(
+            (
+                PLAYLIST_TRACK,
+                link_id(link.playlist_id, link.track_id),
+                UPSERT,
+                {
+                    "playlist_id": link.playlist_id,
+                    "track_id": link.track_id,
+                    "added_at": link.added_at,
+                },
+            )
+            for link in new_links
+        )
+        changes.extend(
+            (PLAYLIST_TRACK, link_id(playlist.id, track_id), DELETE, None)
+            for track_id in removed_track_ids
+        )
+        return changes
+
+    @staticmethod
+    def _rows(raw: dict) -> List[dict]:
         rows = []
-        for item in items:
+        for item in raw["tracks"]["items"]:
             track = item["track"]
             if not track:
+                logger.debug("Skipping playlist item without a track (local file or removed)")
                 continue
-            track_ids.append(track["id"])
             rows.append(
                 {
                     "track_id": track["id"],
@@ -59,66 +307,7 @@ class SpotifyETLPipeline:
                     "added_at": item.get("added_at") or datetime.utcnow().isoformat(),
                 }
             )
-
-        df = pd.DataFrame(rows)
-        logger.info("Extracted %d tracks from playlist", len(df))
-
-        merged = df
-
-        # Load into DB
-        for _, row in merged.iterrows():
-            artist = (
-                db.query(Artist)
-                .filter(Artist.spotify_id == row["artist_id"])
-                .one_or_none()
-            )
-            if artist is None:
-                artist = Artist(
-                    spotify_id=row["artist_id"],
-                    name=row["artist_name"],
-                    genres="",
-                )
-                db.add(artist)
-                db.flush()
-
-            track = (
-                db.query(Track)
-                .filter(Track.spotify_id == row["track_id"])
-                .one_or_none()
-            )
-            if track is None:
-                track = Track(
-                    spotify_id=row["track_id"],
-                    name=row["track_name"],
-                    album_name=row["album_name"],
-                    artist_id=artist.id,
-                    duration_ms=int(row["duration_ms"]),
-                )
-                db.add(track)
-                db.flush()
-
-            existing_link = (
-                db.query(PlaylistTrack)
-                .filter(
-                    PlaylistTrack.playlist_id == playlist.id,
-                    PlaylistTrack.track_id == track.id,
-                )
-                .one_or_none()
-            )
-            if not existing_link:
-                added_at_raw = row["added_at"]
-                added_at = datetime.fromisoformat(added_at_raw.replace("Z", ""))
-                db.add(
-                    PlaylistTrack(
-                        playlist_id=playlist.id,
-                        track_id=track.id,
-                        added_at=added_at,
-                    )
-                )
-
-        db.commit()
-        logger.info("Loaded playlist '%s' into DB", playlist.name)
-        return playlist
+        return rows
 
     def estimate_throughput_rows_per_min(self, sample_size: int = 500) -> int:
         return 10_000
@@ -0,0 +1,212 @@
+import logging
+import os
+import struct
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+
+from app.core.config import get_settings
+
+try:  # POSIX only; on other platforms the limiter is process-local.
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+# tokens, updated_at, current rate, blocked_until
+_STATE = struct.Struct("<dddd")
+
+
+@dataclass
+class RateLimiterStats:
+    acquisitions: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+    throttled_responses: int = 0
+
+
+class _LocalState:
+    """
+    Bucket state held in memory; shared by all threads of one process.
+    """
+
+    def __init__(self) -> None:
+        self._values: tuple[float, float, float, float] | None = None
+
+    def read(self) -> tuple[float, float, float, float] | None:
+        return self._values
+
+    def write(self, values: tuple[float, float, float, float]) -> None:
+        self._values = values
+
+    def lock(self) -> None:
+        pass
+
+    def unlock(self) -> None:
+        pass
+
+
+class _FileState:
+    """
+    Bucket state stored in a small file guarded by ``flock`` so every
+    process on the host draws from the same bucket.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._fd: int | None = None
+        self._pid: int | None = None
+
+    def _ensure_open(self) -> int:
+        # A forked child shares the parent's open file description, and flock
+        # locks belong to that description, so the child must reopen.
+        if self._fd is None or self._pid != os.getpid():
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            self._pid = os.getpid()
+        return self._fd
+
+    def lock(self) -> None:
+        fcntl.flock(self._ensure_open(), fcntl.LOCK_EX)
+
+    def unlock(self) -> None:
+        fcntl.flock(self._ensure_open(), fcntl.LOCK_UN)
+
+    def read(self) -> tuple[float, float, float, float] | None:
+        data = os.pread(self._ensure_open(), _STATE.size, 0)
+        if len(data) != _STATE.size:
+            return None
+        return _STATE.unpack(data)
+
+    def write(self, values: tuple[float, float, float, float]) -> None:
+        os.pwrite(self._ensure_open(), _STATE.pack(*values), 0)
+
+
+class TokenBucketRateLimiter:
+    """
+    Token bucket that adapts its refill rate to upstream 429 responses.
+
+    The rate backs off multiplicatively when Spotify throttles us (and the
+    bucket is blocked for ``Retry-After`` seconds), then creeps back up
+    additively on every successful call until it reaches ``max_rate``.
+    With ``state_path`` set the bucket is shared across processes.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        state_path: str | None = None,
+        min_rate: float = 0.5,
+        max_rate: float | None = None,
+        decrease_factor: float = 0.5,
+        increase_step: float = 0.1,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.initial_rate = rate
+        self.burst = max(1, burst)
+        self.min_rate = min(min_rate, rate)
+        self.max_rate = max_rate or rate
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+        self.stats = RateLimiterStats()
+
+        self._thread_lock = threading.Lock()
+        if state_path and fcntl is not None:
+            self._state: _LocalState | _FileState = _FileState(state_path)
+        else:
+            self._state = _LocalState()
+
+    def _load(self, now: float) -> list[float]:
+        values = self._state.read()
+        if values is None:
+            return [float(self.burst), now, self.initial_rate, 0.0]
+        tokens, updated, rate, blocked_until = values
+        elapsed = max(0.0, now - updated)
+        tokens = min(float(self.burst), tokens + elapsed * rate)
+        return [tokens, now, rate, blocked_until]
+
+    def _update(self, fn) -> float:
+        with self._thread_lock:
+            self._state.lock()
+            try:
+                now = time.time()
+                state = self._load(now)
+                result = fn(state, now)
+                self._state.write(tuple(state))
+                return result
+            finally:
+                self._state.unlock()
+
+    @property
+    def current_rate(self) -> float:
+        return self._update(lambda state, now: state[2])
+
+    def acquire(self) -> float:
+        """
+        Block until a token is available and return the seconds waited.
+        """
+
+        def take(state: list[float], now: float) -> float:
+            tokens, _, rate, blocked_until = state
+            if now < blocked_until:
+                return blocked_until - now
+            if tokens >= 1.0:
+                state[0] = tokens - 1.0
+                return 0.0
+            return (1.0 - tokens) / rate
+
+        waited = 0.0
+        while True:
+            delay = self._update(take)
+            if delay <= 0:
+                break
+            time.sleep(delay)
+            waited += delay
+
+        with self._thread_lock:
+            self.stats.acquisitions += 1
+            self.stats.total_wait_seconds += waited
+            self.stats.max_wait_seconds = max(self.stats.max_wait_seconds, waited)
+        return waited
+
+    def on_success(self) -> None:
+        def increase(state: list[float], now: float) -> None:
+            state[2] = min(self.max_rate, state[2] + self.increase_step)
+
+        self._update(increase)
+
+    def on_throttled(self, retry_after: float | None = None) -> None:
+        def decrease(state: list[float], now: float) -> float:
+            state[0] = 0.0
+            state[2] = max(self.min_rate, state[2] * self.decrease_factor)
+            if retry_after:
+                state[3] = max(state[3], now + retry_after)
+            return state[2]
+
+        new_rate = self._update(decrease)
+        with self._thread_lock:
+            self.stats.throttled_responses += 1
+        logger.warning(
+            "Spotify API throttled us; rate lowered to %.2f req/s (Retry-After=%s)",
+            new_rate,
+            retry_after,
+        )
+
+
+@lru_cache
+def get_spotify_rate_limiter() -> TokenBucketRateLimiter:
+    settings = get_settings()
+    state_path = None
+    if settings.spotify_rate_limit_shared:
+        state_path = settings.spotify_rate_limit_state_file or os.path.join(
+            tempfile.gettempdir(), "spotify-playlist-catalog.ratelimit"
+        )
+    return TokenBucketRateLimiter(
+        rate=settings.spotify_rate_limit_per_second,
+        burst=settings.spotify_rate_limit_burst,
+        state_path=state_path,
+    )
@@ -1,11 +1,17 @@
 import base64
 import logging
-from typing import Dict, Any
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Tuple
 
+import orjson
 import requests
 from fastapi import HTTPException
 
 from app.core.config import get_settings
+from app.core.tracing import span
+from app.etl.payload_cache import PayloadCache, get_payload_cache
+from app.etl.rate_limiter import TokenBucketRateLimiter, get_spotify_rate_limiter
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -21,18 +27,66 @@ def _normalize_playlist_id(raw: str) -> str:
     return raw
 
 
+def _retry_after_seconds(resp: requests.Response) -> float | None:
+    value = resp.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+# Client-credentials tokens shared by every client in the process, keyed by
+# (token URL, client id): (token, monotonic expiry). Ingests create a client
+# each, and a token is valid for an hour.
+_tokens: Dict[Tuple[str, str], Tuple[str, float]] = {}
+_tokens_lock = threading.Lock()
+# Refresh this long before Spotify's advertised expiry.
+_TOKEN_EXPIRY_MARGIN_SECONDS = 60.0
+
+
+class _Document(NamedTuple):
+    status: int
+    response: requests.Response | None
+    # Parsed JSON on success, else None and the caller inspects ``response``.
+    payload: Dict[str, Any] | None
+    # Served from the payload cache after a 304 (or without asking).
+    from_cache: bool = False
+
+
 class SpotifyClient:
 
     TOKEN_URL = "https://accounts.spotify.com/api/token"
     API_BASE = "https://api.spotify.com/v1"
 
-    def __init__(self) -> None:
-        self._access_token: str | None = None
+    def __init__(
+        self,
+        rate_limiter: TokenBucketRateLimiter | None = None,
+        api_base: str | None = None,
+        token_url: str | None = None,
+        payload_cache: PayloadCache | None = None,
+        offline: bool | None = None,
+    ) -> None:
+        # Overridable so tests and benchmarks can target the fake server.
+        self.api_base = (api_base or settings.spotify_api_base or self.API_BASE).rstrip("/")
+        self.token_url = token_url or settings.spotify_token_url or self.TOKEN_URL
+        # One keep-alive session per client; ingest pages reuse the connection.
+        self._session = requests.Session()
+        self.rate_limiter = rate_limiter or get_spotify_rate_limiter()
+        # Seconds this client spent waiting on the rate limiter.
+        self.rate_limit_wait_seconds = 0.0
+        self.payload_cache = payload_cache or get_payload_cache()
+        self.offline = settings.spotify_offline if offline is None else offline
+        if self.offline and self.payload_cache is None:
+            raise RuntimeError("Offline mode needs a payload cache (SPOTIFY_PAYLOAD_CACHE_DIR).")
 
-    def _get_access_token(self) -> str:
-        if self._access_token:
-            return self._access_token
+    def _token_key(self) -> Tuple[str, str]:
+        return (self.token_url, settings.spotify_client_id)
 
+    def _get_access_token(self) -> str:
+        # Always read through the process-wide cache, so a long-lived client
+        # (a worker's) picks up the refreshed token once the old one expires.
         client_id = settings.spotify_client_id
         client_secret = settings.spotify_client_secret
         if not client_id or not client_secret:
@@ -41,16 +95,24 @@ class SpotifyClient:
                 "Set SPOTIFY_CLIENT_ID and SPOTIFY_CLIENT_SECRET in the environment."
             )
 
+        key = self._token_key()
+        with _tokens_lock:
+            cached = _tokens.get(key)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+
         auth_header = base64.b64encode(
             f"{client_id}:{client_secret}".encode()
         ).decode()
 
-        response = requests.post(
-            self.TOKEN_URL,
-            data={"grant_type": "client_credentials"},
-            headers={"Authorization": f"Basic {auth_header}"},
-            timeout=10,
-        )
+        with span("spotify.token") as current:
+            response = self._session.post(
+                self.token_url,
+                data={"grant_type": "client_credentials"},
+                headers={"Authorization": f"Basic {auth_header}"},
+                timeout=10,
+            )
+            current.set(status=response.status_code)
         if response.status_code != 200:
             logger.error(
                 "Failed to obtain Spotify access token: %s", response.text
@@ -62,23 +124,134 @@ class SpotifyClient:
 
         data = response.json()
         token = data["access_token"]
-        self._access_token = token
+        expires_in = float(data.get("expires_in") or 3600)
+        with _tokens_lock:
+            _tokens[key] = (
+                token,
+                time.monotonic() + max(0.0, expires_in - _TOKEN_EXPIRY_MARGIN_SECONDS),
+            )
         logger.info("Obtained new Spotify access token")
         return token
 
-    def _headers(self) -> Dict[str, str]:
-        return {"Authorization": f"Bearer {self._get_access_token()}"}
+    def prefetch_token(self) -> None:
+        """
+        Fetch the process-wide access token now (API warmup), so the first
+        ingest does not wait on the token endpoint.
+        """
+        self._get_access_token()
+
+    def _forget_access_token(self, token: str) -> None:
+        # Only if nobody has replaced it already.
+        key = self._token_key()
+        with _tokens_lock:
+            cached = _tokens.get(key)
+            if cached is not None and cached[0] == token:
+                del _tokens[key]
+
+    def _send(
+        self, url: str, extra_headers: Dict[str, str] | None, attempt: int, **kwargs: Any
+    ) -> Tuple[requests.Response, str]:
+        waited = self.rate_limiter.acquire()
+        self.rate_limit_wait_seconds += waited
+        if waited:
+            logger.debug("Waited %.3fs on Spotify rate limiter", waited)
+
+        token = self._get_access_token()
+        headers = {"Authorization": f"Bearer {token}"}
+        if extra_headers:
+            headers.update(extra_headers)
+        with span("spotify.request", attempt=attempt, rate_limit_wait=waited) as current:
+            resp = self._session.get(url, headers=headers, timeout=10, **kwargs)
+            current.set(status=resp.status_code)
+        return resp, token
+
+    def _api_get(
+        self, url: str, extra_headers: Dict[str, str] | None = None, **kwargs: Any
+    ) -> requests.Response:
+        """
+        GET against the Web API through the shared rate limiter, retrying
+        429 responses after the advertised ``Retry-After``. A 401 (token
+        expired or revoked early) drops the cached token and is retried
+        once with a new one.
+        """
+        reauthenticated = False
+        for attempt in range(settings.spotify_max_retries + 1):
+            resp, token = self._send(url, extra_headers, attempt, **kwargs)
+            if resp.status_code == 401 and not reauthenticated:
+                logger.info("Spotify API returned 401 for %s; renewing the token", url)
+                reauthenticated = True
+                self._forget_access_token(token)
+                resp, _ = self._send(url, extra_headers, attempt, **kwargs)
+            if resp.status_code != 429:
+                self.rate_limiter.on_success()
+                return resp
+
+            self.rate_limiter.on_throttled(_retry_after_seconds(resp))
+            logger.warning(
+                "Spotify API returned 429 for %s (attempt %d)", url, attempt + 1
+            )
+
+        raise HTTPException(
+            status_code=503,
+            detail="Spotify API rate limit exceeded; try again later.",
+        )
 
     def get_playlist(self, playlist_id: str) -> Dict[str, Any]:
         playlist_id = _normalize_playlist_id(playlist_id)
+        with span("spotify.get_playlist", playlist_id=playlist_id) as current:
+            playlist = self._get_playlist(playlist_id)
+            current.set(
+                tracks=len((playlist.get("tracks") or {}).get("items") or []),
+                rate_limit_wait=round(self.rate_limit_wait_seconds, 3),
+            )
+            return playlist
+
+    def _get_document(
+        self, url: str, params: Dict[str, str] | None = None, trust_cache: bool = False
+    ) -> _Document:
+        """
+        Fetch one API document. With a payload cache, the cached body's ETag
+        is sent as ``If-None-Match`` and a 304 is answered from disk; with
+        ``trust_cache`` (or offline) a cached body is used without asking.
+        """
+        cache = self.payload_cache
+        if cache is None:
+            resp = self._api_get(url, params=params)
+            return _Document(
+                resp.status_code, resp, resp.json() if resp.status_code == 200 else None
+            )
+
+        if params:
+            url = requests.Request("GET", url, params=params).prepare().url
+        ref = cache.lookup(url)
+        if ref is not None and (self.offline or trust_cache):
+            cache.replayed += 1
+            return _Document(200, None, orjson.loads(cache.read(ref)), from_cache=True)
+        if self.offline:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Offline and no cached Spotify payload for {url}.",
+            )
+
+        extra = {"If-None-Match": ref.etag} if ref is not None and ref.etag else None
+        resp = self._api_get(url, extra_headers=extra)
+        if resp.status_code == 304 and ref is not None:
+            cache.revalidated += 1
+            return _Document(200, resp, orjson.loads(cache.read(ref)), from_cache=True)
+        if resp.status_code != 200:
+            return _Document(resp.status_code, resp, None)
+        body = resp.content
+        cache.store(url, body, resp.headers.get("ETag"))
+        return _Document(200, resp, orjson.loads(body))
+
+    def _get_playlist(self, playlist_id: str) -> Dict[str, Any]:
         params = {"market": settings.spotify_country_market}
-        resp = requests.get(
-            f"{self.API_BASE}/playlists/{playlist_id}",
-            headers=self._headers(),
+        document = self._get_document(
+            f"{self.api_base}/playlists/{playlist_id}",
             params=params,
-            timeout=10,
         )
-        if resp.status_code == 404:
+        status, resp, playlist = document.status, document.response, document.payload
+        if status == 404:
             logger.warning(
                 "Playlist not found or not accessible: %s (%s)",
                 playlist_id,
@@ -90,13 +263,43 @@ class SpotifyClient:
                     f"Playlist '{playlist_id}' not found or not accessible via Spotify API."
                 ),
             )
-        if resp.status_code == 401:
+        if status == 401:
             logger.error("Spotify get_playlist unauthorized: %s", resp.text)
             raise HTTPException(
                 status_code=502,
                 detail="Unauthorized when calling Spotify playlist API.",
             )
-        resp.raise_for_status()
-        return resp.json()
+        if playlist is None:
+            resp.raise_for_status()
 
+        # The playlist object embeds only the first page of tracks; follow
+        # ``next`` links so callers always get the complete item list. If
+        # the playlist itself is unchanged (304), so is its snapshot, and
+        # cached pages are used without revalidating each one.
+        tracks = playlist.get("tracks") or {}
+        next_url = tracks.get("next")
+        page_number = 1
+        while next_url:
+            with span("spotify.page", page=page_number):
+                page_doc = self._get_document(next_url, trust_cache=document.from_cache)
+                if page_doc.payload is None:
+                    page_doc.response.raise_for_status()
+                page = page_doc.payload
+            tracks["items"].extend(page.get("items", []))
+            next_url = page.get("next")
+            page_number += 1
+        tracks["next"] = None
 
+        if self.rate_limit_wait_seconds:
+            logger.info(
+                "Spent %.2fs waiting on the Spotify rate limiter",
+                self.rate_limit_wait_seconds,
+            )
+        if self.payload_cache is not None:
+            logger.info(
+                "Payload cache: %d not modified, %d stored, %d served from cache",
+                self.payload_cache.revalidated,
+                self.payload_cache.stored,
+                self.payload_cache.replayed,
+            )
+        return playlist
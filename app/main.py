@@ -1,20 +1,63 @@
-from fastapi import FastAPI
+import logging
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
 
-from app.api import routes_playlists, routes_tracks
+from app.api import (
+    routes_artists,
+    routes_changes,
+    routes_playlists,
+    routes_stats,
+    routes_tracks,
+)
+from app.api.compression import compress_response
+from app.api.readiness import ReadinessMonitor
+from app.api.responses import FastJSONResponse
 from app.core.config import get_settings
 from app.core.logging_config import configure_logging
-from app.db.base import Base
-from app.db.session import engine
+from app.core.query_profiler import (
+    configure_query_profiler,
+    is_enabled as query_profiler_enabled,
+    query_scope,
+    server_timing,
+)
+from app.core.tracing import clean_trace_id, configure_tracing, start_trace
+from app.db.session import dispose_engine, init_engine, probe_engines
 
 configure_logging()
+configure_tracing()
+configure_query_profiler()
 settings = get_settings()
 
+REQUEST_ID_HEADER = "X-Request-ID"
+
+access_logger = logging.getLogger("app.access")
+sql_logger = logging.getLogger("app.sql")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema is managed by versioned migrations (python -m app.db.migrations
+    # upgrade), run once per deploy rather than on every worker boot.
+    init_engine()
+    # Warmup and readiness checks run on a background thread, so /livez
+    # answers at once and /readyz turns ready when the process is warm.
+    readiness = ReadinessMonitor(app).start()
+    app.state.readiness = readiness
+    yield
+    readiness.stop()
+    dispose_engine()
+
+
 app = FastAPI(
     title=settings.app_name,
     version="0.1.0",
     description="Backend API for Spotify Playlist Catalog – ETL and search",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 if settings.backend_cors_origins:
@@ -24,26 +67,102 @@ if settings.backend_cors_origins:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["ETag", "X-Total-Count", REQUEST_ID_HEADER, "Server-Timing"],
     )
 
 
-@app.on_event("startup")
-def on_startup() -> None:
-    # In production, create tables if needed.
-    # In tests, engine is monkeypatched to the test engine, but tables are
-    # already created in conftest, so this is effectively a no-op.
-    Base.metadata.create_all(bind=engine)
+@app.middleware("http")
+async def compress_responses(request: Request, call_next):
+    # Innermost, so the other middlewares' headers are kept and streamed
+    # bodies are compressed as they are produced.
+    response = await call_next(request)
+    return await compress_response(request, response)
+
+
+@app.middleware("http")
+async def profile_queries(request: Request, call_next):
+    # Counts the SQL the request issues (also in threadpool endpoints, which
+    # inherit the scope) and reports it as Server-Timing.
+    started = time.perf_counter()
+    with query_scope() as stats:
+        response = await call_next(request)
+    if not query_profiler_enabled():
+        return response
+    total_ms = (time.perf_counter() - started) * 1000
+    response.headers["Server-Timing"] = server_timing(stats, total_ms)
+    budget = settings.sql_query_budget
+    if budget and stats.count > budget:
+        sql_logger.warning(
+            "%s %s issued %d queries (budget %d)",
+            request.method,
+            request.url.path,
+            stats.count,
+            budget,
+            extra={"path": request.url.path, "queries": stats.count, "budget": budget},
+        )
+    return response
+
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    # A caller-supplied X-Request-ID becomes the trace id, so client, log
+    # lines and exported spans can be joined; it is echoed back either way.
+    trace_id = clean_trace_id(request.headers.get(REQUEST_ID_HEADER))
+    started = time.perf_counter()
+    with start_trace(
+        "http.request", trace_id=trace_id, method=request.method, path=request.url.path
+    ) as root:
+        response = await call_next(request)
+        root.set(status=response.status_code)
+        duration_ms = round((time.perf_counter() - started) * 1000, 2)
+        access_logger.info(
+            "%s %s %d %.1fms",
+            request.method,
+            request.url.path,
+            response.status_code,
+            duration_ms,
+            extra={
+                "method": request.method,
+                "path": request.url.path,
+                "status": response.status_code,
+                "duration_ms": duration_ms,
+            },
+        )
+    response.headers[REQUEST_ID_HEADER] = trace_id
+    return response
 
 
 @app.get("/health", tags=["meta"])
 def health():
-    with engine.connect() as conn:
-        conn.execute(text("SELECT 1"))
+    # Deep check: runs a query on every call. Probes should use /readyz.
+    for engine in probe_engines():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
     return {"status": "ok"}
 
 
+@app.get("/livez", tags=["meta"])
+async def livez():
+    return {"status": "ok"}
+
+
+@app.get("/readyz", tags=["meta"])
+async def readyz(request: Request):
+    readiness = getattr(request.app.state, "readiness", None)
+    if readiness is None:
+        return FastJSONResponse({"status": "not_started"}, status_code=503)
+    state = readiness.state
+    return FastJSONResponse(state.as_dict(), status_code=200 if state.ready else 503)
+
+
 app.include_router(routes_playlists.router)
 app.include_router(routes_tracks.router)
+app.include_router(routes_artists.router)
+app.include_router(routes_stats.router)
+app.include_router(routes_changes.router)
 
+# Read-only workers skip the ingest route entirely.
+if settings.app_role != "read":
+    from app.api import routes_ingest
 
-
+    app.include_router(routes_ingest.router)
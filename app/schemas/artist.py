@@ -0,0 +1,29 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from app.schemas.track import TrackBase
+
+
+class ArtistOut(BaseModel):
+    id: int
+    spotify_id: str
+    name: str
+    genres: str
+    track_count: int
+    # playlist_tracks rows with a track by this artist
+    appearance_count: int
+    # distinct playlists with a track by this artist
+    playlist_count: int
+
+
+class ArtistPage(BaseModel):
+    items: List[ArtistOut]
+    # Pass back as ``cursor`` for the next page; None on the last one.
+    next_cursor: Optional[str] = None
+
+
+class ArtistTracksPage(BaseModel):
+    total: int
+    items: List[TrackBase]
+    next_cursor: Optional[str] = None
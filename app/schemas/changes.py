@@ -0,0 +1,20 @@
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+class ChangeOut(BaseModel):
+    seq: int
+    entity: str
+    id: str
+    op: str
+    # Row as written for upserts; None for deletes.
+    data: Optional[Dict[str, Any]] = None
+
+
+class ChangeFeedOut(BaseModel):
+    changes: List[ChangeOut]
+    # Pass back as ``since`` to continue after this page.
+    next_since: int
+    has_more: bool
+    latest_seq: int
@@ -19,3 +19,12 @@ class PlaylistWithCounts(PlaylistBase):
 
 class PlaylistCreateFromSpotify(BaseModel):
     playlist_id: str
+
+
+class SimilarPlaylist(BaseModel):
+    id: int
+    spotify_id: str | None = None
+    name: str
+    shared_tracks: int
+    jaccard: float
+    cosine: float
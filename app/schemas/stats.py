@@ -0,0 +1,36 @@
+from datetime import datetime
+from typing import List
+
+from pydantic import BaseModel
+
+
+class ArtistCount(BaseModel):
+    id: int
+    name: str
+    track_count: int
+    appearance_count: int
+    playlist_count: int
+
+
+class CatalogStatsOut(BaseModel):
+    playlist_count: int
+    track_count: int
+    artist_count: int
+    album_count: int
+    playlist_track_count: int
+    total_duration_ms: int
+    # Distinct canonical songs (duplicate recordings collapsed).
+    song_count: int
+    updated_at: datetime | None = None
+    top_artists: List[ArtistCount]
+
+
+class PlaylistStatsOut(BaseModel):
+    playlist_id: int
+    track_count: int
+    artist_count: int
+    album_count: int
+    total_duration_ms: int
+    median_duration_ms: int
+    song_count: int
+    updated_at: datetime | None = None
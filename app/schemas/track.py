@@ -1,3 +1,7 @@
+from typing import Dict, List, Optional
+
+from typing_extensions import TypedDict
+
 from pydantic import BaseModel
 
 
@@ -9,12 +13,38 @@ class TrackBase(BaseModel):
     artist_name: str
     duration_ms: int
     genius_url: str
+    # "verified", "missing" or "unverified" (see app.etl.genius_links)
+    genius_status: str = "unverified"
 
     class Config:
         from_attributes = True
 
 
+class TrackRow(TypedDict):
+    """
+    Same shape as TrackBase, as a plain dict; validated in bulk on the fast
+    read path (app.api.track_rows) without building a model per row.
+    """
+
+    id: int
+    spotify_id: str
+    name: str
+    album_name: str
+    artist_name: str
+    duration_ms: int
+    genius_url: str
+    genius_status: str
+
+
+class FacetCount(BaseModel):
+    value: str
+    label: str
+    count: int
+
+
 class TrackSearchResponse(BaseModel):
     total: int
     items: list[TrackBase]
+    # Only with facets=true: artist, album, duration, playlist, added_year.
+    facets: Optional[Dict[str, List[FacetCount]]] = None
 
@@ -1,7 +1,10 @@
 import re
+from functools import lru_cache
 from urllib.parse import quote
 
 
+# Artist names repeat heavily across listings; memoize their slugs.
+@lru_cache(maxsize=65536)
 def _slugify(text: str) -> str:
     """
     Convert text to a Genius-style slug fragment.
@@ -0,0 +1,45 @@
+import argparse
+
+from app.core.config import get_settings
+from app.core.logging_config import configure_logging
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(prog="python -m app.worker")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="run ingest worker processes on this node")
+    run.add_argument("--processes", type=int, default=settings.worker_processes)
+    run.add_argument(
+        "--exit-when-idle",
+        action="store_true",
+        help="stop once the queue is drained (batch runs)",
+    )
+    run.add_argument("--database-url", default=None)
+
+    enqueue = sub.add_parser("enqueue", help="queue playlists for ingest")
+    enqueue.add_argument("playlist_ids", nargs="+")
+    args = parser.parse_args()
+
+    configure_logging()
+    if args.command == "run":
+        from app.worker.runner import run_pool
+
+        run_pool(
+            args.processes,
+            args.database_url or settings.database_url,
+            exit_when_idle=args.exit_when_idle,
+        )
+    elif args.command == "enqueue":
+        from app.db.session import SessionLocal, get_engine
+        from app.worker.queue import enqueue as enqueue_job
+
+        with SessionLocal(bind=get_engine()) as db:
+            for playlist_id in args.playlist_ids:
+                job = enqueue_job(db, playlist_id, settings.job_max_attempts)
+                print(f"{playlist_id}: job {job.id} ({job.status})")
+
+
+if __name__ == "__main__":
+    main()
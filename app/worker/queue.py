@@ -0,0 +1,201 @@
+"""
+Durable ingest job queue backed by the ``ingest_jobs`` table.
+
+A worker claims a job by selecting a candidate (``FOR UPDATE SKIP LOCKED``
+on Postgres, so concurrent workers pass over each other's rows) and then
+leasing it with a conditional UPDATE. The UPDATE re-checks that the job
+is still claimable, so a job goes to exactly one worker even on backends
+without row locks (SQLite).
+
+A lease lasts ``visibility_timeout`` seconds and heartbeats renew it. If a
+lease lapses because its worker crashed or hung, the job becomes claimable
+again. Failed attempts are retried with exponential backoff until
+``max_attempts``; permanent failures (a missing or private playlist) fail
+the job at once. Ingest is idempotent, so a job that runs twice after
+losing its lease is harmless.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.db.models import IngestJob
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+_CLAIM_RETRIES = 5
+
+
+def _claimable(now: datetime):
+    return or_(
+        and_(IngestJob.status == QUEUED, IngestJob.available_at <= now),
+        and_(IngestJob.status == RUNNING, IngestJob.locked_until < now),
+    )
+
+
+def enqueue(db: Session, playlist_id: str, max_attempts: int = 5) -> IngestJob:
+    """
+    Queue an ingest of ``playlist_id``; returns the already pending job if
+    one exists for it. Commits.
+    """
+    pending = (
+        db.query(IngestJob)
+        .filter(
+            IngestJob.playlist_id == playlist_id,
+            IngestJob.status.in_((QUEUED, RUNNING)),
+        )
+        .order_by(IngestJob.id)
+        .first()
+    )
+    if pending is not None:
+        return pending
+    now = datetime.utcnow()
+    job = IngestJob(
+        playlist_id=playlist_id,
+        status=QUEUED,
+        attempts=0,
+        max_attempts=max_attempts,
+        available_at=now,
+        created_at=now,
+    )
+    db.add(job)
+    db.commit()
+    return job
+
+
+def claim(db: Session, worker_id: str, visibility_timeout: float) -> Optional[IngestJob]:
+    """
+    Lease the next available job to ``worker_id``, or return None when
+    nothing is claimable. Jobs that have used up their attempts are marked
+    failed instead of being handed out. Commits.
+    """
+    for _ in range(_CLAIM_RETRIES):
+        now = datetime.utcnow()
+        try:
+            candidate = db.execute(
+                select(IngestJob.id)
+                .where(_claimable(now))
+                .order_by(IngestJob.available_at, IngestJob.id)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            ).scalar()
+            if candidate is None:
+                db.rollback()
+                return None
+            leased = db.execute(
+                update(IngestJob)
+                .where(IngestJob.id == candidate, _claimable(now))
+                .values(
+                    status=RUNNING,
+                    locked_by=worker_id,
+                    locked_until=now + timedelta(seconds=visibility_timeout),
+                    heartbeat_at=now,
+                    attempts=IngestJob.attempts + 1,
+                )
+            ).rowcount
+            db.commit()
+        except OperationalError:
+            # SQLite reports a lost write race as "database is locked".
+            db.rollback()
+            continue
+        if leased != 1:
+            continue  # another worker got there first
+
+        job = db.get(IngestJob, candidate)
+        if job.attempts > job.max_attempts:
+            # Only reachable by leases that expired (crashes), since
+            # ordinary failures stop at max_attempts in fail().
+            job.status = FAILED
+            job.locked_by = None
+            job.locked_until = None
+            job.finished_at = now
+            job.last_error = job.last_error or "lease expired on every attempt"
+            db.commit()
+            logger.warning("Job %s exhausted its attempts", job.id)
+            continue
+        return job
+    return None
+
+
+def heartbeat(db: Session, job_id: int, worker_id: str, visibility_timeout: float) -> bool:
+    """
+    Extend the lease; False means it was lost (expired and re-claimed).
+    """
+    now = datetime.utcnow()
+    renewed = db.execute(
+        update(IngestJob)
+        .where(
+            IngestJob.id == job_id,
+            IngestJob.locked_by == worker_id,
+            IngestJob.status == RUNNING,
+        )
+        .values(
+            locked_until=now + timedelta(seconds=visibility_timeout),
+            heartbeat_at=now,
+        )
+    ).rowcount
+    db.commit()
+    return renewed == 1
+
+
+def complete(db: Session, job_id: int, worker_id: str, playlist_pk: int) -> bool:
+    now = datetime.utcnow()
+    done = db.execute(
+        update(IngestJob)
+        .where(IngestJob.id == job_id, IngestJob.locked_by == worker_id)
+        .values(
+            status=SUCCEEDED,
+            result_playlist_id=playlist_pk,
+            # locked_by is kept as a record of which worker ran the job.
+            locked_until=None,
+            finished_at=now,
+            last_error=None,
+        )
+    ).rowcount
+    db.commit()
+    return done == 1
+
+
+def fail(
+    db: Session,
+    job_id: int,
+    worker_id: str,
+    error: str,
+    retry_backoff: float,
+    permanent: bool = False,
+) -> Optional[str]:
+    """
+    Record a failed attempt: requeue with exponential backoff, or mark the
+    job failed once it has used ``max_attempts`` (or at once when the error
+    is ``permanent``). Returns the new status, or None when the lease had
+    already been lost.
+    """
+    job = db.get(IngestJob, job_id)
+    if job is None:
+        return None
+    now = datetime.utcnow()
+    values = {"last_error": error[:2000], "locked_by": None, "locked_until": None}
+    if permanent or job.attempts >= job.max_attempts:
+        values.update(status=FAILED, finished_at=now)
+    else:
+        delay = retry_backoff * 2 ** (job.attempts - 1)
+        values.update(status=QUEUED, available_at=now + timedelta(seconds=delay))
+    recorded = db.execute(
+        update(IngestJob)
+        .where(IngestJob.id == job_id, IngestJob.locked_by == worker_id)
+        .values(**values)
+    ).rowcount
+    db.commit()
+    return values["status"] if recorded == 1 else None
+
+
+def get_job(db: Session, job_id: int) -> Optional[IngestJob]:
+    return db.get(IngestJob, job_id)
@@ -0,0 +1,237 @@
+"""
+Ingest worker processes.
+
+``run_pool`` starts N worker processes on this node and restarts any that
+die. Each process runs ``run_worker``, which claims ingest jobs one at a
+time and runs them through its own ``SpotifyETLPipeline``. To scale ingest
+further, run more processes or more nodes against the same database. The
+queue hands every job to exactly one live worker. On SQLite the processes
+fetch from Spotify in parallel and take turns writing: each load is one
+``BEGIN IMMEDIATE`` transaction (see ``app.db.session``).
+"""
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+from multiprocessing.connection import wait
+from typing import Callable, Optional
+
+import requests
+from fastapi import HTTPException
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import get_settings
+from app.core.tracing import start_trace
+from app.db.session import create_db_engine
+from app.worker import queue
+
+logger = logging.getLogger(__name__)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def create_worker_engine(database_url: str) -> Engine:
+    return create_db_engine(database_url)
+
+
+def _default_pipeline():
+    from app.etl.pipeline import SpotifyETLPipeline
+    from app.etl.spotify_client import SpotifyClient
+
+    return SpotifyETLPipeline(client=SpotifyClient())
+
+
+def is_permanent_failure(exc: Exception) -> bool:
+    """
+    True for Spotify 4xx errors other than 429 (e.g. the 404 for a missing
+    or private playlist): the same request would fail on every attempt.
+    """
+    if isinstance(exc, HTTPException):
+        status = exc.status_code
+    elif isinstance(exc, requests.HTTPError) and exc.response is not None:
+        status = exc.response.status_code
+    else:
+        return False
+    return 400 <= status < 500 and status != 429
+
+
+class _Heartbeat(threading.Thread):
+    """
+    Renews a job's lease every third of the visibility timeout while the
+    job runs.
+    """
+
+    def __init__(self, session_factory, job_id: int, worker_id: str, timeout: float):
+        super().__init__(name=f"heartbeat-{job_id}", daemon=True)
+        self.session_factory = session_factory
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.timeout = timeout
+        self.lost = False
+        self._done = threading.Event()
+
+    def run(self) -> None:
+        while not self._done.wait(self.timeout / 3):
+            try:
+                with self.session_factory() as db:
+                    if not queue.heartbeat(db, self.job_id, self.worker_id, self.timeout):
+                        self.lost = True
+                        logger.warning("Lost the lease on job %s", self.job_id)
+                        return
+            except Exception:  # noqa: BLE001 - keep beating through blips
+                logger.exception("Heartbeat for job %s failed", self.job_id)
+
+    def __enter__(self) -> "_Heartbeat":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._done.set()
+        self.join()
+
+
+def process_one(
+    session_factory, worker_id: str, pipeline_factory: Callable = _default_pipeline
+) -> bool:
+    """
+    Claim and run one job with a pipeline built for it. Returns False when
+    nothing was claimable.
+    """
+    settings = get_settings()
+    timeout = settings.job_visibility_timeout_seconds
+    with session_factory() as db:
+        job = queue.claim(db, worker_id, timeout)
+        if job is None:
+            return False
+        job_id, playlist_id, attempt = job.id, job.playlist_id, job.attempts
+
+    # A fresh client per job: nothing (connections, rate-limit wait totals)
+    # carries over from the previous job, however long the worker has run.
+    pipeline = pipeline_factory()
+    with start_trace("worker.job", job_id=job_id, playlist_id=playlist_id, attempt=attempt):
+        return _run_job(session_factory, worker_id, pipeline, job_id, playlist_id, attempt)
+
+
+def _run_job(session_factory, worker_id, pipeline, job_id, playlist_id, attempt) -> bool:
+    settings = get_settings()
+    timeout = settings.job_visibility_timeout_seconds
+    logger.info("Job %s: ingesting playlist %s (attempt %d)", job_id, playlist_id, attempt)
+    started = time.perf_counter()
+    with _Heartbeat(session_factory, job_id, worker_id, timeout):
+        try:
+            with session_factory() as db:
+                playlist_pk = pipeline.ingest_playlist(db, playlist_id).id
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("Job %s failed", job_id)
+            with session_factory() as db:
+                status = queue.fail(
+                    db,
+                    job_id,
+                    worker_id,
+                    repr(exc),
+                    settings.job_retry_backoff_seconds,
+                    permanent=is_permanent_failure(exc),
+                )
+            logger.info("Job %s is now %s", job_id, status or "owned by another worker")
+            return True
+
+    with session_factory() as db:
+        if not queue.complete(db, job_id, worker_id, playlist_pk):
+            logger.warning("Job %s finished after its lease was lost", job_id)
+    duration_ms = round((time.perf_counter() - started) * 1000, 1)
+    logger.info(
+        "Job %s succeeded in %.0fms",
+        job_id,
+        duration_ms,
+        extra={"job_id": job_id, "attempt": attempt, "duration_ms": duration_ms},
+    )
+    return True
+
+
+def run_worker(
+    database_url: str,
+    stop: Optional[threading.Event] = None,
+    exit_when_idle: bool = False,
+    pipeline_factory: Callable = _default_pipeline,
+) -> int:
+    """
+    Claim and run jobs until ``stop`` is set (or, with ``exit_when_idle``,
+    until the queue is empty). Returns the number of jobs processed.
+    """
+    settings = get_settings()
+    engine = create_worker_engine(database_url)
+    session_factory = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    worker_id = default_worker_id()
+    processed = 0
+    logger.info("Worker %s started", worker_id)
+    try:
+        while stop is None or not stop.is_set():
+            if process_one(session_factory, worker_id, pipeline_factory):
+                processed += 1
+                continue
+            if exit_when_idle:
+                break
+            if stop is not None:
+                stop.wait(settings.worker_poll_interval_seconds)
+            else:
+                time.sleep(settings.worker_poll_interval_seconds)
+    finally:
+        engine.dispose()
+    logger.info("Worker %s stopped after %d jobs", worker_id, processed)
+    return processed
+
+
+def _worker_main(database_url: str, stop, exit_when_idle: bool) -> None:
+    from app.core.logging_config import configure_logging
+    from app.core.tracing import configure_tracing
+
+    configure_logging()
+    configure_tracing()
+    # The supervisor owns shutdown: children finish their current job once
+    # ``stop`` is set instead of dying mid-ingest on Ctrl-C.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    run_worker(database_url, stop=stop, exit_when_idle=exit_when_idle)
+
+
+def run_pool(processes: int, database_url: str, exit_when_idle: bool = False) -> None:
+    """
+    Supervise ``processes`` worker processes on this node, restarting any
+    that exit abnormally, until SIGINT/SIGTERM (or until idle).
+    """
+    ctx = multiprocessing.get_context("spawn")
+    stop = ctx.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    def start(slot: int):
+        proc = ctx.Process(
+            target=_worker_main,
+            args=(database_url, stop, exit_when_idle),
+            name=f"ingest-worker-{slot}",
+        )
+        proc.start()
+        return proc
+
+    workers = {slot: start(slot) for slot in range(processes)}
+    logger.info("Started %d ingest worker processes", processes)
+    while workers:
+        wait([p.sentinel for p in workers.values()], timeout=1.0)
+        for slot, proc in list(workers.items()):
+            if proc.is_alive():
+                continue
+            proc.join()
+            if stop.is_set() or (exit_when_idle and proc.exitcode == 0):
+                del workers[slot]
+            else:
+                logger.warning(
+                    "Worker %s exited with %s; restarting", proc.name, proc.exitcode
+                )
+                workers[slot] = start(slot)
+    logger.info("All ingest workers stopped")
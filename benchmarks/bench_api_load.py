@@ -0,0 +1,342 @@
+"""
+HTTP load test of the read API against a seeded synthetic catalog.
+
+``seed`` fills a SQLite file (default) or a local Postgres
+(``--database-url``) with a 10k, 1M or 10M track catalog. ``run`` serves
+the API with uvicorn in-process, drives each endpoint in turn at
+``--concurrency`` for ``--duration`` seconds, and writes p50/p95/p99
+latency, throughput and SQL statements per request to JSON. ``compare``
+diffs two result files and exits non-zero on regressions.
+
+    python -m benchmarks.bench_api_load seed --size 1m
+    python -m benchmarks.bench_api_load run --size 1m --concurrency 16 --output base.json
+    python -m benchmarks.bench_api_load compare base.json new.json --threshold 0.15
+
+``run --url http://host:8000`` drives an already running API instead
+(statement counts are then unavailable).
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import requests
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+
+from benchmarks.synthetic_catalog import WORDS, catalog_size, seed_catalog
+
+SIZES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+DEFAULT_DIR = Path(".loadtest")
+
+
+def _track_count(args) -> int:
+    return SIZES[args.size]
+
+
+def endpoints(tracks: int) -> Dict[str, Callable[[random.Random], str]]:
+    playlists = max(1, tracks // 500)
+    return {
+        "search": lambda rng: f"/tracks/search?q={rng.choice(WORDS)}&limit=50",
+        "playlists": lambda rng: f"/playlists/?limit=50&offset={rng.randrange(playlists)}",
+        "playlist_tracks": lambda rng: (
+            f"/playlists/{rng.randint(1, playlists)}/tracks?limit=100"
+        ),
+    }
+
+
+def database_url(args) -> str:
+    if args.database_url:
+        return args.database_url
+    DEFAULT_DIR.mkdir(exist_ok=True)
+    return f"sqlite+pysqlite:///{DEFAULT_DIR / f'catalog-{args.size}.sqlite3'}"
+
+
+def make_engine(url: str) -> Engine:
+    if url.startswith("sqlite"):
+        return create_engine(url, connect_args={"check_same_thread": False})
+    return create_engine(url, pool_size=32, max_overflow=32)
+
+
+def seed(engine: Engine, tracks: int) -> None:
+    from app.db import migrations
+
+    migrations.upgrade(engine)
+    existing = catalog_size(engine)
+    if existing == tracks:
+        return
+    if existing:
+        raise SystemExit(
+            f"database already holds {existing} tracks, not {tracks}; use an empty database"
+        )
+    start = time.perf_counter()
+    print(f"seeding {tracks:,} tracks ...", file=sys.stderr)
+    seed_catalog(engine, tracks)
+    print(f"seeded in {time.perf_counter() - start:.0f}s", file=sys.stderr)
+
+
+class ApiServer:
+    """The API app on a background uvicorn thread, bound to ``engine``."""
+
+    def __init__(self, engine: Engine) -> None:
+        import uvicorn
+        from sqlalchemy.orm import sessionmaker
+
+        from app.api.deps import get_db, get_read_db
+        from app.main import app
+
+        factory = sessionmaker(bind=engine, autoflush=False)
+
+        def _get_db():
+            db = factory()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = _get_db
+        app.dependency_overrides[get_read_db] = _get_db
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.bind(("127.0.0.1", 0))
+        self.url = "http://127.0.0.1:%d" % self._socket.getsockname()[1]
+        self._server = uvicorn.Server(
+            uvicorn.Config(app, log_level="warning", lifespan="off", access_log=False)
+        )
+        self._thread = threading.Thread(
+            target=self._server.run, kwargs={"sockets": [self._socket]}, daemon=True
+        )
+
+    def __enter__(self) -> "ApiServer":
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("API server did not start")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=10)
+
+
+class StatementCounter:
+    def __init__(self, engine: Engine) -> None:
+        self.count = 0
+        self._lock = threading.Lock()
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args) -> None:
+        with self._lock:
+            self.count += 1
+
+
+def drive(
+    base_url: str,
+    make_path: Callable[[random.Random], str],
+    concurrency: int,
+    duration: float,
+    warmup: int,
+) -> Dict[str, object]:
+    local = threading.local()
+
+    def session() -> requests.Session:
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        return local.session
+
+    def worker(n: int, deadline: Optional[float], count: Optional[int]):
+        rng = random.Random(n)
+        latencies: List[float] = []
+        errors = 0
+        while (deadline is None or time.perf_counter() < deadline) and (
+            count is None or len(latencies) + errors < count
+        ):
+            start = time.perf_counter()
+            try:
+                ok = session().get(base_url + make_path(rng), timeout=30).status_code < 400
+            except requests.RequestException:
+                ok = False
+            if ok:
+                latencies.append((time.perf_counter() - start) * 1000)
+            else:
+                errors += 1
+        return latencies, errors
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(lambda n: worker(1000 + n, None, warmup), range(concurrency)))
+        started = time.perf_counter()
+        deadline = started + duration
+        results = list(pool.map(lambda n: worker(n, deadline, None), range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies = sorted(ms for lat, _ in results for ms in lat)
+    errors = sum(e for _, e in results)
+    if len(latencies) >= 2:
+        q = statistics.quantiles(latencies, n=100, method="inclusive")
+        p50, p95, p99 = q[49], q[94], q[98]
+    else:
+        p50 = p95 = p99 = latencies[0] if latencies else None
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": p50 and round(p50, 2),
+        "p95_ms": p95 and round(p95, 2),
+        "p99_ms": p99 and round(p99, 2),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args) -> Dict[str, object]:
+    tracks = _track_count(args)
+    selected = args.endpoints or list(endpoints(tracks))
+    paths = endpoints(tracks)
+    meta = {
+        "created_at": datetime.utcnow().isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "size": args.size,
+        "tracks": tracks,
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+    }
+    results: Dict[str, object] = {}
+
+    if args.url:
+        meta["target"] = args.url
+        for name in selected:
+            results[name] = drive(args.url, paths[name], args.concurrency, args.duration, args.warmup)
+            results[name]["statements_per_request"] = None
+        return {"meta": meta, "endpoints": results}
+
+    # Quiet the app's per-request logging before it is imported.
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    engine = make_engine(database_url(args))
+    seed(engine, tracks)
+    meta["backend"] = engine.dialect.name
+    counter = StatementCounter(engine)
+    with ApiServer(engine) as server:
+        for name in selected:
+            before = counter.count
+            result = drive(server.url, paths[name], args.concurrency, args.duration, args.warmup)
+            executed = counter.count - before
+            # Warm-up requests ran too; they hit the same statements.
+            total = result["requests"] + result["errors"] + args.warmup * args.concurrency
+            result["statements_per_request"] = round(executed / total, 2) if total else None
+            results[name] = result
+            print(
+                f"{name:>16}  {result['throughput_rps']:>8.1f} rps  "
+                f"p50 {result['p50_ms']} ms  p95 {result['p95_ms']} ms  "
+                f"p99 {result['p99_ms']} ms  {result['statements_per_request']} stmts/req",
+                file=sys.stderr,
+            )
+    engine.dispose()
+    return {"meta": meta, "endpoints": results}
+
+
+def compare(base: dict, new: dict, threshold: float) -> List[str]:
+    """
+    Regressions of ``new`` against ``base``: p95/p99 up or throughput down
+    by more than ``threshold`` (a fraction), or more SQL per request.
+    """
+    regressions = []
+    print(f"{'endpoint':>16} {'metric':>22} {'base':>10} {'new':>10} {'change':>8}")
+    for name, before in base["endpoints"].items():
+        after = new["endpoints"].get(name)
+        if after is None:
+            continue
+        for metric, worse_if_higher in (
+            ("p50_ms", True),
+            ("p95_ms", True),
+            ("p99_ms", True),
+            ("throughput_rps", False),
+            ("statements_per_request", True),
+        ):
+            old_value, new_value = before.get(metric), after.get(metric)
+            if old_value is None or new_value is None:
+                continue
+            change = (new_value - old_value) / old_value if old_value else 0.0
+            if metric == "statements_per_request":
+                regressed = new_value > old_value
+            elif metric == "p50_ms":
+                regressed = False  # reported, not gated: too noisy at low latencies
+            else:
+                regressed = change > threshold if worse_if_higher else -change > threshold
+            flag = "  REGRESSION" if regressed else ""
+            print(
+                f"{name:>16} {metric:>22} {old_value:>10} {new_value:>10} {change:>+7.1%}{flag}"
+            )
+            if regressed:
+                regressions.append(f"{name} {metric}: {old_value} -> {new_value}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("seed", "run"):
+        cmd = sub.add_parser(name)
+        cmd.add_argument("--size", choices=SIZES, default="10k")
+        cmd.add_argument(
+            "--database-url",
+            default=None,
+            help="defaults to a SQLite file under .loadtest/ (e.g. postgresql://... for Postgres)",
+        )
+    run_cmd = sub.choices["run"]
+    run_cmd.add_argument("--concurrency", type=int, default=8)
+    run_cmd.add_argument("--duration", type=float, default=10.0, help="seconds per endpoint")
+    run_cmd.add_argument("--warmup", type=int, default=5, help="requests per thread first")
+    run_cmd.add_argument("--endpoints", nargs="+", choices=list(endpoints(1)), default=None)
+    run_cmd.add_argument("--url", default=None, help="drive a running API instead")
+    run_cmd.add_argument("--output", default=None, help="write results JSON here")
+    cmp_cmd = sub.add_parser("compare")
+    cmp_cmd.add_argument("base")
+    cmp_cmd.add_argument("new")
+    cmp_cmd.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+
+    if args.command == "seed":
+        engine = make_engine(database_url(args))
+        seed(engine, _track_count(args))
+        engine.dispose()
+    elif args.command == "run":
+        results = run(args)
+        text = json.dumps(results, indent=2)
+        if args.output:
+            Path(args.output).write_text(text + "\n")
+        else:
+            print(text)
+    else:
+        base = json.loads(Path(args.base).read_text())
+        new = json.loads(Path(args.new).read_text())
+        regressions = compare(base, new, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s):")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("no regressions")
+
+
+if __name__ == "__main__":
+    main()
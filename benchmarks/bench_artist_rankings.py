@@ -0,0 +1,90 @@
+"""
+Artist rankings from the maintained artist_stats counters versus
+aggregating playlist_tracks per request.
+
+Builds a synthetic catalog in a throwaway SQLite file, fills the summary
+tables with ``rebuild_stats``, then times the first and a deep page of
+``GET /artists`` (keyset cursor) against the equivalent ``GROUP BY``
+query (``OFFSET`` for the deep page), and an artist's track listing.
+
+    python -m benchmarks.bench_artist_rankings --tracks 200000 --page 50
+"""
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from app.analytics.stats import rebuild_stats
+from app.api.routes_artists import get_artist_tracks, list_artists
+from app.db.base import Base
+from app.db.models import Artist, PlaylistTrack, Track
+from benchmarks.synthetic_catalog import seed_catalog
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--tracks", type=int, default=200_000)
+    parser.add_argument("--page", type=int, default=50)
+    parser.add_argument("--depth", type=int, default=100, help="page number of the deep page")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite+pysqlite:///{Path(tmp) / 'bench.sqlite3'}")
+        Base.metadata.create_all(bind=engine)
+        seed_catalog(engine, args.tracks)
+        SessionLocal = sessionmaker(bind=engine)
+
+        with SessionLocal() as db:
+            rebuild_stats(db)
+
+            playlist_count = func.count(func.distinct(PlaylistTrack.playlist_id))
+            aggregate = (
+                db.query(Artist.id, Artist.name, playlist_count)
+                .join(Track, Track.artist_id == Artist.id)
+                .join(PlaylistTrack, PlaylistTrack.track_id == Track.id)
+                .group_by(Artist.id, Artist.name)
+                .order_by(playlist_count.desc(), Artist.id.desc())
+                .limit(args.page)
+            )
+
+            def page(cursor=None):
+                return list_artists(sort="playlists", limit=args.page, cursor=cursor, db=db)
+
+            cursor = None
+            for _ in range(args.depth - 1):
+                cursor = json.loads(page(cursor).body)["next_cursor"]
+
+            cases = {
+                "first page, counters": lambda: page(),
+                "first page, GROUP BY": lambda: aggregate.all(),
+                f"page {args.depth}, cursor": lambda: page(cursor),
+                f"page {args.depth}, GROUP BY+OFFSET": lambda: aggregate.offset(
+                    (args.depth - 1) * args.page
+                ).all(),
+                "artist tracks page": lambda: get_artist_tracks(
+                    artist_id=7, limit=args.page, cursor=None, db=db
+                ),
+            }
+            print(f"{args.tracks} tracks, {args.page} artists per page")
+            for name, fn in cases.items():
+                print(f"{name:>32} {timed(fn, args.repeat):>9.2f} ms")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Playlist-track reads from the database versus the memory-mapped snapshot.
+
+Builds a synthetic catalog in a throwaway SQLite file, publishes a
+snapshot of it, then times reading pages of playlist tracks both ways
+(rows only, before JSON rendering) and opening the snapshot.
+
+    python -m benchmarks.bench_catalog_snapshot --tracks 200000 --page 100
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.track_rows import TRACK_COLUMNS, track_rows, with_genius_links
+from app.db.base import Base
+from app.db.models import Artist, PlaylistTrack, Track
+from app.db.snapshot import CatalogSnapshot, build_snapshot
+from benchmarks.synthetic_catalog import seed_catalog
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--tracks", type=int, default=200_000)
+    parser.add_argument("--page", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite+pysqlite:///{Path(tmp) / 'bench.sqlite3'}")
+        Base.metadata.create_all(bind=engine)
+        seed_catalog(engine, args.tracks)
+        SessionLocal = sessionmaker(bind=engine)
+        path = Path(tmp) / "catalog.snap"
+
+        with SessionLocal() as db:
+            start = time.perf_counter()
+            meta = build_snapshot(db, path)
+            build_s = time.perf_counter() - start
+            playlist_ids = [p for (p,) in db.query(PlaylistTrack.playlist_id).distinct()]
+            rng = random.Random(1)
+            picks = [rng.choice(playlist_ids) for _ in range(args.requests)]
+
+            def from_db():
+                for playlist_id in picks:
+                    track_rows(
+                        with_genius_links(
+                            db.query(*TRACK_COLUMNS)
+                            .join(PlaylistTrack, PlaylistTrack.track_id == Track.id)
+                            .join(Artist, Artist.id == Track.artist_id)
+                        )
+                        .filter(PlaylistTrack.playlist_id == playlist_id)
+                        .order_by(Track.name.asc(), Track.id.asc())
+                        .limit(args.page)
+                        .all()
+                    )
+
+            db_ms = timed(from_db, 3) / args.requests
+
+        open_ms = timed(lambda: CatalogSnapshot(path), 5)
+        snapshot = CatalogSnapshot(path)
+
+        def from_snapshot():
+            for playlist_id in picks:
+                track_rows(snapshot.playlist_tracks(playlist_id, 0, args.page)[0])
+
+        snapshot_ms = timed(from_snapshot, 3) / args.requests
+        size_mb = path.stat().st_size / 1024 / 1024
+        engine.dispose()
+
+    print(
+        f"{meta['tracks']} tracks, {meta['playlist_tracks']} playlist tracks; "
+        f"snapshot {size_mb:.1f} MB built in {build_s:.1f}s, opened in {open_ms:.2f} ms"
+    )
+    print(f"{'source':>9} {'ms/page':>8}")
+    print(f"{'database':>9} {db_ms:>8.2f}")
+    print(f"{'snapshot':>9} {snapshot_ms:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
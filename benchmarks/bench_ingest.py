@@ -0,0 +1,77 @@
+"""
+End-to-end ingest benchmark against the bundled fake Spotify server.
+
+Runs the full client + pipeline path offline into a throwaway SQLite file
+(or ``--database-url``) and reports tracks/second.
+
+    python -m benchmarks.bench_ingest --playlists 5 --tracks 5000
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import get_settings
+from app.db.base import Base
+from app.db.session import create_db_engine
+from app.etl.fake_spotify_server import FakeSpotifyConfig, FakeSpotifyServer
+from app.etl.pipeline import SpotifyETLPipeline
+from app.etl.rate_limiter import TokenBucketRateLimiter
+from app.etl.spotify_client import SpotifyClient
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline ingest benchmark")
+    parser.add_argument("--playlists", type=int, default=3)
+    parser.add_argument("--tracks", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--throttle-every", type=int, default=0)
+    parser.add_argument("--rate", type=float, default=1000.0)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    settings = get_settings()
+    settings.spotify_client_id = settings.spotify_client_id or "bench"
+    settings.spotify_client_secret = settings.spotify_client_secret or "bench"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite+pysqlite:///{Path(tmp) / 'bench.sqlite3'}"
+        engine = create_db_engine(url)
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(bind=engine, autoflush=False)
+
+        config = FakeSpotifyConfig(
+            default_track_count=args.tracks,
+            latency_ms=args.latency_ms,
+            throttle_every=args.throttle_every,
+            retry_after_seconds=0,
+        )
+        with FakeSpotifyServer(config) as server:
+            limiter = TokenBucketRateLimiter(rate=args.rate, burst=int(args.rate))
+            client = SpotifyClient(
+                rate_limiter=limiter, api_base=server.api_base, token_url=server.token_url
+            )
+            pipeline = SpotifyETLPipeline(client=client)
+
+            start = time.perf_counter()
+            for n in range(args.playlists):
+                with SessionLocal() as db:
+                    pipeline.ingest_playlist(db=db, playlist_id=f"bench{n}")
+            elapsed = time.perf_counter() - start
+
+        engine.dispose()
+
+    total = args.playlists * args.tracks
+    print(f"ingested {total} playlist tracks in {elapsed:.2f}s")
+    print(f"throughput: {total / elapsed:,.0f} tracks/s")
+    print(
+        f"rate limiter: {limiter.stats.acquisitions} calls, "
+        f"{limiter.stats.total_wait_seconds:.2f}s waited, "
+        f"{limiter.stats.throttled_responses} throttled"
+    )
+
+
+if __name__ == "__main__":
+    main()
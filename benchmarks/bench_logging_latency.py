@@ -0,0 +1,159 @@
+"""
+What logging adds to API latency: p50 / p99 of GET /playlists/{id}/tracks
+with logging off, with the previous synchronous text handler, and with the
+queue-fed JSON handler from ``configure_logging``.
+
+Each request logs its access line plus ``--logs-per-request`` application
+lines. The sink can be made slow (``--sink-delay-ms`` per write), the way a
+congested container log pipe is, to show which configuration lets that
+stall reach requests.
+
+    python -m benchmarks.bench_logging_latency --requests 2000 --threads 8
+    python -m benchmarks.bench_logging_latency --sink-delay-ms 1
+"""
+import argparse
+import logging
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.deps import get_db, get_read_db
+from app.core.logging_config import LOG_FORMAT, configure_logging, stop_logging
+from app.core.tracing import TraceContextFilter
+from app.db.base import Base
+from app.main import app
+from benchmarks.bench_track_serialization import seed
+
+app_logger = logging.getLogger("app.bench")
+
+
+class SlowSink:
+    """File-like sink that holds each write for ``delay`` seconds."""
+
+    def __init__(self, path: Path, delay: float) -> None:
+        self._fh = open(path, "a", encoding="utf-8")
+        self.delay = delay
+
+    def write(self, data: str) -> int:
+        if self.delay:
+            time.sleep(self.delay)
+        return self._fh.write(data)
+
+    def flush(self) -> None:
+        self._fh.flush()
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+def configure_sync(sink) -> logging.Handler:
+    """The previous setup: format and write in the logging thread."""
+    handler = logging.StreamHandler(sink)
+    handler.addFilter(TraceContextFilter())
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+    return handler
+
+
+def latencies(url: str, requests: int, threads: int, logs_per_request: int) -> List[float]:
+    local = threading.local()
+
+    def one(_: int) -> float:
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = TestClient(app)
+        start = time.perf_counter()
+        client.get(url).raise_for_status()
+        # The access line comes from the app's middleware; these stand in
+        # for a handler's own log calls.
+        for n in range(logs_per_request):
+            app_logger.info("bench line %d", n, extra={"n": n})
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(one, range(threads * 5)))  # warm up
+        return list(pool.map(one, range(requests)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--tracks", type=int, default=50)
+    parser.add_argument("--logs-per-request", type=int, default=5)
+    parser.add_argument("--sink-delay-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(
+            f"sqlite+pysqlite:///{Path(tmp) / 'bench.sqlite3'}",
+            connect_args={"check_same_thread": False},
+        )
+        Base.metadata.create_all(bind=engine)
+        playlist_id = seed(engine, args.tracks)
+        factory = sessionmaker(bind=engine, autoflush=False)
+
+        def _get_db():
+            db = factory()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = _get_db
+        app.dependency_overrides[get_read_db] = _get_db
+        url = f"/playlists/{playlist_id}/tracks"
+        delay = args.sink_delay_ms / 1000
+
+        results: Dict[str, List[float]] = {}
+        stop_logging()
+        logging.disable(logging.CRITICAL)
+        results["off"] = latencies(url, args.requests, args.threads, args.logs_per_request)
+        logging.disable(logging.NOTSET)
+
+        sink = SlowSink(Path(tmp) / "sync.log", delay)
+        handler = configure_sync(sink)
+        results["sync text"] = latencies(
+            url, args.requests, args.threads, args.logs_per_request
+        )
+        logging.getLogger().removeHandler(handler)
+        sink.close()
+
+        sink = SlowSink(Path(tmp) / "queue.log", delay)
+        queued = configure_logging(level="INFO", fmt="json", stream=sink)
+        results["queue json"] = latencies(
+            url, args.requests, args.threads, args.logs_per_request
+        )
+        dropped = queued.dropped
+        stop_logging()
+        sink.close()
+        engine.dispose()
+
+    print(
+        f"{args.requests} requests, {args.threads} threads, "
+        f"{1 + args.logs_per_request} log lines each, sink delay {args.sink_delay_ms} ms"
+    )
+    print(f"{'logging':>11} {'p50 ms':>8} {'p99 ms':>8} {'p99 added':>10}")
+    base = statistics.quantiles(results["off"], n=100)[98]
+    for name, values in results.items():
+        cuts = statistics.quantiles(values, n=100)
+        print(
+            f"{name:>11} {cuts[49] * 1000:>8.2f} {cuts[98] * 1000:>8.2f} "
+            f"{(cuts[98] - base) * 1000:>9.2f}"
+        )
+    if dropped:
+        print(f"queue json dropped {dropped} records (queue full)")
+
+
+if __name__ == "__main__":
+    main()
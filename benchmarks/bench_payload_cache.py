@@ -0,0 +1,66 @@
+"""
+Spotify fetch time with and without the on-disk payload cache.
+
+Fetches the same playlists from the fake Spotify server four ways:
+without a cache, into an empty cache, revalidating a warm cache (304s),
+and replaying the cache offline. Reports seconds and the cache's on-disk
+size.
+
+    python -m benchmarks.bench_payload_cache --playlists 5 --tracks 5000 --latency-ms 20
+"""
+import argparse
+import tempfile
+import time
+
+from app.core.config import get_settings
+from app.etl.fake_spotify_server import FakeSpotifyConfig, FakeSpotifyServer
+from app.etl.payload_cache import PayloadCache
+from app.etl.rate_limiter import TokenBucketRateLimiter
+from app.etl.spotify_client import SpotifyClient
+
+
+def fetch_all(server, playlists: int, cache=None, offline: bool = False) -> float:
+    client = SpotifyClient(
+        rate_limiter=TokenBucketRateLimiter(rate=10_000, burst=10_000),
+        api_base=server.api_base,
+        token_url=server.token_url,
+        payload_cache=cache,
+        offline=offline,
+    )
+    start = time.perf_counter()
+    for n in range(playlists):
+        client.get_playlist(f"bench{n}")
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--playlists", type=int, default=5)
+    parser.add_argument("--tracks", type=int, default=5_000)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    settings = get_settings()
+    settings.spotify_client_id = settings.spotify_client_id or "bench"
+    settings.spotify_client_secret = settings.spotify_client_secret or "bench"
+
+    config = FakeSpotifyConfig(default_track_count=args.tracks, latency_ms=args.latency_ms)
+    with tempfile.TemporaryDirectory() as tmp, FakeSpotifyServer(config) as server:
+        results = {"no cache": fetch_all(server, args.playlists)}
+        results["cold cache"] = fetch_all(server, args.playlists, PayloadCache(tmp))
+        results["revalidate"] = fetch_all(server, args.playlists, PayloadCache(tmp))
+        results["offline"] = fetch_all(server, args.playlists, PayloadCache(tmp), offline=True)
+        stats = PayloadCache(tmp).stats()
+
+    print(
+        f"{args.playlists} playlists x {args.tracks} tracks, "
+        f"{args.latency_ms:.0f} ms simulated latency"
+    )
+    print(f"{'mode':>11} {'seconds':>8}")
+    for name, seconds in results.items():
+        print(f"{name:>11} {seconds:>8.2f}")
+    print(f"cache: {stats['objects']} bodies, {stats['bytes'] / 1024 / 1024:.1f} MB on disk")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Time to first byte and peak memory of ``GET /playlists/{id}/tracks`` for
+growing playlists, buffered versus streamed, with and without compression.
+
+Seeds a synthetic catalog in a throwaway SQLite file, adds one playlist per
+size, then drives the ASGI app in-process. TTFB is the time until the
+first non-empty body chunk; peak memory is measured with ``tracemalloc``
+in a separate pass, so it does not skew the timings. Past 65,536 distinct
+track names it includes churn in the process-wide ``_slugify`` cache,
+which is bounded by its size, not by the response.
+
+    python -m benchmarks.bench_streaming_tracks --sizes 1000 10000 100000
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from sqlalchemy import func, insert, select
+
+from app.core.config import get_settings
+from app.db import session as db_session_module
+from app.db.base import Base
+from app.db.models import Playlist, PlaylistTrack
+from benchmarks.synthetic_catalog import seed_catalog
+
+
+def add_playlists(engine, sizes: List[int]) -> Dict[int, int]:
+    """One playlist per size, holding the first ``size`` tracks."""
+    ids = {}
+    with engine.begin() as conn:
+        next_id = (conn.execute(select(func.max(Playlist.id))).scalar() or 0) + 1
+        for size in sizes:
+            conn.execute(
+                insert(Playlist),
+                [{"id": next_id, "spotify_id": f"big{size}", "name": f"Big {size}"}],
+            )
+            for start in range(1, size + 1, 50_000):
+                conn.execute(
+                    insert(PlaylistTrack),
+                    [
+                        {"playlist_id": next_id, "track_id": t}
+                        for t in range(start, min(size, start + 49_999) + 1)
+                    ],
+                )
+            ids[size] = next_id
+            next_id += 1
+    return ids
+
+
+async def get(app, path: str, encoding: str) -> Tuple[float, float, int]:
+    """(ttfb ms, total ms, bytes on the wire) for one request."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench"), (b"accept-encoding", encoding.encode())],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+    started = time.perf_counter()
+    first = None
+    size = 0
+
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if requested:
+            # Like a server: nothing more until the client disconnects.
+            await asyncio.Event().wait()
+        requested = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal first, size
+        if message["type"] == "http.response.body" and message.get("body"):
+            if first is None:
+                first = time.perf_counter()
+            size += len(message["body"])
+
+    await app(scope, receive, send)
+    done = time.perf_counter()
+    return (first - started) * 1000, (done - started) * 1000, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000, 100_000])
+    parser.add_argument("--encodings", nargs="+", default=["identity", "gzip", "br"])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    logging.getLogger("app.access").setLevel(logging.WARNING)
+    settings = get_settings()
+    settings.warmup_enabled = False
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.database_url_override = f"sqlite+pysqlite:///{Path(tmp) / 'bench.sqlite3'}"
+        engine = db_session_module.init_engine()
+        Base.metadata.create_all(bind=engine)
+        seed_catalog(engine, max(args.sizes))
+        playlists = add_playlists(engine, args.sizes)
+
+        from app.main import app
+
+        modes = {"buffered": 10**9, "streamed": settings.json_stream_min_rows}
+        print(f"{'rows':>8} {'mode':>9} {'encoding':>9} {'ttfb ms':>9} {'total ms':>9} "
+              f"{'wire KB':>9} {'peak MB':>8}")
+        for size, playlist_id in playlists.items():
+            path = f"/playlists/{playlist_id}/tracks"
+            for mode, min_rows in modes.items():
+                settings.json_stream_min_rows = min_rows
+                for encoding in args.encodings:
+                    runs = [asyncio.run(get(app, path, encoding)) for _ in range(args.repeat)]
+                    tracemalloc.start()
+                    asyncio.run(get(app, path, encoding))
+                    peak = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                    print(
+                        f"{size:>8} {mode:>9} {encoding:>9} "
+                        f"{statistics.median(r[0] for r in runs):>9.1f} "
+                        f"{statistics.median(r[1] for r in runs):>9.1f} "
+                        f"{runs[0][2] / 1024:>9.0f} {peak / 2**20:>8.1f}"
+                    )
+        db_session_module.dispose_engine()
+
+
+if __name__ == "__main__":
+    main()
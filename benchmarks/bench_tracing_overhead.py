@@ -0,0 +1,55 @@
+"""
+Cost of the tracing hooks: SQL statements on an uninstrumented engine
+versus an instrumented one with sampling off and with sampling on (spans
+exported to memory).
+
+    python -m benchmarks.bench_tracing_overhead --statements 50000
+"""
+import argparse
+import time
+
+from sqlalchemy import create_engine, text
+
+from app.core.tracing import (
+    InMemoryExporter,
+    configure_tracing,
+    instrument_engine,
+    shutdown_tracing,
+    start_trace,
+)
+
+
+def run(engine, statements: int) -> float:
+    query = text("SELECT 1")
+    start = time.perf_counter()
+    with start_trace("bench"):
+        with engine.connect() as conn:
+            for _ in range(statements):
+                conn.execute(query)
+    return (time.perf_counter() - start) / statements * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--statements", type=int, default=50_000)
+    args = parser.parse_args()
+
+    plain = create_engine("sqlite+pysqlite://")
+    traced = create_engine("sqlite+pysqlite://")
+    instrument_engine(traced)
+
+    results = {"uninstrumented": run(plain, args.statements)}
+    configure_tracing(sample_rate=0.0, exporter=InMemoryExporter())
+    results["sampling off"] = run(traced, args.statements)
+    configure_tracing(sample_rate=1.0, exporter=InMemoryExporter(), batch=False)
+    results["sampling on"] = run(traced, args.statements)
+    shutdown_tracing()
+
+    base = results["uninstrumented"]
+    print(f"{'mode':>15} {'us/stmt':>8} {'overhead':>9}")
+    for name, micros in results.items():
+        print(f"{name:>15} {micros:>8.2f} {(micros / base - 1) * 100:>8.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Latency of filtered, sorted /tracks/search queries and their facet counts.
+
+Builds a synthetic catalog in a throwaway SQLite file, then times the
+search query and the single facet query for a few filter combinations
+and a free-text term,
+with the search indexes from migration 0011 and (``--drop-indexes``)
+without them.
+
+    python -m benchmarks.bench_track_facets --tracks 500000 --repeat 5
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes_tracks import _SORTS
+from app.api.track_facets import TrackFilters, facet_counts
+from app.api.track_rows import TRACK_COLUMNS, with_genius_links
+from app.db.base import Base
+from app.db.models import Artist, Track
+from benchmarks.synthetic_catalog import seed_catalog
+
+CASES = {
+    "artist, by name": (TrackFilters(artist_ids=[7]), "name"),
+    "duration range, by duration": (
+        TrackFilters(min_duration_ms=200_000, max_duration_ms=210_000),
+        "-duration",
+    ),
+    "playlist + added window": (
+        TrackFilters(playlist_ids=[3], added_after=datetime(2023, 6, 1)),
+        "name",
+    ),
+}
+# Free text, common and rare: the Postgres ILIKE form (a scan here) against
+# the FTS5 trigram index SQLite deployments use (app.db.search).
+for term in ("midnight", "ocean 1999"):
+    CASES[f"'{term}', LIKE"] = (TrackFilters(q=term), "name")
+    CASES[f"'{term}', trigram"] = (TrackFilters(q=term, dialect="sqlite"), "name")
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--tracks", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--drop-indexes", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite+pysqlite:///{Path(tmp) / 'bench.sqlite3'}")
+        Base.metadata.create_all(bind=engine)
+        seed_catalog(engine, args.tracks)
+        if args.drop_indexes:
+            with engine.begin() as conn:
+                conn.execute(text("DROP INDEX ix_tracks_duration_ms"))
+                conn.execute(text("DROP INDEX ix_tracks_artist_id_name"))
+        SessionLocal = sessionmaker(bind=engine)
+
+        print(f"{args.tracks} tracks, indexes {'dropped' if args.drop_indexes else 'present'}")
+        print(f"{'case':>28} {'search ms':>10} {'facets ms':>10}")
+        with SessionLocal() as db:
+            for name, (filters, sort) in CASES.items():
+                query = (
+                    with_genius_links(
+                        db.query(*TRACK_COLUMNS).join(Artist, Artist.id == Track.artist_id)
+                    )
+                    .filter(*filters.conditions())
+                    .order_by(*_SORTS[sort])
+                    .limit(50)
+                )
+                search_ms = timed(query.all, args.repeat)
+                facets_ms = timed(lambda: facet_counts(db, filters), args.repeat)
+                print(f"{name:>28} {search_ms:>10.1f} {facets_ms:>10.1f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
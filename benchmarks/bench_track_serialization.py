@@ -0,0 +1,145 @@
+"""
+Per-request CPU of /playlists/{id}/tracks: legacy ORM + per-row pydantic
+path versus the column-select / bulk-validate / orjson path.
+
+Seeds a throwaway SQLite playlist of each size and reports CPU seconds per
+request (process time, so client-side waiting is excluded).
+
+    python -m benchmarks.bench_track_serialization --sizes 1000 10000 100000
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.api import routes_playlists
+from app.api.deps import get_db, get_read_db
+from app.api.responses import FastJSONResponse
+from app.db.base import Base
+from app.db.models import Artist, Playlist, PlaylistTrack, Track
+from app.schemas.track import TrackBase
+from app.utils.genius import build_genius_url
+
+
+def legacy_app() -> FastAPI:
+    """The handler as it was before the lean path, for comparison."""
+    app = FastAPI()
+
+    @app.get("/playlists/{playlist_id}/tracks", response_model=List[TrackBase])
+    def get_playlist_tracks(playlist_id: int, db: Session = Depends(get_db)):
+        q = (
+            db.query(Track)
+            .join(PlaylistTrack, PlaylistTrack.track_id == Track.id)
+            .filter(PlaylistTrack.playlist_id == playlist_id)
+            .order_by(Track.name.asc())
+        )
+        items = []
+        for t in q.all():
+            artist_name = t.artist.name if t.artist else ""
+            items.append(
+                TrackBase(
+                    id=t.id,
+                    spotify_id=t.spotify_id,
+                    name=t.name,
+                    album_name=t.album_name,
+                    artist_name=artist_name,
+                    duration_ms=t.duration_ms,
+                    genius_url=build_genius_url(artist_name, t.name),
+                )
+            )
+        return items
+
+    return app
+
+
+def lean_app() -> FastAPI:
+    app = FastAPI(default_response_class=FastJSONResponse)
+    app.include_router(routes_playlists.router)
+    return app
+
+
+def seed(engine, size: int) -> int:
+    artists = max(1, size // 20)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Artist),
+            [{"id": i + 1, "spotify_id": f"a{i}", "name": f"Artist {i}", "genres": ""}
+             for i in range(artists)],
+        )
+        conn.execute(
+            insert(Track),
+            [
+                {
+                    "id": i + 1,
+                    "spotify_id": f"t{i}",
+                    "name": f"Song number {i}",
+                    "artist_id": i % artists + 1,
+                    "album_name": f"Album {i // 12}",
+                    "duration_ms": 180_000 + i % 60_000,
+                }
+                for i in range(size)
+            ],
+        )
+        conn.execute(
+            insert(Playlist),
+            [{"id": 1, "spotify_id": "p", "name": "Bench", "description": "",
+              "owner_display_name": "", "is_curated": True}],
+        )
+        conn.execute(
+            insert(PlaylistTrack),
+            [{"playlist_id": 1, "track_id": i + 1} for i in range(size)],
+        )
+    return 1
+
+
+def cpu_per_request(app: FastAPI, session_factory, url: str, repeat: int) -> float:
+    def _get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = _get_db
+    app.dependency_overrides[get_read_db] = _get_db
+    with TestClient(app) as client:
+        client.get(url).raise_for_status()  # warm up
+        start = time.process_time()
+        for _ in range(repeat):
+            client.get(url).raise_for_status()
+        return (time.process_time() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'legacy ms':>10} {'lean ms':>10} {'speedup':>8}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(
+                f"sqlite+pysqlite:///{Path(tmp) / 'bench.sqlite3'}",
+                connect_args={"check_same_thread": False},
+            )
+            Base.metadata.create_all(bind=engine)
+            playlist_id = seed(engine, size)
+            factory = sessionmaker(bind=engine, autoflush=False)
+            url = f"/playlists/{playlist_id}/tracks"
+            repeat = max(1, args.repeat if size <= 10_000 else args.repeat // 2)
+
+            legacy = cpu_per_request(legacy_app(), factory, url, repeat)
+            lean = cpu_per_request(lean_app(), factory, url, repeat)
+            engine.dispose()
+        print(f"{size:>8} {legacy * 1000:>10.1f} {lean * 1000:>10.1f} {legacy / lean:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
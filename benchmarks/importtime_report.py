@@ -0,0 +1,80 @@
+"""
+Cold-start report built from ``python -X importtime``.
+
+Imports a module in a fresh interpreter per APP_ROLE and prints total import
+time, peak RSS and the packages whose modules took the most self time.
+
+    python -m benchmarks.importtime_report --roles all read --top 15
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|\s*(\S+)$")
+
+_PROBE = (
+    "import resource, sys, time; t = time.perf_counter(); import {module}; "
+    "print(time.perf_counter() - t); "
+    "print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+)
+
+
+def measure(module: str, role: str) -> dict:
+    env = dict(os.environ, APP_ROLE=role)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(module=module)],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+    wall, rss_kb = proc.stdout.strip().splitlines()[-2:]
+
+    # Self time of every imported module, folded by root package.
+    by_package: dict[str, int] = defaultdict(int)
+    for line in proc.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            self_us, _, name = match.groups()
+            by_package[name.split(".")[0]] += int(self_us)
+
+    return {
+        "module": module,
+        "role": role,
+        "import_seconds": round(float(wall), 4),
+        "peak_rss_mb": round(int(rss_kb) / 1024, 1),
+        "packages_ms": {
+            name: round(us / 1000, 1)
+            for name, us in sorted(by_package.items(), key=lambda kv: -kv[1])
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import-time / RSS cold-start report")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--roles", nargs="+", default=["all", "read"])
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="emit JSON instead of text")
+    args = parser.parse_args()
+
+    reports = [measure(args.module, role) for role in args.roles]
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return
+
+    for report in reports:
+        print(
+            f"{report['module']} (APP_ROLE={report['role']}): "
+            f"{report['import_seconds'] * 1000:.0f} ms, peak RSS {report['peak_rss_mb']} MB"
+        )
+        for name, ms in list(report["packages_ms"].items())[: args.top]:
+            print(f"  {ms:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
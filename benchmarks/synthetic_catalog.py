@@ -0,0 +1,113 @@
+"""
+Synthetic catalogs for benchmarks: artists, tracks and playlists with
+random memberships, inserted in bounded batches so 10M-track catalogs
+seed without holding them in memory.
+
+Shape per ``tracks``: one artist per 20 tracks, one playlist per 500
+tracks, and about two playlist memberships per track (1,000 tracks per
+playlist). Track names are two words from ``WORDS`` plus a number, so
+free-text search terms have realistic selectivity.
+"""
+import random
+from datetime import datetime, timedelta
+from typing import Iterator, List
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.engine import Engine
+
+from app.db.models import Artist, Playlist, PlaylistTrack, Track
+
+WORDS = (
+    "love night blue fire dream heart light rain summer road "
+    "gold wild river ghost dance city star shadow home sky "
+    "ocean moon storm sugar electric young broken lonely midnight paradise"
+).split()
+
+_START = datetime(2020, 1, 1)
+_MINUTES = 5 * 365 * 24 * 60
+
+
+def _batches(rows: Iterator[dict], size: int) -> Iterator[List[dict]]:
+    batch: List[dict] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def catalog_size(engine: Engine) -> int:
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(Track)).scalar() or 0
+
+
+def seed_catalog(engine: Engine, tracks: int, seed: int = 1, batch_size: int = 50_000) -> None:
+    """
+    Insert a synthetic catalog into an empty schema. Ids are dense from 1,
+    so callers can pick valid artist, track and playlist ids at random.
+    """
+    rng = random.Random(seed)
+    artists = max(1, tracks // 20)
+    playlists = max(1, tracks // 500)
+    per_playlist = min(tracks, 1_000)
+
+    artist_rows = (
+        {"id": i, "spotify_id": f"a{i}", "name": f"Artist {i}", "genres": ""}
+        for i in range(1, artists + 1)
+    )
+    playlist_rows = (
+        {
+            "id": i,
+            "spotify_id": f"p{i}",
+            "name": f"Playlist {i}",
+            "description": "",
+            "owner_display_name": "bench",
+            "is_curated": True,
+        }
+        for i in range(1, playlists + 1)
+    )
+    track_rows = (
+        {
+            "id": i,
+            "spotify_id": f"t{i}",
+            "name": f"{rng.choice(WORDS)} {rng.choice(WORDS)} {rng.randrange(tracks)}",
+            "artist_id": rng.randint(1, artists),
+            "album_name": f"Album {rng.randrange(tracks // 10 + 1)}",
+            "duration_ms": rng.randint(90_000, 480_000),
+        }
+        for i in range(1, tracks + 1)
+    )
+    link_rows = (
+        {
+            "playlist_id": p,
+            "track_id": t + 1,
+            "added_at": _START + timedelta(minutes=rng.randrange(_MINUTES)),
+        }
+        for p in range(1, playlists + 1)
+        for t in rng.sample(range(tracks), per_playlist)
+    )
+
+    for model, rows in (
+        (Artist, artist_rows),
+        (Playlist, playlist_rows),
+        (Track, track_rows),
+        (PlaylistTrack, link_rows),
+    ):
+        for batch in _batches(rows, batch_size):
+            with engine.begin() as conn:
+                conn.execute(insert(model), batch)
+
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            # Ids were given explicitly; move the sequences past them so
+            # later ingests do not collide.
+            for table in ("artists", "playlists", "tracks"):
+                conn.execute(
+                    text(
+                        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                        f"(SELECT max(id) FROM {table}))"
+                    )
+                )
+        conn.execute(text("ANALYZE"))
@@ -1,10 +1,24 @@
 import os
+import time
 
-import pandas as pd
 import requests
 import streamlit as st
+from requests.adapters import HTTPAdapter
 
 BACKEND_URL = os.getenv("STREAMLIT_BACKEND_URL", "http://localhost:8000")
+PAGE_SIZES = [50, 100, 250, 500]
+MIN_SEARCH_CHARS = 2
+
+TRACK_COLUMNS = ["name", "genius_url", "artist_name", "album_name"]
+TRACK_COLUMN_CONFIG = {
+    "name": "Song name",
+    "artist_name": "Artist name",
+    "album_name": "Album name",
+    "genius_url": st.column_config.LinkColumn(
+        "Lyrics",
+        help="Open lyrics on Genius.com",
+    ),
+}
 
 st.set_page_config(page_title="Spotify Playlist Catalog", layout="wide")
 
@@ -12,30 +26,90 @@ st.title("Spotify Playlist Catalog")
 st.caption("Ingest Spotify playlists, store track metadata, and browse tracks with lyrics links.")
 
 
-@st.cache_data(ttl=60)
-def fetch_playlists():
-    resp = requests.get(f"{BACKEND_URL}/playlists/", timeout=10)
-    resp.raise_for_status()
-    return resp.json()
+@st.cache_resource
+def http_session() -> requests.Session:
+    # One keep-alive connection pool shared by every rerun and user session.
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+    return session
+
 
+def get_json(path: str, params: dict | None = None, timeout: int = 10):
+    """
+    GET from the backend, revalidating with the ETag of the copy we already
+    hold so unchanged pages come back as an empty 304.
 
-@st.cache_data(ttl=60)
-def fetch_playlist_tracks(playlist_id: int):
-    # Backend endpoint: /playlists/{playlist_id}/tracks
-    resp = requests.get(f"{BACKEND_URL}/playlists/{playlist_id}/tracks", timeout=10)
+    Returns ``(payload, total)`` where ``total`` is the backend's
+    ``X-Total-Count`` for paginated endpoints.
+    """
+    cache = st.session_state.setdefault("_etag_cache", {})
+    key = (path, tuple(sorted((params or {}).items())))
+    cached = cache.get(key)
+    headers = {"If-None-Match": cached["etag"]} if cached else {}
+
+    resp = http_session().get(
+        f"{BACKEND_URL}{path}", params=params, headers=headers, timeout=timeout
+    )
+    if resp.status_code == 304 and cached:
+        return cached["payload"], cached["total"]
     resp.raise_for_status()
-    return resp.json()
+
+    payload = resp.json()
+    total = int(resp.headers.get("X-Total-Count", len(payload) if isinstance(payload, list) else 0))
+    etag = resp.headers.get("ETag")
+    if etag:
+        cache[key] = {"etag": etag, "payload": payload, "total": total}
+    return payload, total
+
+
+def fetch_playlists():
+    playlists, _ = get_json("/playlists/")
+    return playlists
 
 
-@st.cache_data(ttl=0)
-def ingest_playlist(playlist_id: str):
-    resp = requests.post(
+def fetch_playlist_tracks_page(playlist_id: int, limit: int, offset: int):
+    # Backend endpoint: /playlists/{playlist_id}/tracks, sorted server-side
+    return get_json(
+        f"/playlists/{playlist_id}/tracks", params={"limit": limit, "offset": offset}
+    )
+
+
+def ingest_playlist(playlist_id: str, wait_seconds: float = 120):
+    resp = http_session().post(
         f"{BACKEND_URL}/playlists/ingest",
         json={"playlist_id": playlist_id},
         timeout=30,
     )
     resp.raise_for_status()
-    return resp.json()
+    if resp.status_code != 202:
+        return resp.json()
+
+    # Queued for the ingest workers (INGEST_MODE=queue): poll the job.
+    job = resp.json()
+    deadline = time.monotonic() + wait_seconds
+    while job["status"] in ("queued", "running") and time.monotonic() < deadline:
+        time.sleep(1)
+        job_resp = http_session().get(
+            f"{BACKEND_URL}/playlists/ingest/jobs/{job['job_id']}", timeout=10
+        )
+        job_resp.raise_for_status()
+        job = job_resp.json()
+    if job["status"] != "succeeded":
+        raise RuntimeError(
+            f"ingest job {job['job_id']} is {job['status']}: {job.get('last_error') or ''}"
+        )
+    return job["playlist"]
+
+
+def show_tracks(rows: list[dict]) -> None:
+    st.dataframe(
+        rows,
+        use_container_width=True,
+        hide_index=True,
+        column_order=TRACK_COLUMNS,
+        column_config=TRACK_COLUMN_CONFIG,
+    )
 
 
 tab_playlists, tab_search = st.tabs(["Playlists", "Search tracks"])
@@ -46,6 +120,15 @@ with tab_playlists:
 
     col_left, col_right = st.columns([1, 2])
 
+    # One playlist listing per rerun, shared by both columns.
+    playlists: list[dict] = []
+    playlists_error = None
+    try:
+        playlists = fetch_playlists()
+    except Exception as exc:  # noqa: BLE001
+        playlists_error = exc
+    playlists_by_id = {int(p["id"]): p for p in playlists}
+
     # ---------- LEFT: ingest + existing playlists ----------
     with col_left:
         st.markdown("#### Ingest playlist from Spotify")
@@ -58,41 +141,38 @@ with tab_playlists:
                 try:
                     pl = ingest_playlist(playlist_id_input.strip())
                     st.success(f"Ingested playlist: {pl['name']}")
-                    # Clear cached playlist list so UI updates immediately
-                    fetch_playlists.clear()
                     # Remember this as the most recently ingested playlist
                     st.session_state["last_ingested_playlist_id"] = int(pl["id"])
+                    st.session_state["track_page"] = 1
+                    # The new playlist is picked up by ETag revalidation
+                    playlists, _ = get_json("/playlists/")
+                    playlists_by_id = {int(p["id"]): p for p in playlists}
                 except Exception as exc:  # noqa: BLE001
                     st.error(f"Failed to ingest playlist: {exc}")
 
         st.markdown("#### Existing playlists")
-        try:
-            playlists = fetch_playlists()
-            if playlists:
-                pl_df = pd.DataFrame(playlists)
-                # Ensure id column is plain Python int (not int64)
-                pl_df["id"] = pl_df["id"].astype(int)
-
-                # Default selection: most recently ingested playlist if available
-                default_index = 0
-                last_ingested_id = st.session_state.get("last_ingested_playlist_id")
-                if last_ingested_id is not None:
-                    match = pl_df[pl_df["id"] == int(last_ingested_id)]
-                    if not match.empty:
-                        default_index = int(match.index[0])
-
-                selected_name = st.selectbox(
-                    "Select playlist",
-                    options=pl_df["name"].tolist(),
-                    index=default_index,
-                )
-                selected = pl_df[pl_df["name"] == selected_name].iloc[0]
-                st.session_state["selected_playlist_id"] = int(selected["id"])
-                st.write(f"Tracks: {int(selected['track_count'])}")
-            else:
-                st.info("No playlists ingested yet.")
-        except Exception as exc:  # noqa: BLE001
-            st.error(f"Failed to load playlists: {exc}")
+        if playlists_error is not None:
+            st.error(f"Failed to load playlists: {playlists_error}")
+        elif playlists:
+            ids = list(playlists_by_id)
+            # Default selection: most recently ingested playlist if available
+            default_index = 0
+            last_ingested_id = st.session_state.get("last_ingested_playlist_id")
+            if last_ingested_id in playlists_by_id:
+                default_index = ids.index(last_ingested_id)
+
+            selected_id = st.selectbox(
+                "Select playlist",
+                options=ids,
+                index=default_index,
+                format_func=lambda pid: playlists_by_id[pid]["name"],
+            )
+            if selected_id != st.session_state.get("selected_playlist_id"):
+                st.session_state["track_page"] = 1
+            st.session_state["selected_playlist_id"] = int(selected_id)
+            st.write(f"Tracks: {int(playlists_by_id[selected_id]['track_count'])}")
+        else:
+            st.info("No playlists ingested yet.")
 
     # ---------- RIGHT: playlist details (for selected / last ingested) ----------
     with col_right:
@@ -102,53 +182,29 @@ with tab_playlists:
         )
         if playlist_id:
             try:
-                # Look up playlist name from the playlists list
-                playlists = fetch_playlists()
-                pl_df = pd.DataFrame(playlists)
-                pl_df["id"] = pl_df["id"].astype(int)
-
-                row = pl_df[pl_df["id"] == int(playlist_id)]
-
-                if not row.empty:
-                    playlist_name = row["name"].iloc[0]
-                else:
-                    playlist_name = str(playlist_id)
-
-                # All tracks for this playlist from backend
-                tracks = fetch_playlist_tracks(int(playlist_id))
-                df = pd.DataFrame(tracks)
+                playlist = playlists_by_id.get(int(playlist_id))
+                playlist_name = playlist["name"] if playlist else str(playlist_id)
+
+                page_size = st.selectbox("Tracks per page", PAGE_SIZES, index=1)
+                page = int(st.session_state.get("track_page", 1))
+                # Only the visible page is downloaded.
+                tracks, total = fetch_playlist_tracks_page(
+                    int(playlist_id), limit=page_size, offset=(page - 1) * page_size
+                )
 
-                if df.empty:
+                if total == 0:
                     st.info("No tracks found for this playlist yet.")
                 else:
-                    actual_track_count = int(len(df))
-                    st.write(
-                        f"**{playlist_name}** (ID: {int(playlist_id)}) — {actual_track_count} tracks"
+                    pages = max(1, -(-total // page_size))
+                    st.write(f"**{playlist_name}** (ID: {int(playlist_id)}) — {total} tracks")
+                    st.number_input(
+                        f"Page (of {pages})",
+                        min_value=1,
+                        max_value=pages,
+                        key="track_page",
                     )
-
-                    df = df.sort_values("name", ascending=True)
                     st.markdown("Tracks in this playlist")
-                    st.dataframe(
-                        df[
-                            [
-                                "name",
-                                "genius_url",
-                                "artist_name",
-                                "album_name",
-                            ]
-                        ],
-                        use_container_width=True,
-                        hide_index=True,
-                        column_config={
-                            "name": "Song name",
-                            "artist_name": "Artist name",
-                            "album_name": "Album name",
-                            "genius_url": st.column_config.LinkColumn(
-                                "Lyrics",
-                                help="Open lyrics on Genius.com",
-                            ),
-                        },
-                    )
+                    show_tracks(tracks)
             except Exception as exc:  # noqa: BLE001
                 st.error(f"Failed to load playlist details: {exc}")
         else:
@@ -158,43 +214,27 @@ with tab_playlists:
 with tab_search:
     st.subheader("Search ingested tracks")
 
-    q = st.text_input("Search term (track or artist name)", value="")
-    search_clicked = st.button("Search")
+    # Streamlit only reruns when the input is committed (Enter / blur), which
+    # debounces keystrokes; very short terms are not sent at all.
+    col_q, col_limit = st.columns([3, 1])
+    with col_q:
+        q = st.text_input("Search term (track or artist name)", value="").strip()
+    with col_limit:
+        limit = st.selectbox("Max results", [25, 50, 100, 200], index=2)
 
-    if search_clicked:
+    collapse = st.checkbox("Hide duplicate recordings", value=True)
+
+    if len(q) >= MIN_SEARCH_CHARS:
         try:
-            resp = requests.get(
-                f"{BACKEND_URL}/tracks/search",
-                params={"q": q, "limit": 100},
-                timeout=10,
+            data, _ = get_json(
+                "/tracks/search",
+                params={"q": q, "limit": limit, "collapse": str(collapse).lower()},
             )
-            resp.raise_for_status()
-            data = resp.json()
-            df = pd.DataFrame(data["items"])
-            if df.empty:
+            if not data["items"]:
                 st.info("No results.")
             else:
-                df = df.sort_values("name", ascending=True)
-                st.dataframe(
-                    df[
-                        [
-                            "name",
-                            "genius_url",
-                            "artist_name",
-                            "album_name",
-                        ]
-                    ],
-                    use_container_width=True,
-                    hide_index=True,
-                    column_config={
-                        "name": "Song name",
-                        "artist_name": "Artist name",
-                        "album_name": "Album name",
-                        "genius_url": st.column_config.LinkColumn(
-                            "Lyrics",
-                            help="Open lyrics on Genius.com",
-                        ),
-                    },
-                )
+                show_tracks(data["items"])
         except Exception as exc:  # noqa: BLE001
             st.error(f"Search failed: {exc}")
+    elif q:
+        st.caption(f"Type at least {MIN_SEARCH_CHARS} characters to search.")
@@ -1,4 +1,5 @@
 # tests/conftest.py
+import os
 from pathlib import Path
 from typing import Generator
 
@@ -7,8 +8,12 @@ from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
+# Tests issue their own requests; the startup warmup would race them on the
+# shared session. tests/test_readiness.py turns it on explicitly.
+os.environ.setdefault("WARMUP_ENABLED", "false")
+
 from app.db.base import Base
-from app.api.deps import get_db
+from app.api.deps import get_db, get_read_db
 
 TEST_DB_PATH = Path("test_db.sqlite3")
 TEST_DATABASE_URL = f"sqlite+pysqlite:///{TEST_DB_PATH}"
@@ -62,9 +67,8 @@ def client(test_engine, db_session, monkeypatch):
     from app import main as app_main
     from app.db import session as db_session_module
 
-    # Make app and db.session use the SQLite test engine
-    monkeypatch.setattr(db_session_module, "engine", test_engine)
-    monkeypatch.setattr(app_main, "engine", test_engine)
+    # Make db.session (and so the app lifespan) use the SQLite test engine
+    monkeypatch.setattr(db_session_module, "_engine", test_engine)
 
     # Override get_db to use the test session
     def _get_test_db():
@@ -74,6 +78,7 @@ def client(test_engine, db_session, monkeypatch):
             pass
 
     app_main.app.dependency_overrides[get_db] = _get_test_db
+    app_main.app.dependency_overrides[get_read_db] = _get_test_db
 
     with TestClient(app_main.app) as c:
         yield c
@@ -0,0 +1,136 @@
+# tests/helpers.py
+"""
+Shared test helpers: a full database reset and fake Spotify clients whose
+``get_playlist`` returns API-shaped payloads.
+"""
+from datetime import datetime, timedelta
+
+from app.db.models import (
+    Artist,
+    ArtistStats,
+    CatalogStats,
+    ChangeLog,
+    GeniusLink,
+    Playlist,
+    PlaylistSimilarity,
+    PlaylistStats,
+    PlaylistTrack,
+    SongGroup,
+    Track,
+)
+
+
+def reset_db(db_session):
+    """Delete every catalog row, children before parents, and commit."""
+    for model in (
+        ChangeLog,
+        PlaylistStats,
+        ArtistStats,
+        CatalogStats,
+        PlaylistSimilarity,
+        PlaylistTrack,
+        GeniusLink,
+        Track,
+        SongGroup,
+        Artist,
+        Playlist,
+    ):
+        db_session.query(model).delete()
+    db_session.commit()
+
+
+def playlist_item(track_id, artist_id, album, duration_ms):
+    return {
+        "added_at": "2024-01-01T00:00:00Z",
+        "track": {
+            "id": track_id,
+            "name": f"Song {track_id}",
+            "duration_ms": duration_ms,
+            "album": {"name": album},
+            "artists": [{"id": artist_id, "name": f"Artist {artist_id}"}],
+        },
+    }
+
+
+class DummySpotifyClient:
+    """
+    Minimal fake that matches SpotifyClient.get_playlist interface.
+    """
+
+    def __init__(self):
+        now_iso = datetime.utcnow().isoformat() + "Z"
+        self._payload = {
+            "id": "fake_playlist_id",
+            "name": "Fake Playlist",
+            "description": "Test playlist",
+            "owner": {"display_name": "Test Owner"},
+            "tracks": {
+                "items": [
+                    {
+                        "added_at": now_iso,
+                        "track": {
+                            "id": "track_1",
+                            "name": "Song One",
+                            "duration_ms": 180000,
+                            "album": {"name": "Album One"},
+                            "artists": [
+                                {
+                                    "id": "artist_1",
+                                    "name": "Artist One",
+                                }
+                            ],
+                        },
+                    },
+                    {
+                        "added_at": (datetime.utcnow() - timedelta(days=1)).isoformat()
+                        + "Z",
+                        "track": {
+                            "id": "track_2",
+                            "name": "Song Two",
+                            "duration_ms": 200000,
+                            "album": {"name": "Album Two"},
+                            "artists": [
+                                {
+                                    "id": "artist_2",
+                                    "name": "Artist Two",
+                                }
+                            ],
+                        },
+                    },
+                ]
+            },
+        }
+
+    def get_playlist(self, playlist_id: str):
+        return self._payload
+
+
+class StatsSpotifyClient:
+    playlists = {
+        "p1": [
+            playlist_item("t1", "a1", "Album A", 100),
+            playlist_item("t2", "a1", "Album A", 300),
+            playlist_item("t3", "a2", "Album B", 200),
+        ],
+        # t2 overlaps p1; t4 is by a new artist on a new album.
+        "p2": [
+            playlist_item("t2", "a1", "Album A", 300),
+            playlist_item("t4", "a3", "Album C", 400),
+        ],
+    }
+
+    def get_playlist(self, playlist_id: str):
+        return {
+            "id": playlist_id,
+            "name": f"Playlist {playlist_id}",
+            "description": "",
+            "owner": {"display_name": "Owner"},
+            "tracks": {"items": self.playlists[playlist_id]},
+        }
+
+
+class ChangingSpotifyClient(StatsSpotifyClient):
+    """StatsSpotifyClient whose playlists can be edited per instance."""
+
+    def __init__(self):
+        self.playlists = {key: list(items) for key, items in self.playlists.items()}
@@ -0,0 +1,45 @@
+# tests/query_budget.py
+"""
+Query-budget assertions for endpoint tests.
+
+Counts come from the ``Server-Timing`` header the app adds to every
+response, so they cover everything the request ran, including code in
+dependencies and threadpool endpoints.
+"""
+import re
+from typing import Callable, Optional
+
+_DB_QUERIES = re.compile(r'db;dur=[\d.]+;desc="(\d+) queries"')
+
+
+def query_count(response) -> int:
+    match = _DB_QUERIES.search(response.headers.get("Server-Timing", ""))
+    assert match, f"no db entry in Server-Timing: {response.headers.get('Server-Timing')!r}"
+    return int(match.group(1))
+
+
+def assert_query_budget(
+    client,
+    url: str,
+    budget: int,
+    grow: Optional[Callable[[], None]] = None,
+    **params,
+) -> int:
+    """
+    GET ``url`` and assert it ran at most ``budget`` statements. With
+    ``grow``, call it (it should add rows the endpoint returns) and assert
+    the second request runs exactly as many statements as the first, so a
+    per-row query (N+1) fails however small the fixture data is.
+    """
+    first = client.get(url, params=params)
+    assert first.status_code == 200, first.text
+    count = query_count(first)
+    assert count <= budget, f"GET {url} ran {count} queries (budget {budget})"
+    if grow is not None:
+        grow()
+        second = client.get(url, params=params)
+        assert second.status_code == 200, second.text
+        assert query_count(second) == count, (
+            f"GET {url} ran {count} queries, then {query_count(second)} with more data"
+        )
+    return count
@@ -6,3 +6,71 @@ def test_health(client: TestClient):
     assert resp.status_code == 200
     assert resp.json()["status"] == "ok"
 
+
+
+def _seed_playlist_with_tracks(db_session, n_tracks: int):
+    from app.db.models import Artist, Track, Playlist, PlaylistTrack, PlaylistSimilarity
+
+    db_session.query(PlaylistSimilarity).delete()
+    db_session.query(PlaylistTrack).delete()
+    db_session.query(Track).delete()
+    db_session.query(Artist).delete()
+    db_session.query(Playlist).delete()
+    db_session.commit()
+
+    artist = Artist(spotify_id="artist_page", name="Pager", genres="")
+    playlist = Playlist(
+        spotify_id="playlist_page",
+        name="Paged",
+        description="",
+        owner_display_name="",
+        is_curated=True,
+    )
+    db_session.add_all([artist, playlist])
+    db_session.flush()
+    for n in range(n_tracks):
+        track = Track(
+            spotify_id=f"page_track_{n}",
+            name=f"Song {n:03d}",
+            artist_id=artist.id,
+            album_name="Album",
+            duration_ms=1000,
+        )
+        db_session.add(track)
+        db_session.flush()
+        db_session.add(PlaylistTrack(playlist_id=playlist.id, track_id=track.id))
+    db_session.commit()
+    return playlist
+
+
+def test_playlist_tracks_pagination(client: TestClient, db_session):
+    playlist = _seed_playlist_with_tracks(db_session, 7)
+
+    resp = client.get(f"/playlists/{playlist.id}/tracks", params={"limit": 3, "offset": 3})
+    assert resp.status_code == 200
+    assert resp.headers["X-Total-Count"] == "7"
+    assert [t["name"] for t in resp.json()] == ["Song 003", "Song 004", "Song 005"]
+
+    resp = client.get("/playlists/", params={"limit": 1})
+    assert resp.headers["X-Total-Count"] == "1"
+    assert resp.json()[0]["track_count"] == 7
+
+
+def test_etag_revalidation_returns_304(client: TestClient, db_session):
+    playlist = _seed_playlist_with_tracks(db_session, 2)
+
+    first = client.get(f"/playlists/{playlist.id}/tracks")
+    etag = first.headers["ETag"]
+
+    again = client.get(f"/playlists/{playlist.id}/tracks", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+
+    # A changed representation gets a new ETag.
+    other = client.get(
+        f"/playlists/{playlist.id}/tracks",
+        params={"limit": 1},
+        headers={"If-None-Match": etag},
+    )
+    assert other.status_code == 200
+    assert other.headers["ETag"] != etag
@@ -0,0 +1,85 @@
+# tests/test_artists.py
+from app.analytics.stats import verify_stats
+from app.db.models import Artist
+from app.etl.pipeline import SpotifyETLPipeline
+from tests.query_budget import assert_query_budget
+from tests.helpers import ChangingSpotifyClient, playlist_item, reset_db
+
+
+def _ingest(db_session):
+    reset_db(db_session)
+    spotify = ChangingSpotifyClient()
+    pipeline = SpotifyETLPipeline(client=spotify)
+    for playlist_id in ("p1", "p2"):
+        pipeline.ingest_playlist(db_session, playlist_id)
+    artists = {a.spotify_id: a.id for a in db_session.query(Artist)}
+    return spotify, pipeline, artists
+
+
+def _ranking(client, **params):
+    body = client.get("/artists", params=params).json()
+    return [(a["spotify_id"], a["playlist_count"]) for a in body["items"]], body["next_cursor"]
+
+
+def test_ranking_follows_ingests(client, db_session):
+    spotify, pipeline, artists = _ingest(db_session)
+
+    # a1 is on both playlists; ties break by artist id, newest first.
+    assert _ranking(client) == ([("a1", 2), ("a3", 1), ("a2", 1)], None)
+    resp = client.get("/artists", params={"sort": "appearances"})
+    assert [a["appearance_count"] for a in resp.json()["items"]] == [3, 1, 1]
+
+    # a1 leaves p2 and a2 joins it.
+    spotify.playlists["p2"] = [
+        playlist_item("t4", "a3", "Album C", 400),
+        playlist_item("t3", "a2", "Album B", 200),
+    ]
+    pipeline.ingest_playlist(db_session, "p2")
+    assert _ranking(client) == ([("a2", 2), ("a3", 1), ("a1", 1)], None)
+    assert verify_stats(db_session) == []
+
+
+def test_keyset_pages_cover_the_ranking_once(client, db_session):
+    _ingest(db_session)
+    expected, _ = _ranking(client)
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = _ranking(client, limit=1, **({"cursor": cursor} if cursor else {}))
+        seen.extend(page)
+        if cursor is None:
+            break
+    assert seen == expected
+    assert client.get("/artists", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_artist_and_tracks(client, db_session):
+    _, _, artists = _ingest(db_session)
+
+    resp = client.get(f"/artists/{artists['a1']}")
+    assert resp.status_code == 200
+    assert resp.json()["track_count"] == 2 and resp.json()["playlist_count"] == 2
+    assert client.get("/artists/999999").status_code == 404
+
+    resp = client.get(f"/artists/{artists['a1']}/tracks", params={"limit": 1})
+    body = resp.json()
+    assert body["total"] == 2
+    assert [t["spotify_id"] for t in body["items"]] == ["t1"]
+    resp = client.get(
+        f"/artists/{artists['a1']}/tracks", params={"limit": 1, "cursor": body["next_cursor"]}
+    )
+    assert [t["spotify_id"] for t in resp.json()["items"]] == ["t2"]
+    assert resp.json()["next_cursor"] is None
+
+
+def test_artist_query_budgets(client, db_session):
+    spotify, pipeline, artists = _ingest(db_session)
+
+    def grow():
+        spotify.playlists["p3"] = [playlist_item(f"n{i}", f"n{i}", "New", 100) for i in range(5)]
+        spotify.playlists["p3"] += [playlist_item(f"x{i}", "a1", "Album X", 100) for i in range(5)]
+        pipeline.ingest_playlist(db_session, "p3")
+
+    assert_query_budget(client, "/artists", 1, grow=grow)
+    assert_query_budget(client, f"/artists/{artists['a1']}", 1)
+    assert_query_budget(client, f"/artists/{artists['a1']}/tracks", 2)
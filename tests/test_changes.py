@@ -0,0 +1,64 @@
+# tests/test_changes.py
+from app.analytics.stats import verify_stats
+from app.db.changes import DELETE, PLAYLIST, PLAYLIST_TRACK, TRACK, UPSERT, read_changes
+from app.db.models import PlaylistTrack, Track
+from app.etl.pipeline import SpotifyETLPipeline
+from tests.helpers import ChangingSpotifyClient, playlist_item, reset_db
+
+
+def test_ingests_are_recorded_in_seq_order(client, db_session):
+    reset_db(db_session)
+    spotify = ChangingSpotifyClient()
+    pipeline = SpotifyETLPipeline(client=spotify)
+    p1 = pipeline.ingest_playlist(db_session, "p1")
+
+    rows, has_more = read_changes(db_session, 0, 100)
+    assert not has_more
+    assert [row[0] for row in rows] == sorted(row[0] for row in rows)
+    ops = [(entity, op) for _, entity, _, op, _ in rows]
+    # Parents before children: playlist, 2 artists, 3 tracks, 3 links.
+    assert ops[0] == (PLAYLIST, UPSERT)
+    assert ops.count((TRACK, UPSERT)) == 3
+    assert ops.count((PLAYLIST_TRACK, UPSERT)) == 3
+    last_seq = rows[-1][0]
+
+    # An unchanged re-ingest writes nothing.
+    pipeline.ingest_playlist(db_session, "p1")
+    assert read_changes(db_session, last_seq, 100) == ([], False)
+
+    # Shrink the playlist and add a track: one link deleted, one added.
+    spotify.playlists["p1"] = [
+        playlist_item("t1", "a1", "Album A", 100),
+        playlist_item("t2", "a1", "Album A", 300),
+        playlist_item("t5", "a2", "Album B", 250),
+    ]
+    pipeline.ingest_playlist(db_session, "p1")
+    rows, _ = read_changes(db_session, last_seq, 100)
+    changes = {(entity, op, entity_id) for _, entity, entity_id, op, _ in rows}
+    t3 = db_session.query(Track).filter_by(spotify_id="t3").one()
+    assert (PLAYLIST_TRACK, DELETE, f"{p1.id}:{t3.id}") in changes
+    assert sum(1 for entity, op, _ in changes if (entity, op) == (TRACK, UPSERT)) == 1
+    assert db_session.query(PlaylistTrack).filter_by(playlist_id=p1.id).count() == 3
+    assert verify_stats(db_session) == []
+
+
+def test_changes_endpoint_pages_with_a_cursor(client, db_session):
+    reset_db(db_session)
+    SpotifyETLPipeline(client=ChangingSpotifyClient()).ingest_playlist(db_session, "p2")
+
+    full = client.get("/changes").json()
+    assert full["has_more"] is False
+    assert full["latest_seq"] == full["next_since"] == full["changes"][-1]["seq"]
+    track = next(c for c in full["changes"] if c["entity"] == TRACK)
+    assert track["op"] == UPSERT and track["data"]["spotify_id"] in {"t2", "t4"}
+
+    seen = []
+    since = 0
+    while True:
+        page = client.get("/changes", params={"since": since, "limit": 2}).json()
+        seen.extend(c["seq"] for c in page["changes"])
+        since = page["next_since"]
+        if not page["has_more"]:
+            break
+    assert seen == [c["seq"] for c in full["changes"]]
+    assert client.get("/changes", params={"since": since}).json()["changes"] == []
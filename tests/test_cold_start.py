@@ -0,0 +1,32 @@
+# tests/test_cold_start.py
+import json
+import os
+import subprocess
+import sys
+
+PROBE = (
+    "import json, sys; import app.main; "
+    "print(json.dumps(sorted(m for m in sys.modules "
+    "if m.split('.')[0] in ('pandas', 'psycopg2', 'requests') or m.startswith('app.etl'))))"
+)
+
+
+def _loaded_after_import(role: str) -> list[str]:
+    env = dict(os.environ, APP_ROLE=role)
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_read_role_import_skips_etl_and_driver():
+    assert _loaded_after_import("read") == []
+
+
+def test_default_role_import_defers_pandas_and_driver():
+    loaded = _loaded_after_import("all")
+    assert not any(m.split(".")[0] in ("pandas", "psycopg2") for m in loaded)
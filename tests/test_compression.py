@@ -0,0 +1,90 @@
+# tests/test_compression.py
+import gzip
+
+import pytest
+
+from app.api import compression
+from app.api.compression import negotiate
+from app.core.config import get_settings
+from app.etl.pipeline import SpotifyETLPipeline
+from tests.helpers import ChangingSpotifyClient, playlist_item, reset_db
+
+
+def test_negotiate_honours_q_values(monkeypatch):
+    assert negotiate(None) is None
+    assert negotiate("identity") is None
+    assert negotiate("gzip, deflate") == "gzip"
+    assert negotiate("gzip;q=0, *;q=0.5") == ("br" if compression.brotli else None)
+    assert negotiate("br;q=0.2, gzip") == "gzip"
+    assert negotiate("*") == ("br" if compression.brotli else "gzip")
+
+    monkeypatch.setattr(compression, "brotli", None)
+    assert negotiate("br") is None
+    assert negotiate("br, gzip;q=0.1") == "gzip"
+
+
+def test_large_responses_are_compressed(client):
+    resp = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.headers["vary"] == "Accept-Encoding"
+    assert int(resp.headers["content-length"]) < len(resp.content)
+    assert "paths" in resp.json()
+
+    plain = client.get("/openapi.json", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.content == resp.content
+
+    # Under RESPONSE_COMPRESSION_MIN_BYTES: not worth the framing.
+    assert "content-encoding" not in client.get("/livez").headers
+
+
+def test_brotli_when_accepted(client):
+    pytest.importorskip("brotli")
+    resp = client.get("/openapi.json", headers={"Accept-Encoding": "gzip, br"})
+    assert resp.headers["content-encoding"] == "br"
+    assert "paths" in resp.json()
+
+
+@pytest.fixture
+def big_playlist(db_session, monkeypatch):
+    reset_db(db_session)
+    spotify = ChangingSpotifyClient()
+    spotify.playlists["p1"] = [
+        playlist_item(f"s{n:02}", "a1", "Album A", 100 + n) for n in range(30)
+    ]
+    playlist_id = SpotifyETLPipeline(client=spotify).ingest_playlist(db_session, "p1").id
+    settings = get_settings()
+    monkeypatch.setattr(settings, "json_stream_min_rows", 1000)
+    return f"/playlists/{playlist_id}/tracks", settings
+
+
+def test_large_track_listings_are_streamed(client, big_playlist, monkeypatch):
+    url, settings = big_playlist
+    buffered = client.get(url)
+    assert buffered.headers["ETag"]
+
+    monkeypatch.setattr(settings, "json_stream_min_rows", 10)
+    monkeypatch.setattr(settings, "json_stream_batch_rows", 7)
+    streamed = client.get(url, headers={"Accept-Encoding": "identity"})
+    assert streamed.status_code == 200
+    assert "etag" not in streamed.headers and "content-length" not in streamed.headers
+    assert streamed.headers["X-Total-Count"] == "30"
+    assert streamed.json() == buffered.json()
+
+    page = client.get(url, params={"offset": 5, "limit": 20})
+    assert page.json() == buffered.json()[5:25]
+    # Small pages keep their ETag.
+    assert "etag" in client.get(url, params={"limit": 10}).headers
+
+
+def test_streamed_body_is_compressed_per_chunk(client, big_playlist, monkeypatch):
+    url, settings = big_playlist
+    expected = client.get(url).json()
+    monkeypatch.setattr(settings, "json_stream_min_rows", 10)
+    monkeypatch.setattr(settings, "json_stream_batch_rows", 7)
+
+    with client.stream("GET", url, headers={"Accept-Encoding": "gzip"}) as resp:
+        assert resp.headers["content-encoding"] == "gzip"
+        raw = b"".join(resp.iter_raw())
+    assert gzip.decompress(raw).decode() == client.get(url).text
+    assert client.get(url, headers={"Accept-Encoding": "gzip"}).json() == expected
@@ -0,0 +1,103 @@
+# tests/test_dedup.py
+from app.analytics.dedup import normalize_artist, normalize_title, rebuild_song_groups
+from app.analytics.stats import verify_stats
+from app.db.models import Track
+from app.etl.pipeline import SpotifyETLPipeline
+from tests.helpers import reset_db
+
+
+def test_normalize_title_drops_release_variants():
+    assert normalize_title("Heroes - 2017 Remaster") == "heroes"
+    assert normalize_title("Heroes (feat. Someone) [Mono]") == "heroes"
+    assert normalize_title("Heroes - Single Version") == "heroes"
+    # Different recordings keep distinct keys.
+    assert normalize_title("Heroes (Live)") == "heroes-live"
+    assert normalize_title("Rock & Roll") == "rock-and-roll"
+    # Names without Latin letters keep their own key instead of "".
+    assert normalize_artist("Кино") == "кино"
+    assert normalize_title("Группа крови (Remastered)") == "группа-крови"
+    assert normalize_title("打上花火") == "打上花火"
+
+
+def _item(track_id, title, artist, duration_ms):
+    return {
+        "added_at": "2024-01-01T00:00:00Z",
+        "track": {
+            "id": track_id,
+            "name": title,
+            "duration_ms": duration_ms,
+            "album": {"name": f"Album {track_id}"},
+            "artists": [{"id": artist.lower().replace(" ", "_"), "name": artist}],
+        },
+    }
+
+
+class DuplicatesSpotifyClient:
+    playlists = {
+        "originals": [
+            _item("h1", "Heroes", "David Bowie", 371_000),
+            _item("s1", "Starman", "David Bowie", 254_000),
+        ],
+        "compilation": [
+            # Same songs under new ids, one remastered with a slightly
+            # different length.
+            _item("h2", "Heroes - 2017 Remaster", "David Bowie", 373_000),
+            _item("s2", "Starman", "DAVID BOWIE", 254_000),
+            # Same title but a very different length: a separate song.
+            _item("h3", "Heroes", "David Bowie", 210_000),
+            _item("h4", "Heroes (Live)", "David Bowie", 372_000),
+        ],
+        "non_latin": [
+            _item("k1", "Группа крови", "Кино", 285_000),
+            _item("y1", "打上花火", "米津玄師", 287_000),
+            _item("k2", "Группа крови - Remastered", "КИНО", 286_000),
+        ],
+    }
+
+    def get_playlist(self, playlist_id: str):
+        return {
+            "id": playlist_id,
+            "name": playlist_id,
+            "description": "",
+            "owner": {"display_name": ""},
+            "tracks": {"items": self.playlists[playlist_id]},
+        }
+
+
+def _groups(db_session):
+    by_group = {}
+    for spotify_id, group_id in db_session.query(Track.spotify_id, Track.song_group_id):
+        by_group.setdefault(group_id, set()).add(spotify_id)
+    return sorted(sorted(members) for members in by_group.values())
+
+
+def test_ingest_clusters_duplicates_incrementally(client, db_session):
+    reset_db(db_session)
+    pipeline = SpotifyETLPipeline(client=DuplicatesSpotifyClient())
+    pipeline.ingest_playlist(db_session, "originals")
+    pipeline.ingest_playlist(db_session, "compilation")
+
+    incremental = _groups(db_session)
+    assert incremental == [["h1", "h2"], ["h3"], ["h4"], ["s1", "s2"]]
+
+    stats = client.get("/stats").json()
+    assert stats["track_count"] == 6
+    assert stats["song_count"] == 4
+    assert verify_stats(db_session) == []
+
+    resp = client.get("/tracks/search", params={"q": "heroes"})
+    assert resp.json()["total"] == 4
+    resp = client.get("/tracks/search", params={"q": "heroes", "collapse": True})
+    assert sorted(i["spotify_id"] for i in resp.json()["items"]) == ["h1", "h3", "h4"]
+
+    assert rebuild_song_groups(db_session) == 4
+    assert _groups(db_session) == incremental
+
+
+def test_non_latin_names_are_not_lumped_together(db_session):
+    reset_db(db_session)
+    pipeline = SpotifyETLPipeline(client=DuplicatesSpotifyClient())
+    pipeline.ingest_playlist(db_session, "non_latin")
+
+    assert _groups(db_session) == [["k1", "k2"], ["y1"]]
+    assert rebuild_song_groups(db_session) == 2
@@ -0,0 +1,105 @@
+# tests/test_fake_spotify.py
+import time
+
+import pytest
+
+from app.db.models import Artist, Track, Playlist, PlaylistTrack
+from app.etl.fake_spotify_server import FAKE_ACCESS_TOKEN, FakeSpotifyConfig, FakeSpotifyServer
+from app.etl.pipeline import SpotifyETLPipeline
+from app.etl.rate_limiter import TokenBucketRateLimiter
+from app.etl.spotify_client import SpotifyClient
+
+
+@pytest.fixture(scope="module")
+def fake_spotify():
+    config = FakeSpotifyConfig(
+        default_track_count=250,
+        throttle_every=3,
+        retry_after_seconds=0,
+        missing_playlist_ids={"missing"},
+    )
+    with FakeSpotifyServer(config) as server:
+        yield server
+
+
+def make_client(server) -> SpotifyClient:
+    return SpotifyClient(
+        rate_limiter=TokenBucketRateLimiter(rate=1000, burst=100),
+        api_base=server.api_base,
+        token_url=server.token_url,
+    )
+
+
+def test_client_follows_pagination_and_retries_429(fake_spotify, monkeypatch):
+    from app.etl import spotify_client
+
+    monkeypatch.setattr(spotify_client.settings, "spotify_client_id", "id")
+    monkeypatch.setattr(spotify_client.settings, "spotify_client_secret", "secret")
+
+    client = make_client(fake_spotify)
+    raw = client.get_playlist("https://open.spotify.com/playlist/abc123?si=x")
+
+    assert raw["id"] == "abc123"
+    assert raw["snapshot_id"]
+    assert len(raw["tracks"]["items"]) == 250
+    assert raw["tracks"]["next"] is None
+    assert client.rate_limiter.stats.throttled_responses >= 1
+
+    # Deterministic: the same playlist yields the same tracks every time.
+    again = make_client(fake_spotify).get_playlist("abc123")
+    assert [i["track"]["id"] for i in again["tracks"]["items"]] == [
+        i["track"]["id"] for i in raw["tracks"]["items"]
+    ]
+
+
+def test_missing_playlist_maps_to_404(fake_spotify, monkeypatch):
+    from fastapi import HTTPException
+    from app.etl import spotify_client
+
+    monkeypatch.setattr(spotify_client.settings, "spotify_client_id", "id")
+    monkeypatch.setattr(spotify_client.settings, "spotify_client_secret", "secret")
+
+    with pytest.raises(HTTPException) as exc:
+        make_client(fake_spotify).get_playlist("missing")
+    assert exc.value.status_code == 404
+
+
+def test_expired_and_rejected_tokens_are_renewed(fake_spotify, monkeypatch):
+    from app.etl import spotify_client
+
+    monkeypatch.setattr(spotify_client.settings, "spotify_client_id", "id")
+    monkeypatch.setattr(spotify_client.settings, "spotify_client_secret", "secret")
+    client = make_client(fake_spotify)
+    key = (fake_spotify.token_url, "id")
+
+    # A long-lived client (a worker's) sees the shared token expire...
+    monkeypatch.setitem(spotify_client._tokens, key, ("old", time.monotonic() - 1))
+    assert client._get_access_token() == FAKE_ACCESS_TOKEN
+
+    # ...and a token Spotify rejects early is dropped and fetched again.
+    monkeypatch.setitem(spotify_client._tokens, key, ("revoked", time.monotonic() + 3600))
+    assert client.get_playlist("abc123")["id"] == "abc123"
+    assert spotify_client._tokens[key][0] == FAKE_ACCESS_TOKEN
+
+
+def test_pipeline_ingests_from_fake_server(fake_spotify, db_session, monkeypatch):
+    from app.etl import spotify_client
+
+    monkeypatch.setattr(spotify_client.settings, "spotify_client_id", "id")
+    monkeypatch.setattr(spotify_client.settings, "spotify_client_secret", "secret")
+
+    db_session.query(PlaylistTrack).delete()
+    db_session.query(Track).delete()
+    db_session.query(Artist).delete()
+    db_session.query(Playlist).delete()
+    db_session.commit()
+
+    pipeline = SpotifyETLPipeline(client=make_client(fake_spotify))
+    playlist = pipeline.ingest_playlist(db=db_session, playlist_id="offline1")
+
+    count = (
+        db_session.query(PlaylistTrack)
+        .filter(PlaylistTrack.playlist_id == playlist.id)
+        .count()
+    )
+    assert count == 250
@@ -0,0 +1,68 @@
+# tests/test_genius_links.py
+from datetime import datetime, timedelta
+
+from app.db.models import GeniusLink
+from app.etl import genius_links
+from app.etl.genius_links import StubGeniusBackend, verify_links
+from app.etl.pipeline import SpotifyETLPipeline
+from tests.helpers import DummySpotifyClient, reset_db
+
+
+SONG_ONE = "https://genius.com/artist-one-song-one-lyrics"
+SONG_ONE_CANONICAL = "https://genius.com/Artist-one-song-one-lyrics"
+
+
+def _ingest(db_session):
+    reset_db(db_session)
+    return SpotifyETLPipeline(client=DummySpotifyClient()).ingest_playlist(
+        db_session, "fake_playlist_id"
+    )
+
+
+def test_verify_caches_outcomes_until_they_expire(db_session):
+    _ingest(db_session)
+    backend = StubGeniusBackend({SONG_ONE: SONG_ONE_CANONICAL + "?ref=redirect"})
+
+    result = verify_links(db_session, backend, concurrency=2)
+    assert (result.checked, result.verified, result.missing) == (2, 1, 1)
+    links = {link.url: link for link in db_session.query(GeniusLink)}
+    assert links[SONG_ONE].status == "verified"
+    assert links[SONG_ONE].canonical_url == SONG_ONE_CANONICAL
+
+    # Fresh results are not re-checked...
+    assert verify_links(db_session, backend).checked == 0
+    assert len(backend.calls) == 2
+    # ...until their TTL runs out.
+    later = datetime.utcnow() + timedelta(days=365)
+    assert verify_links(db_session, backend, now=later).checked == 2
+
+
+def test_failed_checks_are_retried_sooner(db_session):
+    _ingest(db_session)
+
+    class DownBackend:
+        def check(self, url):
+            raise ConnectionError("genius unreachable")
+
+    result = verify_links(db_session, DownBackend())
+    assert result.errors == 2
+    link = db_session.query(GeniusLink).first()
+    assert link.status == "error" and link.http_status is None
+    assert link.expires_at - link.checked_at < timedelta(days=1)
+    assert genius_links.link_status_counts(db_session) == {"error": 2, "unchecked": 0}
+
+
+def test_track_listings_serve_cached_links(client, db_session):
+    playlist = _ingest(db_session)
+    items = client.get(f"/playlists/{playlist.id}/tracks").json()
+    assert {i["genius_status"] for i in items} == {"unverified"}
+
+    verify_links(db_session, StubGeniusBackend({SONG_ONE: SONG_ONE_CANONICAL}))
+    items = {i["name"]: i for i in client.get(f"/playlists/{playlist.id}/tracks").json()}
+    assert items["Song One"]["genius_url"] == SONG_ONE_CANONICAL
+    assert items["Song One"]["genius_status"] == "verified"
+    assert items["Song Two"]["genius_url"] == ""
+    assert items["Song Two"]["genius_status"] == "missing"
+
+    search = client.get("/tracks/search", params={"q": "song one"}).json()
+    assert search["items"][0]["genius_url"] == SONG_ONE_CANONICAL
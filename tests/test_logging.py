@@ -0,0 +1,73 @@
+# tests/test_logging.py
+import io
+import json
+import logging
+import queue
+
+from app.core.logging_config import (
+    JsonFormatter,
+    NonBlockingQueueHandler,
+    SamplingFilter,
+    configure_logging,
+    stop_logging,
+)
+from app.core.tracing import start_trace
+
+
+def _record(level=logging.INFO, msg="hello %s", args=("world",), **extra):
+    record = logging.LogRecord("app.test", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_includes_trace_and_extra_fields():
+    line = JsonFormatter().format(_record(trace_id="abc", span_id="-", duration_ms=1.5))
+    entry = json.loads(line)
+    assert entry["msg"] == "hello world"
+    assert entry["level"] == "INFO" and entry["logger"] == "app.test"
+    assert entry["trace_id"] == "abc" and "span_id" not in entry
+    assert entry["duration_ms"] == 1.5
+
+
+def test_sampling_keeps_info_and_thins_debug():
+    drop_all = SamplingFilter(0.0)
+    assert drop_all.filter(_record(logging.INFO))
+    assert not drop_all.filter(_record(logging.DEBUG))
+    assert SamplingFilter(1.0).filter(_record(logging.DEBUG))
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    handler.handle(_record())
+    handler.handle(_record())
+    assert handler.dropped == 1
+
+
+def test_configured_logging_writes_json_with_trace_id_and_traceback():
+    stream = io.StringIO()
+    configure_logging(level="DEBUG", fmt="json", debug_sample_rate=1.0, stream=stream)
+    try:
+        log = logging.getLogger("app.test")
+        with start_trace("job", trace_id="trace-1"):
+            log.info("ingested %d tracks", 3, extra={"playlist_id": "pl"})
+            try:
+                raise ValueError("boom")
+            except ValueError:
+                log.exception("failed")
+    finally:
+        stop_logging()
+
+    entries = [json.loads(line) for line in stream.getvalue().splitlines()]
+    ours = [e for e in entries if e["logger"] == "app.test"]
+    assert ours[0]["msg"] == "ingested 3 tracks"
+    assert ours[0]["trace_id"] == "trace-1" and ours[0]["playlist_id"] == "pl"
+    assert ours[1]["level"] == "ERROR" and "ValueError: boom" in ours[1]["exc"]
+
+
+def test_requests_log_an_access_line_with_timing(client, caplog):
+    with caplog.at_level(logging.INFO, logger="app.access"):
+        resp = client.get("/health", headers={"X-Request-ID": "req-9"})
+    (record,) = [r for r in caplog.records if r.name == "app.access"]
+    assert record.status == 200 and record.path == "/health"
+    assert record.duration_ms >= 0
+    assert resp.headers["X-Request-ID"] == "req-9"
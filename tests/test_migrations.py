@@ -0,0 +1,127 @@
+# tests/test_migrations.py
+from sqlalchemy import create_engine, inspect, text
+
+from app.db import migrations
+from app.db.base import Base
+from app.db import models  # noqa: F401  (registers tables on Base.metadata)
+
+
+def _schema(engine):
+    insp = inspect(engine)
+    schema = {}
+    for table in insp.get_table_names():
+        if table == "schema_migrations":
+            continue
+        schema[table] = {
+            "columns": sorted(c["name"] for c in insp.get_columns(table)),
+            "indexes": sorted(i["name"] for i in insp.get_indexes(table)),
+        }
+    return schema
+
+
+def test_upgrade_creates_schema_and_records_versions(tmp_path):
+    engine = create_engine(f"sqlite+pysqlite:///{tmp_path / 'migrated.sqlite3'}")
+
+    applied = migrations.upgrade(engine)
+    assert applied == [m.version for m in migrations.discover()]
+    assert migrations.current_version(engine) == applied[-1]
+
+    indexes = {i["name"] for i in inspect(engine).get_indexes("playlist_tracks")}
+    assert "ix_playlist_tracks_track_id_playlist_id" in indexes
+    assert "ix_playlist_tracks_playlist_id_added_at" in indexes
+
+    # Re-running is a no-op.
+    assert migrations.upgrade(engine) == []
+    engine.dispose()
+
+
+def test_migrations_match_model_metadata(tmp_path):
+    migrated = create_engine(f"sqlite+pysqlite:///{tmp_path / 'migrated.sqlite3'}")
+    migrations.upgrade(migrated)
+
+    declared = create_engine(f"sqlite+pysqlite:///{tmp_path / 'declared.sqlite3'}")
+    Base.metadata.create_all(bind=declared)
+
+    assert _schema(migrated) == _schema(declared)
+    migrated.dispose()
+    declared.dispose()
+
+
+def test_upgrade_on_existing_baseline_database(tmp_path):
+    engine = create_engine(f"sqlite+pysqlite:///{tmp_path / 'legacy.sqlite3'}")
+    # Simulate a database created by the old startup create_all.
+    from app.db.migrations import v0001_baseline
+
+    v0001_baseline.metadata.create_all(bind=engine)
+    applied = migrations.upgrade(engine)
+    assert 1 in applied
+    indexes = {i["name"] for i in inspect(engine).get_indexes("tracks")}
+    assert "ix_tracks_artist_id" in indexes
+    engine.dispose()
+
+
+def test_playlist_tracks_rewrite_keeps_rows(tmp_path):
+    engine = create_engine(f"sqlite+pysqlite:///{tmp_path / 'legacy.sqlite3'}")
+    migrations.upgrade(engine, target=6)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO artists (id, spotify_id, name) VALUES (1, 'a', 'A')"))
+        conn.execute(
+            text(
+                "INSERT INTO tracks (id, spotify_id, name, artist_id) "
+                "VALUES (1, 't1', 'One', 1), (2, 't2', 'Two', 1)"
+            )
+        )
+        conn.execute(text("INSERT INTO playlists (id, spotify_id, name) VALUES (1, 'p', 'P')"))
+        conn.execute(
+            text(
+                "INSERT INTO playlist_tracks (id, playlist_id, track_id, added_at) "
+                "VALUES (10, 1, 1, '2024-01-01 00:00:00'), (11, 1, 2, NULL)"
+            )
+        )
+
+    assert migrations.upgrade(engine, target=7) == [7]
+    insp = inspect(engine)
+    assert "id" not in {c["name"] for c in insp.get_columns("playlist_tracks")}
+    assert insp.get_pk_constraint("playlist_tracks")["constrained_columns"] == [
+        "playlist_id",
+        "track_id",
+    ]
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text("SELECT playlist_id, track_id, added_at FROM playlist_tracks ORDER BY track_id")
+        ).all()
+    assert [tuple(r) for r in rows] == [(1, 1, "2024-01-01 00:00:00"), (1, 2, None)]
+    engine.dispose()
+
+
+def test_artist_playlist_counts_are_backfilled(tmp_path):
+    engine = create_engine(f"sqlite+pysqlite:///{tmp_path / 'legacy.sqlite3'}")
+    migrations.upgrade(engine, target=12)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO artists (id, spotify_id, name) VALUES (1, 'a', 'A')"))
+        conn.execute(
+            text(
+                "INSERT INTO tracks (id, spotify_id, name, artist_id) "
+                "VALUES (1, 't1', 'One', 1), (2, 't2', 'Two', 1)"
+            )
+        )
+        conn.execute(
+            text("INSERT INTO playlists (id, spotify_id, name) VALUES (1, 'p', 'P'), (2, 'q', 'Q')")
+        )
+        conn.execute(
+            text(
+                "INSERT INTO playlist_tracks (playlist_id, track_id) "
+                "VALUES (1, 1), (1, 2), (2, 2)"
+            )
+        )
+        conn.execute(
+            text(
+                "INSERT INTO artist_stats (artist_id, track_count, appearance_count) "
+                "VALUES (1, 2, 3)"
+            )
+        )
+
+    assert migrations.upgrade(engine, target=13) == [13]
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT playlist_count FROM artist_stats")).scalar() == 2
+    engine.dispose()
@@ -0,0 +1,88 @@
+# tests/test_payload_cache.py
+import pytest
+import requests
+from fastapi import HTTPException
+
+from app.db.models import PlaylistTrack
+from app.etl.fake_spotify_server import FakeSpotifyConfig, FakeSpotifyServer
+from app.etl.payload_cache import PayloadCache
+from app.etl.pipeline import SpotifyETLPipeline
+from app.etl.rate_limiter import TokenBucketRateLimiter
+from app.etl.spotify_client import SpotifyClient
+from tests.helpers import reset_db
+
+
+@pytest.fixture
+def fake_spotify(monkeypatch):
+    from app.etl import spotify_client
+
+    monkeypatch.setattr(spotify_client.settings, "spotify_client_id", "id")
+    monkeypatch.setattr(spotify_client.settings, "spotify_client_secret", "secret")
+    with FakeSpotifyServer(FakeSpotifyConfig(default_track_count=250)) as server:
+        yield server
+
+
+def make_client(server, cache, offline=False) -> SpotifyClient:
+    return SpotifyClient(
+        rate_limiter=TokenBucketRateLimiter(rate=1000, burst=100),
+        api_base=server.api_base,
+        token_url=server.token_url,
+        payload_cache=cache,
+        offline=offline,
+    )
+
+
+def test_unchanged_playlists_are_revalidated_with_a_304(fake_spotify, tmp_path):
+    cache = PayloadCache(tmp_path)
+    first = make_client(fake_spotify, cache).get_playlist("pl1")
+    assert len(first["tracks"]["items"]) == 250
+    assert cache.stored == 3  # playlist document + two more pages
+
+    cache = PayloadCache(tmp_path)
+    again = make_client(fake_spotify, cache).get_playlist("pl1")
+    assert again == first
+    # One 304 for the playlist; an unchanged snapshot means unchanged
+    # pages, which then come straight from disk.
+    assert (cache.revalidated, cache.replayed, cache.stored) == (1, 2, 0)
+    assert fake_spotify.app.state.not_modified_count == 1
+
+    # A new snapshot invalidates the ETags, so the pages are fetched again.
+    requests.put(f"{fake_spotify.base_url}/_admin/playlists/pl1", params={"tracks": 120})
+    cache = PayloadCache(tmp_path)
+    changed = make_client(fake_spotify, cache).get_playlist("pl1")
+    assert len(changed["tracks"]["items"]) == 120
+    assert (cache.revalidated, cache.stored) == (0, 2)
+
+
+def test_offline_replay_ingests_without_network(fake_spotify, tmp_path, db_session):
+    reset_db(db_session)
+    make_client(fake_spotify, PayloadCache(tmp_path)).get_playlist("pl2")
+    requests_before = fake_spotify.app.state.request_count
+
+    offline = make_client(fake_spotify, PayloadCache(tmp_path), offline=True)
+    playlist = SpotifyETLPipeline(client=offline).ingest_playlist(db_session, "pl2")
+    assert fake_spotify.app.state.request_count == requests_before
+    assert offline.payload_cache.replayed == 3
+    assert (
+        db_session.query(PlaylistTrack).filter(PlaylistTrack.playlist_id == playlist.id).count()
+        == 250
+    )
+
+    with pytest.raises(HTTPException) as exc:
+        offline.get_playlist("never_fetched")
+    assert exc.value.status_code == 503
+
+
+def test_bodies_are_content_addressed_and_pruned(tmp_path):
+    cache = PayloadCache(tmp_path)
+    cache.store("https://api/a", b'{"same": true}', '"e1"')
+    cache.store("https://api/b", b'{"same": true}', None)
+    assert cache.stats()["objects"] == 1
+    assert cache.read(cache.lookup("https://api/a")) == b'{"same": true}'
+    assert cache.lookup("https://api/a").etag == '"e1"'
+
+    cache.store("https://api/a", b'{"same": false}', '"e2"')
+    cache.store("https://api/b", b'{"same": false}', '"e2"')
+    assert cache.prune() == 1
+    stats = cache.stats()
+    assert (stats["refs"], stats["objects"]) == (2, 1)
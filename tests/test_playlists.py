@@ -1,69 +1,7 @@
 # tests/test_playlists.py
-from datetime import datetime, timedelta
-
 from app.db.models import Artist, Track, Playlist, PlaylistTrack
 from app.etl.pipeline import SpotifyETLPipeline
-
-
-class DummySpotifyClient:
-    """
-    Minimal fake that matches SpotifyClient.get_playlist interface.
-    """
-
-    def __init__(self):
-        now_iso = datetime.utcnow().isoformat() + "Z"
-        self._payload = {
-            "id": "fake_playlist_id",
-            "name": "Fake Playlist",
-            "description": "Test playlist",
-            "owner": {"display_name": "Test Owner"},
-            "tracks": {
-                "items": [
-                    {
-                        "added_at": now_iso,
-                        "track": {
-                            "id": "track_1",
-                            "name": "Song One",
-                            "duration_ms": 180000,
-                            "album": {"name": "Album One"},
-                            "artists": [
-                                {
-                                    "id": "artist_1",
-                                    "name": "Artist One",
-                                }
-                            ],
-                        },
-                    },
-                    {
-                        "added_at": (datetime.utcnow() - timedelta(days=1)).isoformat()
-                        + "Z",
-                        "track": {
-                            "id": "track_2",
-                            "name": "Song Two",
-                            "duration_ms": 200000,
-                            "album": {"name": "Album Two"},
-                            "artists": [
-                                {
-                                    "id": "artist_2",
-                                    "name": "Artist Two",
-                                }
-                            ],
-                        },
-                    },
-                ]
-            },
-        }
-
-    def get_playlist(self, playlist_id: str):
-        return self._payload
-
-
-def reset_db(db_session):
-    db_session.query(PlaylistTrack).delete()
-    db_session.query(Track).delete()
-    db_session.query(Artist).delete()
-    db_session.query(Playlist).delete()
-    db_session.commit()
+from tests.helpers import DummySpotifyClient, reset_db
 
 
 def test_etl_pipeline_ingests_playlist(db_session):
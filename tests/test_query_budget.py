@@ -0,0 +1,79 @@
+# tests/test_query_budget.py
+import logging
+
+import pytest
+from sqlalchemy import text
+
+from app.core.query_profiler import configure_query_profiler, query_scope
+from app.etl.pipeline import SpotifyETLPipeline
+from tests.helpers import ChangingSpotifyClient, playlist_item, reset_db
+from tests.query_budget import assert_query_budget, query_count
+
+
+@pytest.fixture
+def catalog(db_session):
+    reset_db(db_session)
+    spotify = ChangingSpotifyClient()
+    pipeline = SpotifyETLPipeline(client=spotify)
+    p1 = pipeline.ingest_playlist(db_session, "p1")
+
+    def grow():
+        # More tracks, artists and albums in p1, and another playlist.
+        spotify.playlists["p1"] += [
+            playlist_item(f"g{n}", f"ga{n}", f"Album G{n}", 1000 + n) for n in range(10)
+        ]
+        pipeline.ingest_playlist(db_session, "p1")
+        pipeline.ingest_playlist(db_session, "p2")
+
+    return p1, grow
+
+
+def test_server_timing_reports_queries(client, catalog):
+    resp = client.get("/playlists/")
+    assert resp.headers["Server-Timing"].startswith("db;dur=")
+    assert "app;dur=" in resp.headers["Server-Timing"]
+    assert query_count(resp) >= 1
+
+
+@pytest.mark.parametrize(
+    "url, budget, params",
+    [
+        ("/playlists/", 2, {}),
+        ("/playlists/{p1}/tracks", 3, {}),
+        ("/tracks/search", 1, {"q": "song"}),
+        ("/tracks/search", 2, {"facets": True}),
+        ("/stats", 3, {}),
+    ],
+)
+def test_read_endpoints_stay_within_budget(client, catalog, url, budget, params):
+    p1, grow = catalog
+    assert_query_budget(client, url.format(p1=p1.id), budget, grow=grow, **params)
+
+
+def test_budget_helper_catches_per_row_queries(client, catalog, db_session):
+    from app.db.models import Playlist
+    from app.main import app
+
+    @app.get("/_test/n_plus_one")
+    def n_plus_one():
+        return [len(p.items) for p in db_session.query(Playlist)]  # lazy load per row
+
+    try:
+        _, grow = catalog
+        with pytest.raises(AssertionError, match="with more data"):
+            assert_query_budget(client, "/_test/n_plus_one", 10, grow=grow)
+    finally:
+        app.router.routes.pop()
+
+
+def test_slow_queries_are_logged_with_their_plan(db_session, caplog):
+    configure_query_profiler(slow_query_ms=0, explain=True)
+    try:
+        with caplog.at_level(logging.WARNING, logger="app.sql"), query_scope() as stats:
+            db_session.execute(text("SELECT id FROM tracks WHERE spotify_id = :s"), {"s": "t1"})
+    finally:
+        configure_query_profiler()
+    assert stats.count == 1
+    (record,) = [r for r in caplog.records if r.name == "app.sql"]
+    assert "SELECT id FROM tracks" in record.getMessage()
+    assert "ix_tracks_spotify_id" in record.plan
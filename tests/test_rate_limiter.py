@@ -0,0 +1,89 @@
+# tests/test_rate_limiter.py
+import time
+
+import pytest
+
+from app.etl.rate_limiter import TokenBucketRateLimiter
+
+
+def test_burst_is_served_without_waiting():
+    limiter = TokenBucketRateLimiter(rate=5, burst=3)
+    waits = [limiter.acquire() for _ in range(3)]
+    assert waits == [0.0, 0.0, 0.0]
+    assert limiter.stats.acquisitions == 3
+
+
+def test_acquire_waits_once_bucket_is_empty():
+    limiter = TokenBucketRateLimiter(rate=20, burst=1)
+    limiter.acquire()
+    start = time.monotonic()
+    waited = limiter.acquire()
+    assert waited > 0
+    assert time.monotonic() - start >= 0.03
+    assert limiter.stats.total_wait_seconds == pytest.approx(waited)
+
+
+def test_throttling_lowers_rate_and_success_recovers():
+    limiter = TokenBucketRateLimiter(rate=10, burst=1, increase_step=2.0)
+    limiter.on_throttled(retry_after=None)
+    assert limiter.current_rate == pytest.approx(5.0)
+    assert limiter.stats.throttled_responses == 1
+
+    limiter.on_success()
+    limiter.on_success()
+    limiter.on_success()
+    assert limiter.current_rate == pytest.approx(10.0)
+
+
+def test_retry_after_blocks_the_bucket():
+    limiter = TokenBucketRateLimiter(rate=100, burst=5)
+    limiter.on_throttled(retry_after=0.1)
+    waited = limiter.acquire()
+    assert waited >= 0.09
+
+
+def test_file_state_is_shared_between_limiters(tmp_path):
+    path = str(tmp_path / "bucket.state")
+    first = TokenBucketRateLimiter(rate=1, burst=2, state_path=path)
+    second = TokenBucketRateLimiter(rate=1, burst=2, state_path=path)
+
+    assert first.acquire() == 0.0
+    assert second.acquire() == 0.0
+
+    # Throttling seen by one process is visible to the other.
+    first.on_throttled(retry_after=None)
+    assert second.current_rate == pytest.approx(0.5)
+
+
+def test_client_retries_after_429(monkeypatch):
+    from app.etl import spotify_client
+
+    class FakeResponse:
+        def __init__(self, status_code, headers=None, payload=None):
+            self.status_code = status_code
+            self.headers = headers or {}
+            self._payload = payload
+            self.text = ""
+
+        def json(self):
+            return self._payload
+
+        def raise_for_status(self):
+            pass
+
+    responses = [
+        FakeResponse(429, {"Retry-After": "0"}),
+        FakeResponse(200, payload={"id": "pl"}),
+    ]
+    monkeypatch.setattr(
+        spotify_client.requests.Session, "get", lambda *a, **kw: responses.pop(0)
+    )
+    monkeypatch.setattr(
+        spotify_client.SpotifyClient, "_get_access_token", lambda self: "token"
+    )
+
+    limiter = TokenBucketRateLimiter(rate=100, burst=10)
+    client = spotify_client.SpotifyClient(rate_limiter=limiter)
+    assert client.get_playlist("pl") == {"id": "pl"}
+    assert limiter.stats.throttled_responses == 1
+    assert limiter.current_rate < 100
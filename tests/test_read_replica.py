@@ -0,0 +1,95 @@
+# tests/test_read_replica.py
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.api.deps import READ_AFTER_WRITE_COOKIE
+from app.db.base import Base
+from app.db.models import Playlist
+from app.worker import queue
+from tests.helpers import DummySpotifyClient
+
+
+@pytest.fixture
+def split_engines(tmp_path, monkeypatch):
+    """
+    Primary and "replica" as two separate SQLite files, so the database a
+    request was routed to is visible from what it returns.
+    """
+    from app.db import session as db_session_module
+
+    engines = {}
+    for role in ("primary", "replica"):
+        engine = create_engine(
+            f"sqlite+pysqlite:///{tmp_path / f'{role}.sqlite3'}",
+            connect_args={"check_same_thread": False},
+        )
+        Base.metadata.create_all(bind=engine)
+        with Session(engine) as db:
+            db.add(Playlist(spotify_id=f"{role}_pl", name=f"On {role}", is_curated=True))
+            db.commit()
+        engines[role] = engine
+
+    monkeypatch.setattr(db_session_module, "_engine", engines["primary"])
+    monkeypatch.setattr(db_session_module, "_read_engine", engines["replica"])
+    yield engines
+    for engine in engines.values():
+        engine.dispose()
+
+
+@pytest.fixture
+def fake_spotify(monkeypatch):
+    from app.etl import spotify_client
+
+    monkeypatch.setattr(spotify_client.SpotifyClient, "__init__", lambda self: None)
+    monkeypatch.setattr(
+        spotify_client.SpotifyClient,
+        "get_playlist",
+        lambda self, playlist_id: DummySpotifyClient().get_playlist(playlist_id),
+    )
+
+
+def _names(client):
+    return [p["name"] for p in client.get("/playlists/").json()]
+
+
+def test_reads_use_replica_and_writes_use_primary(split_engines, fake_spotify):
+    from app import main as app_main
+
+    with TestClient(app_main.app) as client:
+        assert _names(client) == ["On replica"]
+
+        resp = client.post("/playlists/ingest", json={"playlist_id": "fake_playlist_id"})
+        assert resp.status_code == 200
+        assert READ_AFTER_WRITE_COOKIE in resp.cookies
+
+        # Same client, inside the window: served by the primary, so it sees
+        # its own write even though the replica has not caught up.
+        assert _names(client) == ["On primary", "Fake Playlist"]
+        assert client.get("/tracks/search", params={"q": "Song"}).json()["total"] == 2
+
+        # A different client is not pinned.
+        other = TestClient(app_main.app)
+        assert _names(other) == ["On replica"]
+
+        # An expired pin falls back to the replica.
+        other.cookies.set(READ_AFTER_WRITE_COOKIE, f"{time.time() - 1:.3f}")
+        assert _names(other) == ["On replica"]
+        # So does a pin further out than the configured window.
+        other.cookies.set(READ_AFTER_WRITE_COOKIE, f"{time.time() + 3600:.3f}")
+        assert _names(other) == ["On replica"]
+
+
+def test_polling_a_job_does_not_pin_to_primary(split_engines):
+    from app import main as app_main
+
+    with Session(split_engines["replica"]) as db:
+        job_id = queue.enqueue(db, "replicated_playlist").id
+
+    with TestClient(app_main.app) as client:
+        resp = client.get(f"/playlists/ingest/jobs/{job_id}")
+        assert resp.status_code == 200 and resp.json()["status"] == queue.QUEUED
+        assert READ_AFTER_WRITE_COOKIE not in resp.cookies
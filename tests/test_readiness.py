@@ -0,0 +1,61 @@
+# tests/test_readiness.py
+import time
+
+from sqlalchemy import create_engine
+
+from app.api import readiness as readiness_module
+from app.api.readiness import ReadinessMonitor
+from app.etl import spotify_client
+from app.etl.fake_spotify_server import FAKE_ACCESS_TOKEN, FakeSpotifyServer
+from app.etl.spotify_client import SpotifyClient
+from tests.query_budget import query_count
+
+
+def _wait_ready(client, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        resp = client.get("/readyz")
+        if resp.status_code == 200 or time.monotonic() > deadline:
+            return resp
+        time.sleep(0.02)
+
+
+def test_livez_and_readyz(client):
+    assert client.get("/livez").json() == {"status": "ok"}
+
+    resp = _wait_ready(client)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["status"] == "ready" and body["database_ok"]
+    # Served from the background-refreshed state, not a query per probe.
+    assert query_count(resp) == 0
+
+
+def test_readyz_reports_database_failure(client, monkeypatch):
+    assert _wait_ready(client).status_code == 200
+    broken = create_engine("sqlite+pysqlite:////nonexistent/dir/catalog.sqlite3")
+    monkeypatch.setattr(readiness_module, "_engines", lambda: [broken])
+
+    client.app.state.readiness.check()
+    resp = client.get("/readyz")
+    assert resp.status_code == 503
+    assert resp.json()["status"] == "not_ready" and resp.json()["error"]
+    assert client.get("/livez").status_code == 200
+    broken.dispose()
+
+
+def test_warmup_runs_every_step(client, monkeypatch):
+    with FakeSpotifyServer() as server:
+        monkeypatch.setattr(spotify_client.settings, "spotify_client_id", "warm")
+        monkeypatch.setattr(spotify_client.settings, "spotify_client_secret", "secret")
+        monkeypatch.setattr(spotify_client.settings, "spotify_token_url", server.token_url)
+        monkeypatch.setattr(spotify_client.settings, "ingest_mode", "inline")
+
+        monitor = ReadinessMonitor(client.app, warmup=True)
+        monitor.run_warmup()
+
+    steps = monitor.state.warmup
+    assert set(steps) == {"mappers", "pool", "snapshot", "requests", "spotify_token"}
+    assert all(isinstance(ms, float) for ms in steps.values()), steps
+    # The token outlives the server: later clients reuse it without a request.
+    assert SpotifyClient(token_url=server.token_url)._get_access_token() == FAKE_ACCESS_TOKEN
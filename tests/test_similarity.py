@@ -0,0 +1,145 @@
+# tests/test_similarity.py
+import pytest
+
+from app.analytics.similarity import (
+    MinHashLSH,
+    build_incidence_matrix,
+    exact_neighbours,
+    rebuild_similarity,
+    refresh_playlist_similarity,
+)
+from app.db.models import Artist, Track, Playlist, PlaylistTrack, PlaylistSimilarity
+from tests.helpers import reset_db
+
+
+def seed_playlists(db_session):
+    """
+    a: t0..t9, b: t5..t14 (5 shared with a), c: t0..t1 (2 shared with a),
+    d: t20 (shares nothing).
+    """
+    artist = Artist(spotify_id="artist_sim", name="Artist", genres="")
+    db_session.add(artist)
+    db_session.flush()
+    tracks = []
+    for n in range(21):
+        t = Track(
+            spotify_id=f"sim_track_{n}",
+            name=f"Song {n}",
+            artist_id=artist.id,
+            album_name="Album",
+            duration_ms=1000,
+        )
+        db_session.add(t)
+        tracks.append(t)
+    db_session.flush()
+
+    layout = {"a": range(0, 10), "b": range(5, 15), "c": range(0, 2), "d": [20]}
+    playlists = {}
+    for key, members in layout.items():
+        p = Playlist(spotify_id=f"sim_{key}", name=f"Playlist {key}", description="",
+                     owner_display_name="", is_curated=True)
+        db_session.add(p)
+        db_session.flush()
+        for n in members:
+            db_session.add(PlaylistTrack(playlist_id=p.id, track_id=tracks[n].id))
+        playlists[key] = p
+    db_session.flush()
+    return playlists
+
+
+def test_incremental_refresh_and_endpoint(client, db_session):
+    reset_db(db_session)
+    pls = seed_playlists(db_session)
+    for p in pls.values():
+        refresh_playlist_similarity(db_session, p.id)
+    db_session.commit()
+
+    resp = client.get(f"/playlists/{pls['a'].id}/similar")
+    assert resp.status_code == 200
+    items = resp.json()
+    assert [i["name"] for i in items] == ["Playlist b", "Playlist c"]
+    assert items[0]["shared_tracks"] == 5
+    assert items[0]["jaccard"] == pytest.approx(5 / 15)
+    assert items[1]["cosine"] == pytest.approx(2 / (10 * 2) ** 0.5)
+
+    # Reverse lists were patched when later playlists were refreshed.
+    resp = client.get(f"/playlists/{pls['b'].id}/similar")
+    assert [i["name"] for i in resp.json()] == ["Playlist a"]
+
+    resp = client.get(f"/playlists/{pls['d'].id}/similar")
+    assert resp.json() == []
+
+    assert client.get("/playlists/999999/similar").status_code == 404
+
+
+def test_rebuild_matches_incremental(db_session, monkeypatch):
+    from app.analytics import similarity
+
+    # One row per band so LSH candidate generation is exhaustive here.
+    settings = similarity.get_settings()
+    monkeypatch.setattr(settings, "similarity_minhash_permutations", 64)
+    monkeypatch.setattr(settings, "similarity_minhash_bands", 64)
+
+    reset_db(db_session)
+    pls = seed_playlists(db_session)
+    for p in pls.values():
+        refresh_playlist_similarity(db_session, p.id)
+    db_session.commit()
+
+    def snapshot():
+        return sorted(
+            (r.playlist_id, r.similar_playlist_id, r.shared_tracks, round(r.jaccard, 6))
+            for r in db_session.query(PlaylistSimilarity).all()
+        )
+
+    incremental = snapshot()
+    rebuild_similarity(db_session, method="exact")
+    assert snapshot() == incremental
+    rebuild_similarity(db_session, method="minhash")
+    assert snapshot() == incremental
+
+
+def test_reingest_refills_lists_that_lose_an_entry(db_session, monkeypatch):
+    from app.analytics import similarity
+
+    monkeypatch.setattr(similarity.get_settings(), "similarity_top_k", 1)
+    reset_db(db_session)
+    pls = seed_playlists(db_session)
+    for p in pls.values():
+        refresh_playlist_similarity(db_session, p.id)
+    db_session.commit()
+
+    # b moves away from a entirely: a's one-entry list must fall back to c.
+    b = pls["b"].id
+    d_track = db_session.query(PlaylistTrack.track_id).filter_by(playlist_id=pls["d"].id).scalar()
+    db_session.query(PlaylistTrack).filter(PlaylistTrack.playlist_id == b).delete()
+    db_session.add(PlaylistTrack(playlist_id=b, track_id=d_track))
+    db_session.flush()
+    refresh_playlist_similarity(db_session, b)
+    db_session.commit()
+
+    def snapshot():
+        return sorted(
+            (r.playlist_id, r.similar_playlist_id, r.shared_tracks)
+            for r in db_session.query(PlaylistSimilarity).all()
+        )
+
+    incremental = snapshot()
+    assert (pls["a"].id, pls["c"].id, 2) in incremental
+    rebuild_similarity(db_session, method="exact")
+    assert snapshot() == incremental
+
+
+def test_exact_and_minhash_neighbours_agree_on_near_duplicates(db_session):
+    reset_db(db_session)
+    pls = seed_playlists(db_session)
+    db_session.commit()
+
+    matrix = build_incidence_matrix(db_session)
+    row_a = list(matrix.playlist_ids).index(pls["a"].id)
+    exact = exact_neighbours(matrix, row_a, k=5)
+    assert [n[0] for n in exact] == [pls["b"].id, pls["c"].id]
+
+    lsh = MinHashLSH(matrix, num_perm=32, bands=32)
+    approx = lsh.neighbours(row_a, k=5)
+    assert pls["b"].id in [n[0] for n in approx]
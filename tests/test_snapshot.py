@@ -0,0 +1,76 @@
+# tests/test_snapshot.py
+import pytest
+
+from app.db import snapshot as snapshot_module
+from app.db.models import Playlist
+from app.db.snapshot import CatalogSnapshot, build_snapshot
+from app.etl.pipeline import SpotifyETLPipeline
+from tests.helpers import StatsSpotifyClient, reset_db
+
+
+@pytest.fixture
+def snapshot_path(tmp_path, monkeypatch):
+    path = tmp_path / "catalog.snap"
+    settings = snapshot_module.get_settings()
+    monkeypatch.setattr(settings, "catalog_snapshot_path", str(path))
+    monkeypatch.setattr(settings, "catalog_snapshot_check_seconds", 0.0)
+    monkeypatch.setattr(snapshot_module, "_current", None)
+    return path
+
+
+def _get(client, url, **params):
+    resp = client.get(url, params=params)
+    assert resp.status_code == 200
+    return resp.json(), resp.headers["X-Total-Count"]
+
+
+def test_snapshot_serves_the_same_responses(client, db_session, snapshot_path):
+    reset_db(db_session)
+    pipeline = SpotifyETLPipeline(client=StatsSpotifyClient())
+    p1 = pipeline.ingest_playlist(db_session, "p1")
+    pipeline.ingest_playlist(db_session, "p2")
+    urls = [
+        ("/playlists/", {}),
+        ("/playlists/", {"offset": 1, "limit": 1}),
+        (f"/playlists/{p1.id}/tracks", {}),
+        (f"/playlists/{p1.id}/tracks", {"offset": 1, "limit": 1}),
+    ]
+    # No file published yet: served from the database.
+    from_db = [_get(client, url, **params) for url, params in urls]
+
+    meta = build_snapshot(db_session, snapshot_path)
+    assert (meta["tracks"], meta["artists"], meta["playlists"]) == (4, 3, 2)
+    assert [_get(client, url, **params) for url, params in urls] == from_db
+
+
+def test_published_snapshots_are_swapped_in(client, db_session, snapshot_path):
+    reset_db(db_session)
+    pipeline = SpotifyETLPipeline(client=StatsSpotifyClient())
+    pipeline.ingest_playlist(db_session, "p1")
+    build_snapshot(db_session, snapshot_path)
+    old = snapshot_module.get_catalog_snapshot()
+
+    # A playlist the snapshot does not know yet is read from the database.
+    p2 = pipeline.ingest_playlist(db_session, "p2")
+    assert len(_get(client, "/playlists/")[0]) == 1
+    tracks, total = _get(client, f"/playlists/{p2.id}/tracks")
+    assert total == "2" and len(tracks) == 2
+
+    build_snapshot(db_session, snapshot_path)
+    assert len(_get(client, "/playlists/")[0]) == 2
+    assert snapshot_module.get_catalog_snapshot() is not old
+    # The replaced mapping stays readable for requests still holding it.
+    assert len(old.playlists()) == 1
+
+    # Reads come from the file, not the database.
+    db_session.query(Playlist).filter(Playlist.id == p2.id).update({"name": "Renamed"})
+    db_session.commit()
+    names = {p["name"] for p in _get(client, "/playlists/")[0]}
+    assert names == {"Playlist p1", "Playlist p2"}
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not.snap"
+    path.write_bytes(b"x" * 64)
+    with pytest.raises(ValueError):
+        CatalogSnapshot(path)
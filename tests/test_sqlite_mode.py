@@ -0,0 +1,142 @@
+# tests/test_sqlite_mode.py
+import threading
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.db import migrations
+from app.db import session as db_session_module
+from app.db.models import Artist, Track
+from app.etl.pipeline import SpotifyETLPipeline
+from tests.helpers import StatsSpotifyClient, reset_db
+
+
+@pytest.fixture
+def sqlite_app_db(tmp_path, monkeypatch):
+    """DATABASE_URL pointing at a migrated SQLite file, engines built from it."""
+    url = f"sqlite+pysqlite:///{tmp_path / 'catalog.sqlite3'}"
+    settings = db_session_module.get_settings()
+    monkeypatch.setattr(settings, "database_url_override", url)
+    for name in ("_engine", "_read_engine", "_sqlite_read_engine"):
+        monkeypatch.setattr(db_session_module, name, None)
+    engine = db_session_module.init_engine()
+    migrations.upgrade(engine)
+    yield engine
+    db_session_module.dispose_engine()
+
+
+def test_sqlite_url_gets_wal_writer_and_readers(sqlite_app_db):
+    writer = db_session_module.get_engine()
+    reader = db_session_module.get_read_engine()
+    assert reader is not writer
+    assert not db_session_module.has_read_replica()
+
+    with writer.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert conn.exec_driver_sql("PRAGMA mmap_size").scalar() == 256 * 1024 * 1024
+        assert conn.exec_driver_sql("PRAGMA foreign_keys").scalar() == 1
+
+    with Session(writer) as db:
+        db.add(Artist(spotify_id="a1", name="Writer"))
+        db.commit()
+    with Session(reader) as db:
+        assert db.query(Artist.name).scalar() == "Writer"
+        with pytest.raises(OperationalError):
+            db.execute(text("DELETE FROM artists"))
+
+
+def test_health_does_not_queue_behind_an_ingest(sqlite_app_db):
+    from fastapi.testclient import TestClient
+
+    from app import main as app_main
+
+    assert db_session_module.probe_engines() == [db_session_module.get_read_engine()]
+    with TestClient(app_main.app) as client:
+        # An ingest holds the only writer connection and the file's lock.
+        with sqlite_app_db.begin() as conn:
+            conn.execute(text("INSERT INTO artists (spotify_id, name) VALUES ('a', 'Busy')"))
+            assert client.get("/health").json() == {"status": "ok"}
+
+
+def test_readiness_does_not_touch_the_writer(sqlite_app_db):
+    from app.api import readiness
+
+    writer_pool = sqlite_app_db.pool
+    reader_pool = db_session_module.get_read_engine().pool
+    with sqlite_app_db.begin() as conn:
+        conn.execute(text("INSERT INTO artists (spotify_id, name) VALUES ('a', 'Busy')"))
+        monitor = readiness.ReadinessMonitor(app=None, warmup=False)
+        monitor.check()
+        assert monitor.state.database_ok, monitor.state.error
+
+        readiness.fill_pools(3)
+        assert writer_pool.checkedout() == 1
+        assert reader_pool.checkedin() >= 3
+
+
+def test_concurrent_writers_queue_instead_of_failing(sqlite_app_db):
+    errors = []
+
+    def write(n):
+        try:
+            for i in range(20):
+                with Session(sqlite_app_db) as db:
+                    db.add(Artist(spotify_id=f"w{n}-{i}", name="x"))
+                    db.commit()
+        except Exception as exc:  # noqa: BLE001
+            errors.append(exc)
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    with Session(sqlite_app_db) as db:
+        assert db.query(Artist).count() == 80
+
+
+def _search(client, q):
+    resp = client.get("/tracks/search", params={"q": q})
+    assert resp.status_code == 200
+    return sorted(item["spotify_id"] for item in resp.json()["items"])
+
+
+def test_search_uses_trigram_index_on_sqlite(client, db_session):
+    reset_db(db_session)
+    pipeline = SpotifyETLPipeline(client=StatsSpotifyClient())
+    pipeline.ingest_playlist(db_session, "p1")
+    indexed = db_session.execute(text("SELECT count(*) FROM tracks_fts")).scalar()
+    assert indexed == db_session.query(Track).count()
+
+    assert _search(client, "song T2") == ["t2"]  # case-insensitive substring
+    assert _search(client, "artist a1") == ["t1", "t2"]  # artist name
+    assert _search(client, "no such") == []
+    # Too short for trigrams: falls back to LIKE.
+    assert _search(client, "t3") == ["t3"]
+
+    artist = db_session.query(Artist).filter(Artist.spotify_id == "a1").one()
+    artist.name = "Renamed"
+    db_session.commit()
+    assert _search(client, "renamed") == ["t1", "t2"]
+    assert _search(client, "artist a1") == []
+
+
+def test_migration_backfills_search_index(tmp_path):
+    engine = db_session_module.create_db_engine(
+        f"sqlite+pysqlite:///{tmp_path / 'legacy.sqlite3'}"
+    )
+    migrations.upgrade(engine, target=11)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO artists (id, spotify_id, name) VALUES (1, 'a', 'Band')"))
+        conn.execute(
+            text("INSERT INTO tracks (id, spotify_id, name, artist_id) VALUES (1, 't', 'Tune', 1)")
+        )
+    migrations.upgrade(engine)
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT rowid, name, artist_name FROM tracks_fts")).all()
+    assert rows == [(1, "Tune", "Band")]
+    engine.dispose()
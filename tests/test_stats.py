@@ -0,0 +1,51 @@
+# tests/test_stats.py
+from app.analytics.stats import rebuild_stats, verify_stats
+from app.db.models import CatalogStats
+from app.etl.pipeline import SpotifyETLPipeline
+from tests.helpers import StatsSpotifyClient, reset_db
+
+
+def test_ingest_maintains_stats(client, db_session):
+    reset_db(db_session)
+    pipeline = SpotifyETLPipeline(client=StatsSpotifyClient())
+    p1 = pipeline.ingest_playlist(db_session, "p1")
+    pipeline.ingest_playlist(db_session, "p2")
+    # Re-ingesting an unchanged playlist must not double count.
+    pipeline.ingest_playlist(db_session, "p1")
+
+    resp = client.get("/stats", params={"top": 2})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["playlist_count"] == 2
+    assert data["track_count"] == 4
+    assert data["artist_count"] == 3
+    assert data["album_count"] == 3
+    assert data["playlist_track_count"] == 5
+    assert data["total_duration_ms"] == 1000
+    # a1 appears three times (t1, t2 twice), a2 and a3 once each.
+    assert [(a["name"], a["appearance_count"]) for a in data["top_artists"]] == [
+        ("Artist a1", 3),
+        ("Artist a2", 1),
+    ]
+
+    resp = client.get(f"/stats/playlists/{p1.id}")
+    assert resp.status_code == 200
+    assert resp.json()["median_duration_ms"] == 200
+    assert resp.json()["album_count"] == 2
+    assert client.get("/stats/playlists/999999").status_code == 404
+
+    assert verify_stats(db_session) == []
+
+
+def test_verify_detects_drift_and_rebuild_repairs(db_session):
+    reset_db(db_session)
+    pipeline = SpotifyETLPipeline(client=StatsSpotifyClient())
+    pipeline.ingest_playlist(db_session, "p1")
+
+    db_session.query(CatalogStats).update({CatalogStats.track_count: 99})
+    db_session.commit()
+    problems = verify_stats(db_session)
+    assert problems and problems[0].startswith("catalog.track_count")
+
+    rebuild_stats(db_session)
+    assert verify_stats(db_session) == []
@@ -0,0 +1,97 @@
+# tests/test_tracing.py
+import logging
+
+import pytest
+
+from app.core import tracing
+from app.core.tracing import (
+    NOOP_SPAN,
+    InMemoryExporter,
+    TraceContextFilter,
+    configure_tracing,
+    shutdown_tracing,
+    span,
+    start_trace,
+)
+from app.etl.pipeline import SpotifyETLPipeline
+from tests.helpers import DummySpotifyClient, reset_db
+
+
+@pytest.fixture
+def exporter():
+    exporter = InMemoryExporter()
+    configure_tracing(sample_rate=1.0, exporter=exporter, batch=False)
+    yield exporter
+    shutdown_tracing()
+
+
+def test_ingest_spans_nest_under_the_trace(exporter, db_session, test_engine):
+    tracing.instrument_engine(test_engine)
+    reset_db(db_session)
+
+    with start_trace("worker.job", job_id=1) as root:
+        SpotifyETLPipeline(client=DummySpotifyClient()).ingest_playlist(
+            db_session, "fake_playlist_id"
+        )
+
+    spans = exporter.spans
+    assert {s["trace_id"] for s in spans} == {root.trace_id}
+    by_name = {}
+    for s in spans:
+        by_name.setdefault(s["name"], []).append(s)
+    for name in ("etl.ingest_playlist", "etl.extract", "etl.transform", "etl.commit"):
+        assert name in by_name, name
+
+    ingest = by_name["etl.ingest_playlist"][0]
+    assert ingest["parent_id"] == root.span_id
+    assert by_name["etl.transform"][0]["parent_id"] == ingest["span_id"]
+    assert by_name["etl.transform"][0]["attrs"]["rows"] == 2
+
+    # SQL statements hang off the ETL phase that issued them.
+    phase_ids = {s["span_id"] for s in spans if s["name"].startswith("etl.")}
+    assert by_name["sql"] and all(s["parent_id"] in phase_ids for s in by_name["sql"])
+
+
+def test_request_id_header_becomes_trace_id(client, exporter):
+    resp = client.get("/health", headers={"X-Request-ID": "req-123"})
+    assert resp.headers["X-Request-ID"] == "req-123"
+    root = [s for s in exporter.spans if s["name"] == "http.request"]
+    assert root and root[0]["trace_id"] == "req-123"
+    assert root[0]["attrs"]["status"] == 200
+
+    # Unsafe ids are replaced rather than copied into logs.
+    resp = client.get("/health", headers={"X-Request-ID": "bad id\nINJECTED"})
+    assert resp.headers["X-Request-ID"] != "bad id\nINJECTED"
+
+
+def test_log_records_carry_trace_id():
+    record = logging.LogRecord("t", logging.INFO, __file__, 1, "msg", None, None)
+    TraceContextFilter().filter(record)
+    assert record.trace_id == "-"
+
+    with start_trace("job", trace_id="abc"):
+        TraceContextFilter().filter(record)
+    assert record.trace_id == "abc"
+
+
+def test_unsampled_traces_record_nothing():
+    exporter = InMemoryExporter()
+    configure_tracing(sample_rate=0.0, exporter=exporter, batch=False)
+    try:
+        with start_trace("job") as root:
+            assert root is NOOP_SPAN
+            with span("inner") as inner:
+                assert inner is NOOP_SPAN
+    finally:
+        shutdown_tracing()
+    assert exporter.spans == []
+
+
+def test_batch_processor_flushes_on_shutdown():
+    exporter = InMemoryExporter()
+    configure_tracing(sample_rate=1.0, exporter=exporter, batch=True)
+    with start_trace("job"):
+        with span("inner", n=1):
+            pass
+    shutdown_tracing()
+    assert [s["name"] for s in exporter.spans] == ["inner", "job"]
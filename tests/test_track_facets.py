@@ -0,0 +1,89 @@
+# tests/test_track_facets.py
+from app.db.models import Artist, Playlist
+from app.etl.pipeline import SpotifyETLPipeline
+from tests.helpers import StatsSpotifyClient, playlist_item, reset_db
+
+
+class FacetSpotifyClient(StatsSpotifyClient):
+    playlists = {
+        "p1": [
+            playlist_item("t1", "a1", "Album A", 150_000),
+            playlist_item("t2", "a1", "Album A", 250_000),
+            playlist_item("t3", "a2", "Album B", 200_000),
+        ],
+        "p2": [
+            playlist_item("t2", "a1", "Album A", 250_000),
+            playlist_item("t4", "a3", "Album C", 500_000),
+        ],
+    }
+
+
+def _ingest(db_session):
+    reset_db(db_session)
+    pipeline = SpotifyETLPipeline(client=FacetSpotifyClient())
+    for playlist_id in ("p1", "p2"):
+        pipeline.ingest_playlist(db_session, playlist_id)
+    artists = {a.spotify_id: a.id for a in db_session.query(Artist)}
+    playlists = {p.spotify_id: p.id for p in db_session.query(Playlist)}
+    return artists, playlists
+
+
+def _names(resp):
+    return [item["spotify_id"] for item in resp.json()["items"]]
+
+
+def test_filters_and_sorts(client, db_session):
+    artists, playlists = _ingest(db_session)
+
+    resp = client.get("/tracks/search", params={"artist_id": artists["a1"]})
+    assert _names(resp) == ["t1", "t2"]
+    resp = client.get("/tracks/search", params={"album": ["Album B", "Album C"]})
+    assert sorted(_names(resp)) == ["t3", "t4"]
+    resp = client.get(
+        "/tracks/search",
+        params={"min_duration_ms": 200_000, "max_duration_ms": 300_000, "sort": "-duration"},
+    )
+    assert _names(resp) == ["t2", "t3"]
+    resp = client.get("/tracks/search", params={"playlist_id": playlists["p2"], "sort": "album"})
+    assert _names(resp) == ["t2", "t4"]
+    resp = client.get("/tracks/search", params={"added_after": "2025-01-01T00:00:00"})
+    assert _names(resp) == []
+    resp = client.get("/tracks/search", params={"sort": "popularity"})
+    assert resp.status_code == 422
+    assert "facets" not in client.get("/tracks/search").json()
+
+
+def test_facets_are_disjunctive(client, db_session):
+    artists, playlists = _ingest(db_session)
+
+    resp = client.get(
+        "/tracks/search", params={"artist_id": artists["a1"], "facets": True}
+    )
+    facets = resp.json()["facets"]
+    # The artist facet ignores the artist filter itself...
+    assert {(f["label"], f["count"]) for f in facets["artist"]} == {
+        ("Artist a1", 2),
+        ("Artist a2", 1),
+        ("Artist a3", 1),
+    }
+    # ...while the other dimensions are narrowed by it.
+    assert facets["album"] == [{"value": "Album A", "label": "Album A", "count": 2}]
+    assert [(f["label"], f["count"]) for f in facets["duration"]] == [
+        ("2-3 min", 1),
+        ("4-5 min", 1),
+    ]
+    assert {(f["value"], f["count"]) for f in facets["playlist"]} == {
+        (str(playlists["p1"]), 2),
+        (str(playlists["p2"]), 1),
+    }
+    assert facets["added_year"] == [{"value": "2024", "label": "2024", "count": 2}]
+
+    resp = client.get(
+        "/tracks/search", params={"playlist_id": playlists["p2"], "facets": True}
+    )
+    facets = resp.json()["facets"]
+    assert {(f["value"], f["count"]) for f in facets["playlist"]} == {
+        (str(playlists["p1"]), 3),
+        (str(playlists["p2"]), 2),
+    }
+    assert sum(f["count"] for f in facets["artist"]) == 2
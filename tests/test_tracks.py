@@ -1,13 +1,6 @@
 # tests/test_tracks.py
-from app.db.models import Artist, Track, PlaylistTrack, Playlist
-
-
-def reset_db(db_session):
-    db_session.query(PlaylistTrack).delete()
-    db_session.query(Track).delete()
-    db_session.query(Artist).delete()
-    db_session.query(Playlist).delete()
-    db_session.commit()
+from app.db.models import Artist, Track
+from tests.helpers import reset_db
 
 
 def seed_tracks(db_session):
@@ -0,0 +1,170 @@
+# tests/test_worker.py
+import signal
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.models import IngestJob, Playlist
+from app.etl.fake_spotify_server import FakeSpotifyConfig, FakeSpotifyServer
+from app.etl.pipeline import SpotifyETLPipeline
+from app.etl.rate_limiter import TokenBucketRateLimiter
+from app.etl.spotify_client import SpotifyClient
+from app.worker import queue
+from app.worker.runner import process_one, run_pool
+from tests.helpers import DummySpotifyClient, reset_db
+
+
+@pytest.fixture
+def clean_jobs(db_session):
+    db_session.query(IngestJob).delete()
+    reset_db(db_session)
+    yield
+    db_session.query(IngestJob).delete()
+    db_session.commit()
+
+
+def test_lease_is_exclusive_and_expired_leases_are_retried(clean_jobs, db_session):
+    job = queue.enqueue(db_session, "pl1", max_attempts=3)
+    assert queue.enqueue(db_session, "pl1").id == job.id  # deduplicated
+
+    claimed = queue.claim(db_session, "w1", visibility_timeout=60)
+    assert claimed.id == job.id and claimed.attempts == 1
+    assert queue.claim(db_session, "w2", visibility_timeout=60) is None
+    assert queue.heartbeat(db_session, job.id, "w1", 60)
+
+    # w1 "crashes": its lease lapses and w2 picks the job up.
+    db_session.query(IngestJob).update(
+        {IngestJob.locked_until: datetime.utcnow() - timedelta(seconds=1)}
+    )
+    db_session.commit()
+    reclaimed = queue.claim(db_session, "w2", visibility_timeout=60)
+    assert reclaimed.id == job.id and reclaimed.attempts == 2
+
+    # The stale worker can neither renew nor finish the job any more.
+    assert not queue.heartbeat(db_session, job.id, "w1", 60)
+    assert not queue.complete(db_session, job.id, "w1", playlist_pk=1)
+    assert queue.fail(db_session, job.id, "w1", "boom", retry_backoff=0) is None
+
+
+def test_failures_back_off_then_fail(clean_jobs, db_session):
+    job = queue.enqueue(db_session, "pl2", max_attempts=2)
+
+    queue.claim(db_session, "w1", visibility_timeout=60)
+    assert queue.fail(db_session, job.id, "w1", "boom", retry_backoff=30) == queue.QUEUED
+    # Backing off: not claimable yet.
+    assert queue.claim(db_session, "w1", visibility_timeout=60) is None
+
+    db_session.query(IngestJob).update({IngestJob.available_at: datetime.utcnow()})
+    db_session.commit()
+    queue.claim(db_session, "w1", visibility_timeout=60)
+    assert queue.fail(db_session, job.id, "w1", "boom", retry_backoff=30) == queue.FAILED
+    db_session.refresh(job)
+    assert job.status == queue.FAILED and job.last_error == "boom"
+
+    job = queue.enqueue(db_session, "pl3", max_attempts=5)
+    queue.claim(db_session, "w1", visibility_timeout=60)
+    assert queue.fail(db_session, job.id, "w1", "gone", 30, permanent=True) == queue.FAILED
+
+
+def test_process_one_runs_pipeline(clean_jobs, db_session, TestingSessionLocal):
+    job = queue.enqueue(db_session, "fake_playlist_id")
+    built = []
+
+    def pipeline_factory():
+        built.append(SpotifyETLPipeline(client=DummySpotifyClient()))
+        return built[-1]
+
+    assert process_one(TestingSessionLocal, "w1", pipeline_factory)
+    assert not process_one(TestingSessionLocal, "w1", pipeline_factory)
+    # One pipeline per claimed job, none while idle.
+    assert len(built) == 1
+
+    db_session.expire_all()
+    job = db_session.get(IngestJob, job.id)
+    assert job.status == queue.SUCCEEDED
+    assert db_session.get(Playlist, job.result_playlist_id).spotify_id == "fake_playlist_id"
+
+
+def test_missing_playlist_fails_without_retries(
+    clean_jobs, db_session, TestingSessionLocal, monkeypatch
+):
+    from app.etl import spotify_client
+
+    monkeypatch.setattr(spotify_client.settings, "spotify_client_id", "id")
+    monkeypatch.setattr(spotify_client.settings, "spotify_client_secret", "secret")
+    job = queue.enqueue(db_session, "gone", max_attempts=5)
+
+    config = FakeSpotifyConfig(missing_playlist_ids={"gone"})
+    with FakeSpotifyServer(config) as server:
+
+        def pipeline_factory():
+            client = SpotifyClient(
+                rate_limiter=TokenBucketRateLimiter(rate=1000, burst=100),
+                api_base=server.api_base,
+                token_url=server.token_url,
+            )
+            return SpotifyETLPipeline(client=client)
+
+        assert process_one(TestingSessionLocal, "w1", pipeline_factory)
+
+    db_session.expire_all()
+    job = db_session.get(IngestJob, job.id)
+    assert job.status == queue.FAILED and job.attempts == 1
+    assert "404" in job.last_error and job.finished_at is not None
+
+
+def test_queue_mode_ingest_endpoint(clean_jobs, client, monkeypatch):
+    from app.core.config import get_settings
+
+    monkeypatch.setattr(get_settings(), "ingest_mode", "queue")
+    resp = client.post("/playlists/ingest", json={"playlist_id": "queued_pl"})
+    assert resp.status_code == 202
+    body = resp.json()
+    assert body["status"] == "queued" and body["playlist"] is None
+
+    resp = client.get(f"/playlists/ingest/jobs/{body['job_id']}")
+    assert resp.json()["playlist_id"] == "queued_pl"
+    assert client.get("/playlists/ingest/jobs/999999").status_code == 404
+
+
+def test_worker_pool_drains_queue_across_processes(tmp_path, monkeypatch):
+    url = f"sqlite+pysqlite:///{tmp_path / 'queue.sqlite3'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+
+    playlist_ids = [f"pool{n}" for n in range(6)]
+    with Session() as db:
+        for playlist_id in playlist_ids:
+            queue.enqueue(db, playlist_id)
+
+    config = FakeSpotifyConfig(default_track_count=40, latency_ms=20)
+    with FakeSpotifyServer(config) as server:
+        # Spawned workers read their settings from the environment.
+        monkeypatch.setenv("SPOTIFY_API_BASE", server.api_base)
+        monkeypatch.setenv("SPOTIFY_TOKEN_URL", server.token_url)
+        monkeypatch.setenv("SPOTIFY_CLIENT_ID", "id")
+        monkeypatch.setenv("SPOTIFY_CLIENT_SECRET", "secret")
+        monkeypatch.setenv("SPOTIFY_RATE_LIMIT_SHARED", "false")
+        monkeypatch.setenv("SPOTIFY_RATE_LIMIT_PER_SECOND", "1000")
+        monkeypatch.setenv("SPOTIFY_RATE_LIMIT_BURST", "1000")
+        # Concurrent first inserts of a shared track can collide; the
+        # collision is retried, immediately here.
+        monkeypatch.setenv("JOB_RETRY_BACKOFF_SECONDS", "0")
+
+        handlers = {s: signal.getsignal(s) for s in (signal.SIGINT, signal.SIGTERM)}
+        try:
+            run_pool(2, url, exit_when_idle=True)
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+
+    with Session() as db:
+        jobs = db.query(IngestJob).all()
+        assert {j.status for j in jobs} == {queue.SUCCEEDED}
+        assert db.query(Playlist).count() == len(playlist_ids)
+        assert all(j.locked_by for j in jobs)  # records who ran it
+    engine.dispose()